@@ -0,0 +1,126 @@
+import bisect
+import csv
+import io
+from array import array
+from collections import Counter
+from datetime import date, datetime
+
+
+class AttendanceIndex:
+    # Rows are "boss,YYYY-MM-DD,HH:MM:SS,guild id". The file is read line by
+    # line and only the bytes past the last ingested offset are parsed on
+    # refresh, so appended rows never trigger a full re-parse. Rows written
+    # before the guild id column existed are credited to `legacy_guild_id`, or
+    # left out when it isn't set. With `owns`, other processes' servers are
+    # skipped too. Boss names are indexed lowercased per server; callers map
+    # them back to a server's own casing.
+    def __init__(self, path, legacy_guild_id=None, owns=None):
+        self.path = path
+        self.legacy_guild_id = str(legacy_guild_id) if legacy_guild_id else None
+        self.owns = owns
+        self.reset()
+
+    def reset(self):
+        self.offset = 0
+        self.count = 0
+        self.skipped = 0
+        self.unassigned = 0
+        self.times = {}
+        self.dates = {}
+        self.by_date = {}
+        self.names = {}
+        # Lines recorded here and already indexed, so reading them back from
+        # the file doesn't count them twice.
+        self._recorded = Counter()
+
+    def load(self):
+        self.reset()
+        self.refresh()
+
+    def refresh(self):
+        if not self.path.exists():
+            return
+        if self.path.stat().st_size < self.offset:
+            self.reset()
+        with self.path.open("rb") as f:
+            f.seek(self.offset)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break
+                self.offset += len(raw)
+                self.ingest(raw.decode("utf-8", errors="replace"))
+
+    def ingest(self, line):
+        if not line.strip():
+            return
+        if self._recorded[line]:
+            self._recorded[line] -= 1
+            return
+        try:
+            fields = [field.strip() for field in next(csv.reader([line]))]
+            boss_name, day_text, time_text = fields[:3]
+            day = date.fromisoformat(day_text).toordinal()
+            clock = datetime.strptime(time_text, "%H:%M:%S").time()
+            guild_id = fields[3] if len(fields) > 3 else self.legacy_guild_id
+            if guild_id and self.owns and not self.owns(guild_id):
+                return
+        except (StopIteration, ValueError):
+            self.skipped += 1
+            return
+        if not guild_id:
+            self.unassigned += 1
+            return
+        self.add(guild_id, boss_name, day, clock.hour * 3600 + clock.minute * 60 + clock.second)
+
+    def add(self, guild_id, boss_name, day, seconds):
+        guild_id = str(guild_id)
+        key = boss_name.lower()
+        self.names.setdefault(guild_id, {}).setdefault(key, boss_name)
+        times = self.times.get((guild_id, key, day))
+        if times is None:
+            times = self.times[(guild_id, key, day)] = array("I")
+            bisect.insort(self.dates.setdefault((guild_id, key), []), day)
+        times.append(seconds)
+        self.by_date.setdefault((guild_id, day), Counter())[key] += 1
+        self.count += 1
+
+    def record(self, guild_id, boss_name, when):
+        # Indexes the row now and returns the line for write(), which can run
+        # later off the event loop.
+        # csv quotes names with commas or quotes; a line break would still
+        # split the row across lines, so it is written as a space.
+        boss_name = " ".join(boss_name.splitlines())
+        out = io.StringIO()
+        csv.writer(out, lineterminator="\n").writerow(
+            [boss_name, when.date().isoformat(), when.strftime("%H:%M:%S"), guild_id]
+        )
+        line = out.getvalue()
+        self.add(guild_id, boss_name, when.date().toordinal(), when.hour * 3600 + when.minute * 60 + when.second)
+        self._recorded[line] += 1
+        return line
+
+    def write(self, line):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a+b") as f:
+            end = f.seek(0, 2)
+            prefix = b""
+            if end:
+                f.seek(end - 1)
+                if f.read(1) != b"\n":
+                    # A torn last line from another writer; start ours on a new line.
+                    prefix = b"\n"
+            f.write(prefix + line.encode("utf-8"))
+
+    def names_for(self, guild_id):
+        return self.names.get(str(guild_id), {})
+
+    def query(self, guild_id, boss_name, start, end):
+        guild_id = str(guild_id)
+        key = boss_name.lower()
+        days = self.dates.get((guild_id, key), [])
+        low = bisect.bisect_left(days, start.toordinal())
+        high = bisect.bisect_right(days, end.toordinal())
+        return [(date.fromordinal(day), sorted(self.times[(guild_id, key, day)])) for day in days[low:high]]
+
+    def day_summary(self, guild_id, day):
+        return self.by_date.get((str(guild_id), day.toordinal()), Counter())
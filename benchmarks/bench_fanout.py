@@ -0,0 +1,77 @@
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scheduler import KeyedTasks  # noqa: E402
+
+
+class FakeChannel:
+    def __init__(self, latency, fail=False):
+        self.latency = latency
+        self.fail = fail
+
+    async def send(self, content):
+        await asyncio.sleep(self.latency)
+        if self.fail:
+            raise RuntimeError("403 Forbidden")
+
+
+async def run_tick(channels, bosses_per_guild, limit):
+    deadline = time.time()
+    lateness = []
+
+    async def notify(guild_id, bosses):
+        channel = channels[guild_id]
+        for boss in bosses:
+            await channel.send(f"@everyone **{boss}** has respawned!")
+            lateness.append(time.time() - deadline)
+
+    notifier = KeyedTasks(notify, limit)
+    for guild_id in channels:
+        notifier.submit(guild_id, [f"Boss{index}" for index in range(bosses_per_guild)])
+    await asyncio.gather(*notifier.pending())
+    lateness.sort()
+    return lateness
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worst-case reminder lateness when many servers are due at once.")
+    parser.add_argument("--guilds", type=int, default=100)
+    parser.add_argument("--bosses", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per channel.send")
+    parser.add_argument("--slow-latency", type=float, default=0.5, help="seconds per send on slow channels")
+    parser.add_argument("--slow-fraction", type=float, default=0.05)
+    parser.add_argument("--fail-fraction", type=float, default=0.02)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    channels = {}
+    for index in range(args.guilds):
+        roll = rng.random()
+        slow = roll < args.slow_fraction
+        fail = args.slow_fraction <= roll < args.slow_fraction + args.fail_fraction
+        channels[str(index)] = FakeChannel(args.slow_latency if slow else args.latency, fail)
+
+    print(f"{args.guilds} servers x {args.bosses} bosses due in the same tick")
+    print(f"{'concurrency':>12}{'sent':>7}{'p50 s':>9}{'p99 s':>9}{'worst s':>9}")
+    for limit in (1, 4, 16, 64):
+        lateness = asyncio.run(run_tick(channels, args.bosses, limit))
+        print(
+            f"{limit:>12}{len(lateness):>7}{percentile(lateness, 0.5):>9.2f}"
+            f"{percentile(lateness, 0.99):>9.2f}{lateness[-1] if lateness else 0:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
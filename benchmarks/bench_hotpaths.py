@@ -0,0 +1,370 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# main.py reads its configuration at import time, so every file it touches is
+# pointed at a scratch directory before it is imported. Background timers are
+# pushed out of the way unless the importing script has already set them.
+SCRATCH = Path(tempfile.mkdtemp(prefix="boss_bench_"))
+os.environ.update(
+    {
+        "BOSS_DATA_FILE": str(SCRATCH / "bosses.json"),
+        "BOSS_KILL_LOG_FILE": str(SCRATCH / "boss_kills.json"),
+        "BOSS_ATTENDANCE_FILE": str(SCRATCH / "attendance.csv"),
+        "BOSS_POINTS_FILE": str(SCRATCH / "points.csv"),
+        "BOSS_STORAGE_BACKEND": "json",
+    }
+)
+os.environ.setdefault("BOSS_SAVE_DELAY", "3600")
+os.environ.setdefault("BOSS_PANEL_REFRESH_DELAY", "3600")
+os.environ.setdefault("BOSS_NOTIFY_BATCH_WINDOW", "0")
+
+import main  # noqa: E402
+from dispatcher import Dispatcher  # noqa: E402
+from killlog import KillLog, encode_record, make_record  # noqa: E402
+from models import Boss  # noqa: E402
+from scheduler import SpawnScheduler  # noqa: E402
+from storage import run_jobs  # noqa: E402
+
+
+FAKE_NOW = datetime(2026, 1, 5, 12, 0, tzinfo=main.TIMEZONE)
+DAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+class FakeChannel:
+    def __init__(self, channel_id):
+        self.id = channel_id
+        self.sent = 0
+
+    async def send(self, *args, **kwargs):
+        self.sent += 1
+
+
+def time_text(rng):
+    return f"{rng.randrange(1, 13)}:{rng.choice((0, 15, 30, 45)):02d}{rng.choice(('AM', 'PM'))}"
+
+
+def make_boss(rng, now=FAKE_NOW):
+    roll = rng.random()
+    fields = {
+        "respawn_seconds": rng.choice((4, 6, 8, 10, 12, 18, 24)) * 3600,
+        "killed_by": rng.randrange(10**17, 10**18),
+        "region": rng.choice((None, "North", "South", "Ruins", "Highlands")),
+    }
+    if roll < 0.2:
+        schedule = [(rng.choice(DAY_NAMES), time_text(rng)) for _ in range(rng.randrange(1, 4))]
+        info = Boss(schedule=schedule, is_scheduled=True, **fields)
+        after = now - timedelta(hours=rng.uniform(0, 48))
+    elif roll < 0.3:
+        schedule = [("Daily", time_text(rng)) for _ in range(rng.randrange(1, 3))]
+        info = Boss(schedule=schedule, is_scheduled=True, is_daily=True, **fields)
+        after = now - timedelta(hours=rng.uniform(0, 24))
+    else:
+        return Boss(death_at=int((now - timedelta(minutes=rng.randrange(0, 30 * 60))).timestamp()), **fields)
+    info.spawn_at = int(main.next_scheduled_spawn(info, after).timestamp())
+    return info
+
+
+def make_state(index, bosses, rng, now=FAKE_NOW):
+    state = main.make_empty_state()
+    state.name = f"Bench Server {index}"
+    state.announce_channel_id = 10_000 + index
+    state.status_channel_id = 20_000 + index
+    guild_names = [f"Guild{number}" for number in range(6)]
+    state.guilds = guild_names
+    for number in range(bosses):
+        name = f"Boss{number:03d}"
+        state.bosses[name] = make_boss(rng, now)
+        if rng.random() < 0.3:
+            state.boss_turns[name] = rng.sample(guild_names, 3)
+            state.boss_current_turn[name] = rng.randrange(3)
+    return state
+
+
+def build_fixture(guilds, bosses, kills, seed):
+    rng = random.Random(seed)
+    servers = {str(900_000 + index): make_state(index, bosses, rng) for index in range(guilds)}
+    kill_path = SCRATCH / f"kills_{guilds}x{bosses}.jsonl"
+    with kill_path.open("w", encoding="utf-8") as f:
+        guild_ids = list(servers)
+        start = FAKE_NOW - timedelta(days=365)
+        for _ in range(kills):
+            guild_id = rng.choice(guild_ids)
+            killed_at = start + timedelta(seconds=rng.randrange(365 * 86400))
+            boss_name = f"Boss{rng.randrange(bosses):03d}"
+            f.write(encode_record(make_record(guild_id, boss_name, killed_at.isoformat(), rng.randrange(10**17, 10**18))))
+    return servers, kill_path
+
+
+def mark_past_reminders(servers, cutoff):
+    # A bot that had been running before the load started would already
+    # have sent every reminder whose deadline has passed; without this the
+    # first tick replays hours of backlog and swamps the lateness figures.
+    main.reminder_sent.entries.clear()
+    for guild_id, state in servers.items():
+        for name, info in state.bosses.items():
+            for deadline, label, spawn_at in main.boss_deadlines(info):
+                if label != "rollover" and deadline < cutoff:
+                    main.reminder_sent.add(main.reminder_key(guild_id, name, spawn_at, label))
+
+
+def install(servers):
+    main.now_sg = lambda: FAKE_NOW
+    main.data = {"servers": servers}
+    main.raw_servers.clear()
+    main.guild_store = main.json_store
+    main.spawn_scheduler = SpawnScheduler(clock=FAKE_NOW.timestamp)
+    main.reminder_sent.entries.clear()
+    main.status_panels.clear()
+
+
+def measure(name, call, repeat, number=1):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            call()
+        samples.append((time.perf_counter() - started) / number)
+    return result(name, samples, number)
+
+
+def measure_memory(name, call, count):
+    # Bytes still allocated once `call` returns, i.e. what its result keeps
+    # alive, divided over `count` items.
+    call()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = call()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del kept
+    size = (after - before) / max(count, 1)
+    return {"name": name, "unit": "bytes", "repeat": 1, "number": 1, "min": size, "median": size, "mean": size, "per": "boss"}
+
+
+async def measure_async(name, call, repeat, setup=None):
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        await call()
+        samples.append(time.perf_counter() - started)
+    return result(name, samples, 1)
+
+
+def result(name, samples, number):
+    samples.sort()
+    return {
+        "name": name,
+        "unit": "seconds",
+        "repeat": len(samples),
+        "number": number,
+        "min": samples[0],
+        "median": samples[len(samples) // 2],
+        "mean": sum(samples) / len(samples),
+    }
+
+
+async def run_scenario(guilds, bosses, args):
+    servers, kill_path = build_fixture(guilds, bosses, args.kills, args.seed)
+    install(servers)
+    sample = [servers[guild_id] for guild_id in list(servers)[: args.sample]]
+    scheduled = [info for state in sample for info in state.bosses.values() if info.is_scheduled]
+    timestamps = [
+        main.local_time(info.death_at or info.spawn_at).isoformat()
+        for state in sample
+        for info in state.bosses.values()
+        if info.death_at or info.spawn_at
+    ]
+    results = []
+
+    def per_guild(function):
+        return lambda: [function(state) for state in sample]
+
+    per_call = len(sample)
+    for name, function in (
+        ("boss_rows", main.boss_rows),
+        ("boss_status_payloads", main.boss_status_payloads),
+        ("todays_bosses", main.todays_bosses),
+    ):
+        entry = measure(name, per_guild(function), args.repeat, args.number)
+        entry.update({key: entry[key] / per_call for key in ("min", "median", "mean")})
+        entry["per"] = "guild"
+        results.append(entry)
+
+    after = FAKE_NOW
+    entry = measure(
+        "next_scheduled_spawn",
+        lambda: [main.next_scheduled_spawn(info, after) for info in scheduled],
+        args.repeat,
+        args.number,
+    )
+    entry.update({key: entry[key] / max(len(scheduled), 1) for key in ("min", "median", "mean")})
+    entry["per"] = "call"
+    results.append(entry)
+
+    entry = measure("parse_datetime", lambda: [main.parse_datetime(value) for value in timestamps], args.repeat, args.number)
+    entry.update({key: entry[key] / max(len(timestamps), 1) for key in ("min", "median", "mean")})
+    entry["per"] = "call"
+    results.append(entry)
+
+    def save_all():
+        main.guild_store.mark_dirty(*servers)
+        run_jobs(main.collect_state_writes())
+
+    def save_one():
+        main.guild_store.mark_dirty(next(iter(servers)))
+        run_jobs(main.collect_state_writes())
+
+    results.append(measure("save_data_all", save_all, args.repeat))
+    results.append(measure("save_data_one", save_one, args.repeat))
+    results.append(measure("load_data", main.load_data, args.repeat))
+
+    def load_and_schedule():
+        # What run_bot does before login; servers stay unparsed.
+        main.load_data()
+        main.spawn_scheduler = SpawnScheduler(clock=FAKE_NOW.timestamp)
+        main.schedule_all()
+
+    def load_and_parse_all():
+        # The previous startup path: every server parsed, then scheduled.
+        main.load_data()
+        for guild_id in main.server_ids():
+            main.get_state_by_id(guild_id)
+        main.spawn_scheduler = SpawnScheduler(clock=FAKE_NOW.timestamp)
+        main.schedule_all()
+
+    results.append(measure("startup_schedule", load_and_schedule, args.repeat))
+    results.append(measure("load_and_parse_all", load_and_parse_all, args.repeat))
+
+    def parsed_servers():
+        main.load_data()
+        return [main.get_state_by_id(guild_id) for guild_id in main.server_ids()]
+
+    results.append(measure_memory("state_memory", parsed_servers, guilds * bosses))
+    install(servers)
+
+    def load_kills():
+        KillLog(kill_path, tz=main.TIMEZONE).load()
+
+    results.append(measure("kill_log_load", load_kills, args.repeat))
+
+    channels = {}
+    for state in servers.values():
+        channels[state.announce_channel_id] = FakeChannel(state.announce_channel_id)
+    main.bot.get_channel = channels.get
+    main.dispatcher = Dispatcher(capacity=10**9, period=1.0)
+
+    def reset_tick():
+        # Only the last `--backlog` seconds of deadlines are still unsent, as
+        # after a short outage; everything older went out before it.
+        mark_past_reminders(servers, FAKE_NOW.timestamp() - args.backlog)
+        main.spawn_scheduler = SpawnScheduler(clock=FAKE_NOW.timestamp)
+        main.schedule_all()
+
+    async def notification_tick():
+        # Those reminders are late by design, so their lateness log is noise.
+        with contextlib.redirect_stdout(io.StringIO()):
+            await main.boss_respawn_notifications.coro()
+            await asyncio.gather(*main.notifier.pending())
+
+    results.append(await measure_async("notification_tick", notification_tick, args.repeat, reset_tick))
+    results[-1]["messages"] = sum(channel.sent for channel in channels.values()) // args.repeat
+
+    for entry in results:
+        entry.update({"guilds": guilds, "bosses": bosses})
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results, baseline):
+    print(f"{'scenario':>12} {'benchmark':<22}{'per':>6}{'median':>12}{'baseline':>12}{'change':>9}")
+    for entry in results:
+        scenario = f"{entry['guilds']}x{entry['bosses']}"
+        old = baseline.get((entry["guilds"], entry["bosses"], entry["name"]))
+        change = f"{(entry['median'] / old['median'] - 1) * 100:>+8.1f}%" if old and old["median"] else f"{'-':>9}"
+        print(f"{scenario:>12} {entry['name']:<22}{entry.get('per', 'run'):>6}{value_text(entry)}{value_text(old)}{change}")
+
+
+def value_text(entry):
+    if not entry:
+        return f"{'-':>12}"
+    if entry["unit"] == "bytes":
+        return f"{entry['median']:>11.0f}B"
+    return f"{entry['median'] * 1e3:>10.3f}ms"
+
+
+def load_baseline(path):
+    if not path:
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        payload = json.load(f)
+    return {(entry["guilds"], entry["bosses"], entry["name"]): entry for entry in payload["results"]}
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Time main.py hot paths against synthetic servers.")
+    parser.add_argument("--guilds", default="1,100,1000", help="comma separated server counts")
+    parser.add_argument("--bosses", default="50,200", help="comma separated bosses per server")
+    parser.add_argument("--kills", type=int, default=100_000, help="kill log records per scenario")
+    parser.add_argument("--sample", type=int, default=20, help="servers timed by the per-server benchmarks")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=3, help="loops per sample for the per-call benchmarks")
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--backlog", type=float, default=900, help="seconds of due reminders the notification tick sends")
+    parser.add_argument("--output", default="bench_hotpaths.json", help="where to write the JSON results")
+    parser.add_argument("--compare", help="earlier JSON results to compare against")
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.compare)
+    results = []
+    for guilds in (int(value) for value in args.guilds.split(",")):
+        for bosses in (int(value) for value in args.bosses.split(",")):
+            print(f"Running {guilds} server(s) x {bosses} bosses...", flush=True)
+            results.extend(asyncio.run(run_scenario(guilds, bosses, args)))
+
+    payload = {
+        "meta": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "fake_now": FAKE_NOW.isoformat(),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    print_results(results, baseline)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,92 @@
+import random
+import sys
+import timeit
+from datetime import datetime, timedelta
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from models import Boss  # noqa: E402
+from schedules import DAYS, next_occurrence, occurrences_on_date, parse_time_text  # noqa: E402
+
+
+TIMEZONE = ZoneInfo("Asia/Singapore")
+
+
+def legacy_next_scheduled_spawn(info, after):
+    upcoming = []
+    for day, time_text in info.schedule:
+        spawn_time = parse_time_text(time_text)
+        if info.is_daily:
+            for offset in range(0, 8):
+                candidate_date = (after + timedelta(days=offset)).date()
+                candidate = datetime.combine(candidate_date, spawn_time, TIMEZONE)
+                if candidate > after:
+                    upcoming.append(candidate)
+        else:
+            target_day = DAYS[day.lower()]
+            days_ahead = (target_day - after.weekday()) % 7
+            for extra_week in (0, 1):
+                candidate_date = (after + timedelta(days=days_ahead + (extra_week * 7))).date()
+                candidate = datetime.combine(candidate_date, spawn_time, TIMEZONE)
+                if candidate > after:
+                    upcoming.append(candidate)
+    return min(upcoming) if upcoming else None
+
+
+def legacy_scheduled_spawns_on_date(info, target_date):
+    spawns = []
+    for day, time_text in info.schedule:
+        spawn_time = parse_time_text(time_text)
+        if info.is_daily or DAYS[day.lower()] == target_date.weekday():
+            spawns.append(datetime.combine(target_date, spawn_time, TIMEZONE))
+    return spawns
+
+
+def make_boss(entries, is_daily, rng):
+    schedule = []
+    for _ in range(entries):
+        hour = rng.randrange(1, 13)
+        minute = rng.randrange(60)
+        time_text = f"{hour}:{minute:02d}{rng.choice(('AM', 'PM'))}"
+        day = "Daily" if is_daily else rng.choice(list(DAYS)).capitalize()
+        schedule.append((day, time_text))
+    return Boss(schedule=schedule, is_scheduled=True, is_daily=is_daily)
+
+
+def check(info, moments):
+    table = info.schedule_table()
+    for after in moments:
+        assert next_occurrence(table, after, TIMEZONE) == legacy_next_scheduled_spawn(info, after)
+        expected = sorted(legacy_scheduled_spawns_on_date(info, after.date()))
+        assert occurrences_on_date(table, after.date(), TIMEZONE) == expected
+
+
+def main():
+    rng = random.Random(7)
+    base = datetime(2026, 1, 5, tzinfo=TIMEZONE)
+    moments = [base + timedelta(minutes=rng.randrange(60 * 24 * 14)) for _ in range(200)]
+    number = 200
+
+    print(f"{'boss':<16}{'entries':>8}{'legacy us':>12}{'compiled us':>13}{'speedup':>9}")
+    for is_daily in (False, True):
+        for entries in (1, 4, 16, 64):
+            info = make_boss(entries, is_daily, rng)
+            check(info, moments)
+            after = moments[0]
+            table = info.schedule_table()
+            legacy = timeit.timeit(lambda: legacy_next_scheduled_spawn(info, after), number=number)
+            compiled = timeit.timeit(
+                lambda: next_occurrence(info.schedule_table(), after, TIMEZONE), number=number
+            )
+            kind = "daily" if is_daily else "weekly"
+            print(
+                f"{kind:<16}{entries:>8}{legacy / number * 1e6:>12.1f}"
+                f"{compiled / number * 1e6:>13.2f}{legacy / compiled:>8.0f}x"
+            )
+            assert table is info.schedule_table()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import argparse
+import gc
+import json
+import platform
+import random
+import shutil
+from datetime import datetime
+
+from bench_hotpaths import SCRATCH, git_revision, main, make_state, measure, value_text
+from models import GuildState, upgrade_server
+from storage import ENCODINGS, GuildStore, atomic_write_json
+
+
+def local_iso(epoch):
+    return main.local_time(epoch).isoformat() if epoch is not None else None
+
+
+def v1_payload(state):
+    # The version 1 layout: one dict per boss with ISO 8601 times.
+    payload = state.to_payload()
+    payload.pop("version")
+    payload["bosses"] = {
+        name: {
+            "spawn_time": local_iso(info.spawn_at),
+            "death_time": local_iso(info.death_at),
+            "respawn_hours": info.respawn_seconds / 3600,
+            "killed_by": info.killed_by,
+            "region": info.region,
+            "schedule": [list(item) for item in info.schedule],
+            "is_scheduled": info.is_scheduled,
+            "is_daily": info.is_daily,
+        }
+        for name, info in state.bosses.items()
+    }
+    return payload
+
+
+class V1Store:
+    # What the store did before version 2: indented JSON server files that
+    # are converted to the in-memory format as they are read.
+    def __init__(self, root):
+        self.root = root
+        self.servers_dir = root / "servers"
+
+    def write(self, payloads):
+        for guild_id, payload in payloads.items():
+            atomic_write_json(self.servers_dir / f"{guild_id}.json", payload)
+        atomic_write_json(self.root / "manifest.json", {"version": 1, "servers": sorted(payloads)})
+
+    def load(self):
+        with (self.root / "manifest.json").open("r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        servers = {}
+        for guild_id in manifest["servers"]:
+            with (self.servers_dir / f"{guild_id}.json").open("r", encoding="utf-8") as f:
+                servers[guild_id] = upgrade_server(json.load(f), main.TIMEZONE)
+        return servers
+
+
+def disk_bytes(root):
+    return sum(path.stat().st_size for path in root.rglob("*") if path.is_file())
+
+
+def bytes_entry(name, size, count):
+    size /= max(count, 1)
+    return {"name": name, "unit": "bytes", "repeat": 1, "number": 1, "min": size, "median": size, "mean": size, "per": "boss"}
+
+
+def run_scenario(guilds, bosses, args):
+    rng = random.Random(args.seed)
+    states = {str(900_000 + index): make_state(index, bosses, rng) for index in range(guilds)}
+    formats = {"v1": (V1Store(SCRATCH / "v1"), {guild_id: v1_payload(state) for guild_id, state in states.items()})}
+    for encoding in ENCODINGS:
+        store = GuildStore(SCRATCH / f"v2_{encoding}", main.TIMEZONE, encoding)
+        formats[f"v2_{encoding}"] = (store, {guild_id: state.to_payload() for guild_id, state in states.items()})
+    # The fixtures are moved out of the collector's reach, so loads are timed
+    # as they run at startup instead of paying to re-scan every server above.
+    gc.collect()
+    gc.freeze()
+
+    results = []
+    for label, (store, payloads) in formats.items():
+        shutil.rmtree(store.root, ignore_errors=True)
+        if isinstance(store, V1Store):
+            save = lambda: store.write(payloads)  # noqa: E731
+        else:
+            save = lambda: store.write(payloads, payloads)  # noqa: E731
+        results.append(measure(f"{label}_save_all", save, args.repeat))
+        results.append(bytes_entry(f"{label}_disk", disk_bytes(store.root), guilds * bosses))
+        results.append(measure(f"{label}_load", store.load, args.repeat))
+
+        def load_and_parse():
+            return [GuildState.from_payload(payload) for payload in store.load().values()]
+
+        results.append(measure(f"{label}_load_and_parse", load_and_parse, args.repeat))
+        loaded = {guild_id: GuildState.from_payload(payload).to_payload() for guild_id, payload in store.load().items()}
+        assert loaded == {guild_id: state.to_payload() for guild_id, state in states.items()}, label
+    gc.unfreeze()
+
+    for entry in results:
+        entry.update({"guilds": guilds, "bosses": bosses})
+    return results
+
+
+def print_results(results):
+    print(f"{'scenario':>12} {'benchmark':<26}{'per':>6}{'median':>12}")
+    for entry in results:
+        scenario = f"{entry['guilds']}x{entry['bosses']}"
+        print(f"{scenario:>12} {entry['name']:<26}{entry.get('per', 'run'):>6}{value_text(entry)}")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Compare the version 1 and version 2 server storage formats.")
+    parser.add_argument("--guilds", default="100,1000", help="comma separated server counts")
+    parser.add_argument("--bosses", default="50,200", help="comma separated bosses per server")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--output", default="bench_storage.json", help="where to write the JSON results")
+    args = parser.parse_args()
+
+    results = []
+    for guilds in (int(value) for value in args.guilds.split(",")):
+        for bosses in (int(value) for value in args.bosses.split(",")):
+            print(f"Running {guilds} server(s) x {bosses} bosses...", flush=True)
+            results.extend(run_scenario(guilds, bosses, args))
+
+    payload = {
+        "meta": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    print_results(results)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main_cli()
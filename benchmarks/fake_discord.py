@@ -0,0 +1,201 @@
+import asyncio
+import itertools
+import random
+import time
+
+import discord
+
+
+INTERACTION_DEADLINE = 3.0
+
+
+class FakeTransport:
+    # Stands in for Discord's REST API. Every call sleeps for a sampled
+    # latency and is counted. Channel message creates are checked against
+    # Discord's per-channel bucket (5 per window, the window opening on the
+    # first request after a reset), so sends that would get a 429 show up in
+    # the report.
+    def __init__(self, latency=0.05, jitter=0.5, seed=5, channel_limit=(5, 5.0)):
+        self.latency = latency
+        self.jitter = jitter
+        self.rng = random.Random(seed)
+        self.limit, self.window = channel_limit
+        self.ids = itertools.count(10**17)
+        self.calls = {}
+        self.buckets = {}
+        self.over_budget = 0
+
+    async def call(self, route, channel_id=None):
+        self.calls[route] = self.calls.get(route, 0) + 1
+        if route == "send_message" and channel_id is not None:
+            now = time.monotonic()
+            used, reset_at = self.buckets.get(channel_id, (0, None))
+            if reset_at is None or now >= reset_at:
+                used, reset_at = 0, now + self.window
+            used += 1
+            if used > self.limit:
+                self.over_budget += 1
+            self.buckets[channel_id] = (used, reset_at)
+        await asyncio.sleep(self.latency * (1 + self.rng.uniform(-self.jitter, self.jitter)))
+
+    def next_id(self):
+        return next(self.ids)
+
+    # discord.abc.Messageable.send (used by ctx.send) calls state.http.send_message.
+    async def send_message(self, channel_id, *, params):
+        await self.call("send_message", channel_id)
+        return {"id": str(self.next_id()), "channel_id": str(channel_id)}
+
+
+class FakeState:
+    allowed_mentions = None
+
+    def __init__(self, transport, user):
+        self.http = transport
+        self.user = user
+
+    def create_message(self, *, channel, data):
+        return FakeMessage(self, int(data["id"]), channel, self.user)
+
+    def store_view(self, view, message_id=None, interaction_id=None):
+        pass
+
+
+class FakeUser:
+    def __init__(self, user_id, name, bot=False, administrator=False, roles=()):
+        self.id = user_id
+        self.name = name
+        self.display_name = name
+        self.bot = bot
+        self.mention = f"<@{user_id}>"
+        self.guild_permissions = discord.Permissions(administrator=administrator)
+        self.roles = list(roles)
+
+    def __str__(self):
+        return self.name
+
+
+class FakeGuild:
+    def __init__(self, guild_id, name):
+        self.id = guild_id
+        self.name = name
+        self.members = {}
+
+    def get_member(self, user_id):
+        return self.members.get(user_id)
+
+    def get_role(self, role_id):
+        return None
+
+
+class FakeMessage:
+    def __init__(self, state, message_id, channel, author, content="", embeds=()):
+        self._state = state
+        self.id = message_id
+        self.channel = channel
+        self.guild = getattr(channel, "guild", None)
+        self.author = author
+        self.content = content
+        self.embeds = list(embeds)
+        self.components = []
+        self.attachments = []
+        self.webhook_id = None
+
+    async def edit(self, **kwargs):
+        await self._state.http.call("edit_message")
+        if "embed" in kwargs:
+            self.embeds = [kwargs["embed"]] if kwargs["embed"] else []
+        return self
+
+    async def delete(self, delay=None):
+        await self._state.http.call("delete_message")
+        self.channel.messages.pop(self.id, None)
+
+
+class FakeChannel:
+    type = discord.ChannelType.text
+
+    def __init__(self, state, channel_id, guild):
+        self._state = state
+        self.id = channel_id
+        self.guild = guild
+        self.name = f"channel-{channel_id}"
+        self.mention = f"<#{channel_id}>"
+        self.messages = {}
+
+    async def send(self, content=None, **kwargs):
+        await self._state.http.call("send_message", self.id)
+        message = FakeMessage(self._state, self._state.http.next_id(), self, self._state.user, content or "")
+        if kwargs.get("embed") is not None:
+            message.embeds = [kwargs["embed"]]
+        self.messages[message.id] = message
+        return message
+
+    def get_partial_message(self, message_id):
+        return self.messages.get(message_id) or FakeMessage(self._state, message_id, self, self._state.user)
+
+    async def history(self, limit=100):
+        await self._state.http.call("history")
+        for message in list(self.messages.values())[::-1][:limit]:
+            yield message
+
+    def permissions_for(self, member):
+        if member.guild_permissions.administrator:
+            return discord.Permissions.all()
+        return discord.Permissions.text()
+
+
+class FakeResponse:
+    def __init__(self, interaction):
+        self.interaction = interaction
+        self.done = False
+
+    def is_done(self):
+        return self.done
+
+    async def _ack(self, route):
+        if self.done:
+            raise discord.InteractionResponded(self.interaction)
+        self.done = True
+        await self.interaction.transport.call(route)
+        self.interaction.acked_at = time.perf_counter()
+
+    async def defer(self, *, ephemeral=False, thinking=False):
+        await self._ack("interaction_defer")
+
+    async def send_message(self, *args, **kwargs):
+        await self._ack("interaction_message")
+
+    async def edit_message(self, **kwargs):
+        await self._ack("interaction_edit")
+
+
+class FakeFollowup:
+    def __init__(self, transport):
+        self.transport = transport
+
+    async def send(self, *args, **kwargs):
+        await self.transport.call("followup_send")
+
+
+class FakeInteraction:
+    def __init__(self, transport, user, guild, channel, message, custom_id):
+        self.transport = transport
+        self.user = user
+        self.guild = guild
+        self.channel = channel
+        self.message = message
+        self.data = {"custom_id": custom_id, "component_type": 2}
+        self.created_at = time.perf_counter()
+        self.acked_at = None
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(transport)
+
+    def ack_latency(self):
+        if self.acked_at is None:
+            return None
+        return self.acked_at - self.created_at
+
+    def dropped(self):
+        latency = self.ack_latency()
+        return latency is None or latency > INTERACTION_DEADLINE
@@ -0,0 +1,271 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import time
+from datetime import datetime, timedelta
+
+# Realistic timers for a live run; bench_hotpaths only fills in what is unset.
+os.environ.setdefault("BOSS_SAVE_DELAY", "1.0")
+os.environ.setdefault("BOSS_PANEL_REFRESH_DELAY", "2.0")
+os.environ.setdefault("BOSS_NOTIFY_BATCH_WINDOW", "1.0")
+
+from bench_hotpaths import git_revision, main, make_state, mark_past_reminders  # noqa: E402
+from fake_discord import (  # noqa: E402
+    INTERACTION_DEADLINE,
+    FakeChannel,
+    FakeGuild,
+    FakeInteraction,
+    FakeMessage,
+    FakeState,
+    FakeTransport,
+    FakeUser,
+)
+
+
+def percentiles(values):
+    if not values:
+        return {"count": 0}
+    values = sorted(values)
+
+    def pick(fraction):
+        return values[min(len(values) - 1, int(len(values) * fraction))]
+
+    return {"count": len(values), "p50": pick(0.5), "p95": pick(0.95), "p99": pick(0.99), "max": values[-1]}
+
+
+class Harness:
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.transport = FakeTransport(args.latency, seed=args.seed)
+        self.bot_user = FakeUser(1, "BossBot", bot=True)
+        self.channels = {}
+        self.state = FakeState(self.transport, self.bot_user)
+        self.guilds = []
+        self.members = []
+        self.latency = {"command": [], "block": []}
+        self.interactions = []
+        self.loop_lag = []
+        self.errors = 0
+        self.tasks = set()
+
+    def build(self):
+        now = main.now_sg()
+        servers = {}
+        for index in range(self.args.guilds):
+            guild = FakeGuild(900_000 + index, f"Load Server {index}")
+            state = make_state(index, self.args.bosses, self.rng, now)
+            state.name = guild.name
+            for info in state.bosses.values():
+                if info.is_scheduled or self.rng.random() >= self.args.due_fraction:
+                    continue
+                # Respawn lands inside the run, so reminders fire under load.
+                info.death_at = int(now.timestamp() - info.respawn_seconds + self.rng.uniform(1, self.args.duration))
+            for channel_id in (state.announce_channel_id, state.status_channel_id):
+                self.channels[channel_id] = FakeChannel(self.state, channel_id, guild)
+            servers[str(guild.id)] = state
+            self.guilds.append(guild)
+
+        for number in range(self.args.members):
+            guild = self.guilds[number % len(self.guilds)]
+            member = FakeUser(10_000 + number, f"member{number}", administrator=number < self.args.officers)
+            guild.members[member.id] = member
+            self.members.append((guild, member))
+
+        main.data = {"servers": servers}
+        main.guild_store = main.json_store
+        main.bot._connection.user = self.bot_user
+        main.bot.get_channel = self.channels.get
+        main.schedule_all()
+        mark_past_reminders(servers, now.timestamp())
+
+    def spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def timed_message(self, guild, member, content, kind):
+        channel = self.channels[main.get_state_by_id(guild.id).announce_channel_id]
+        message = FakeMessage(self.state, self.transport.next_id(), channel, member, content)
+        started = time.perf_counter()
+        try:
+            # What the gateway's MESSAGE_CREATE dispatch would run.
+            await main.on_message(message)
+        except Exception as exc:
+            self.errors += 1
+            print(f"{kind} failed: {exc!r}")
+        self.latency[kind].append(time.perf_counter() - started)
+
+    async def click(self, guild, member):
+        state = main.get_state_by_id(guild.id)
+        # Only respawn timers get a kill button; scheduled bosses have none.
+        names = [name for name, info in state.bosses.items() if not info.is_scheduled]
+        if not names:
+            return
+        boss_name = self.rng.choice(names)
+        custom_id = main.boss_button_id("tod", guild.id, boss_name)
+        channel = self.channels[state.announce_channel_id]
+        message = FakeMessage(self.state, self.transport.next_id(), channel, self.bot_user)
+        interaction = FakeInteraction(self.transport, member, guild, channel, message, custom_id)
+        self.interactions.append(interaction)
+        # What discord.py's view store does for a registered DynamicItem.
+        match = re.fullmatch(main.BOSS_BUTTON_TEMPLATE, custom_id)
+        try:
+            item = await main.BossButton.from_custom_id(interaction, None, match)
+            await item.callback(interaction)
+        except Exception as exc:
+            self.errors += 1
+            print(f"click failed: {exc!r}")
+
+    def command_text(self):
+        return self.rng.choice(("!boss_alive", "!boss_today", "!boss_status", "!boss_stats 7", "!points_top"))
+
+    def block_text(self, guild):
+        state = main.get_state_by_id(guild.id)
+        names = self.rng.sample(list(state.bosses), min(self.args.block_lines, len(state.bosses)))
+        stamp = (main.now_sg() - timedelta(minutes=self.rng.randrange(5, 120))).strftime("%m-%d-%Y %I:%M %p")
+        return "\n".join(f"!boss_tod_edit {name} {stamp}" for name in names)
+
+    async def poisson(self, rate, until, fire):
+        if rate <= 0:
+            return
+        while True:
+            await asyncio.sleep(self.rng.expovariate(rate))
+            if time.perf_counter() >= until:
+                return
+            fire()
+
+    async def clicks(self, until):
+        # Every member clicks once at a uniformly random point in the window.
+        window = min(self.args.click_window, until - time.perf_counter())
+        offsets = sorted(
+            ((self.rng.uniform(0, window), guild, member) for guild, member in self.members), key=lambda item: item[0]
+        )
+        started = time.perf_counter()
+        for offset, guild, member in offsets:
+            await asyncio.sleep(max(0.0, started + offset - time.perf_counter()))
+            self.spawn(self.click(guild, member))
+
+    async def notifications(self):
+        while True:
+            await main.boss_respawn_notifications.coro()
+
+    async def lag_monitor(self, interval=0.05):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            self.loop_lag.append(max(0.0, time.perf_counter() - started - interval))
+
+    def random_officer(self):
+        return self.members[self.rng.randrange(max(1, min(self.args.officers, len(self.members))))]
+
+    async def run(self):
+        self.build()
+        main.notification_lateness.update({"sent": 0, "max": 0.0})
+        until = time.perf_counter() + self.args.duration
+        background = [asyncio.create_task(self.notifications()), asyncio.create_task(self.lag_monitor())]
+
+        def command():
+            guild, member = self.members[self.rng.randrange(len(self.members))]
+            self.spawn(self.timed_message(guild, member, self.command_text(), "command"))
+
+        def block():
+            guild, member = self.random_officer()
+            self.spawn(self.timed_message(guild, member, self.block_text(guild), "block"))
+
+        await asyncio.gather(
+            self.clicks(until),
+            self.poisson(self.args.command_rate, until, command),
+            self.poisson(self.args.block_rate, until, block),
+        )
+        await asyncio.sleep(max(0.0, until - time.perf_counter()))
+        if self.tasks:
+            await asyncio.wait(list(self.tasks), timeout=self.args.drain)
+        unfinished = len(self.tasks)
+        for task in background:
+            task.cancel()
+        # discord.py's command wrapper swallows a cancellation, so a pasted
+        # block moves on to its next line; keep cancelling until it is done.
+        while self.tasks:
+            for task in list(self.tasks):
+                task.cancel()
+            await asyncio.wait(list(self.tasks), timeout=0.1)
+        await asyncio.gather(*main.notifier.pending())
+        await main.persistence.flush()
+        return self.report(unfinished)
+
+    def report(self, unfinished):
+        ack = [interaction.ack_latency() for interaction in self.interactions if interaction.acked_at is not None]
+        return {
+            "meta": {
+                "revision": git_revision(),
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                "args": vars(self.args),
+            },
+            "command_latency": percentiles(self.latency["command"]),
+            "block_latency": percentiles(self.latency["block"]),
+            "interaction_ack": percentiles(ack),
+            "interactions": len(self.interactions),
+            "dropped_interactions": sum(1 for interaction in self.interactions if interaction.dropped()),
+            "interaction_deadline": INTERACTION_DEADLINE,
+            "event_loop_lag": percentiles(self.loop_lag),
+            "reminders_sent": main.notification_lateness["sent"],
+            "reminder_lateness_max": main.notification_lateness["max"],
+            "unfinished_tasks": unfinished,
+            "errors": self.errors,
+            "rest_calls": self.transport.calls,
+            "over_budget_sends": self.transport.over_budget,
+            "dispatcher": main.dispatcher.stats(),
+        }
+
+
+def print_report(report):
+    print(f"{'':<18}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for key in ("command_latency", "block_latency", "interaction_ack", "event_loop_lag"):
+        stats = report[key]
+        if not stats["count"]:
+            print(f"{key:<18}{0:>7}")
+            continue
+        print(
+            f"{key:<18}{stats['count']:>7}"
+            + "".join(f"{stats[name] * 1e3:>10.1f}" for name in ("p50", "p95", "p99", "max"))
+        )
+    print(
+        f"Dropped interactions: {report['dropped_interactions']}/{report['interactions']} "
+        f"(no ack within {report['interaction_deadline']:.0f}s)"
+    )
+    print(f"Reminders sent: {report['reminders_sent']}, worst lateness {report['reminder_lateness_max']:.2f}s")
+    print(f"Sends over Discord's channel budget: {report['over_budget_sends']}")
+    print(f"Unfinished after drain: {report['unfinished_tasks']}, errors: {report['errors']}")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Drive the bot against a local fake Discord transport.")
+    parser.add_argument("--guilds", type=int, default=5)
+    parser.add_argument("--bosses", type=int, default=50)
+    parser.add_argument("--members", type=int, default=500, help="members who each click Time of Death once")
+    parser.add_argument("--officers", type=int, default=20, help="administrators who paste command blocks")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of generated load")
+    parser.add_argument("--click-window", type=float, default=10.0, help="seconds over which all clicks arrive")
+    parser.add_argument("--command-rate", type=float, default=5.0, help="single commands per second")
+    parser.add_argument("--block-rate", type=float, default=0.5, help="multi-line command blocks per second")
+    parser.add_argument("--block-lines", type=int, default=8)
+    parser.add_argument("--due-fraction", type=float, default=0.3, help="regular bosses respawning during the run")
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated REST latency in seconds")
+    parser.add_argument("--drain", type=float, default=60.0, help="seconds to wait for queued work after the run")
+    parser.add_argument("--seed", type=int, default=17)
+    parser.add_argument("--output", default="load_harness.json")
+    args = parser.parse_args()
+
+    report = asyncio.run(Harness(args).run())
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print_report(report)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,150 @@
+import asyncio
+import heapq
+import itertools
+import time
+
+
+PRIORITY_RESPAWN = 0
+PRIORITY_COMMAND = 1
+PRIORITY_PANEL = 2
+PRIORITY_DAILY = 3
+PRIORITY_NAMES = {
+    PRIORITY_RESPAWN: "respawn",
+    PRIORITY_COMMAND: "command",
+    PRIORITY_PANEL: "panel",
+    PRIORITY_DAILY: "daily",
+}
+
+
+class ChannelBudget:
+    # Mirrors Discord's per-channel bucket: `capacity` sends per window, the
+    # window opening with the first send after a reset. A continuously
+    # refilling bucket would let a sixth send through a second after a burst
+    # of five, which Discord answers with a 429. Queued work waits here, in
+    # priority order, instead of inside the HTTP client.
+    def __init__(self, capacity, period, clock):
+        self.capacity = capacity
+        self.period = period
+        self.clock = clock
+        self.remaining = capacity
+        self.reset_at = None
+
+    def delay(self):
+        now = self.clock()
+        if self.reset_at is not None and now >= self.reset_at:
+            self.remaining = self.capacity
+            self.reset_at = None
+        if self.remaining > 0:
+            return 0.0
+        return self.reset_at - now
+
+    def take(self):
+        # Returns True when this send opened a new window.
+        self.remaining -= 1
+        if self.reset_at is None:
+            self.reset_at = self.clock() + self.period
+            return True
+        return False
+
+    def opened_at_completion(self):
+        # Discord starts the window when it handles the request, so the reset
+        # is counted from when the opening send finished, not when it left.
+        self.reset_at = self.clock() + self.period
+
+
+class Dispatcher:
+    def __init__(self, capacity=5, period=5.0, clock=time.monotonic):
+        self.capacity = capacity
+        self.period = period
+        self.clock = clock
+        self._queues = {}
+        self._budgets = {}
+        self._workers = {}
+        self._collapsible = {}
+        self._counter = itertools.count()
+        self.waits = {priority: {"count": 0, "total": 0.0, "max": 0.0} for priority in PRIORITY_NAMES}
+        self.collapsed = 0
+
+    async def submit(self, channel_id, priority, call, collapse_key=None):
+        # `call` is a zero-argument coroutine function. A queued call with the
+        # same collapse_key is superseded: it runs the newest call once and both
+        # callers get that result.
+        if collapse_key is not None and collapse_key in self._collapsible:
+            entry = self._collapsible[collapse_key]
+            entry["call"] = call
+            self.collapsed += 1
+            return await asyncio.shield(entry["future"])
+
+        loop = asyncio.get_running_loop()
+        entry = {
+            "call": call,
+            "future": loop.create_future(),
+            "queued_at": self.clock(),
+            "priority": priority,
+            "collapse_key": collapse_key,
+        }
+        if collapse_key is not None:
+            self._collapsible[collapse_key] = entry
+        queue = self._queues.setdefault(channel_id, [])
+        heapq.heappush(queue, (priority, next(self._counter), entry))
+        if channel_id not in self._workers:
+            self._workers[channel_id] = loop.create_task(self._drain(channel_id))
+        return await asyncio.shield(entry["future"])
+
+    async def _drain(self, channel_id):
+        queue = self._queues[channel_id]
+        budget = self._budgets.setdefault(channel_id, ChannelBudget(self.capacity, self.period, self.clock))
+        try:
+            while queue:
+                delay = budget.delay()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    continue
+                _, _, entry = heapq.heappop(queue)
+                if entry["collapse_key"] is not None:
+                    self._collapsible.pop(entry["collapse_key"], None)
+                opened = budget.take()
+                self._record_wait(entry)
+                try:
+                    result = await entry["call"]()
+                except Exception as exc:
+                    if not entry["future"].done():
+                        entry["future"].set_exception(exc)
+                else:
+                    if not entry["future"].done():
+                        entry["future"].set_result(result)
+                if opened:
+                    budget.opened_at_completion()
+        finally:
+            self._workers.pop(channel_id, None)
+            if not queue:
+                self._queues.pop(channel_id, None)
+
+    def _record_wait(self, entry):
+        wait = self.clock() - entry["queued_at"]
+        stats = self.waits[entry["priority"]]
+        stats["count"] += 1
+        stats["total"] += wait
+        stats["max"] = max(stats["max"], wait)
+
+    def depth(self):
+        depths = {name: 0 for name in PRIORITY_NAMES.values()}
+        for queue in self._queues.values():
+            for priority, _, _ in queue:
+                depths[PRIORITY_NAMES[priority]] += 1
+        return depths
+
+    def stats(self):
+        return {
+            "depth": self.depth(),
+            "channels": len(self._workers),
+            "collapsed": self.collapsed,
+            "waits": {
+                PRIORITY_NAMES[priority]: {
+                    "count": stats["count"],
+                    "avg": stats["total"] / stats["count"] if stats["count"] else 0.0,
+                    "max": stats["max"],
+                }
+                for priority, stats in self.waits.items()
+            },
+        }
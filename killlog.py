@@ -0,0 +1,118 @@
+import json
+from datetime import datetime
+
+
+class KillLog:
+    # Append-only journal, one JSON object per line. The in-memory index maps
+    # guild id -> boss name -> [(killed_at epoch, killed_by)] in append order.
+    # With `owns`, kills in other processes' servers are left out.
+    def __init__(self, path, legacy_path=None, tz=None, owns=None):
+        self.path = path
+        self.legacy_path = legacy_path
+        self.tz = tz
+        self.owns = owns
+        self.index = {}
+        self.count = 0
+
+    def migrate(self):
+        # Sharded processes share the journal; they run this one at a time.
+        if not self.path.exists():
+            self.migrate_legacy()
+
+    def load(self):
+        self.index = {}
+        self.count = 0
+        self.migrate()
+        if not self.path.exists():
+            return
+        line = ""
+        with self.path.open("r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    print(f"Skipping unreadable kill log line {line_number} in {self.path}.")
+                    continue
+                self.add(record)
+        if line and not line.endswith("\n"):
+            # Terminate a line torn by a crash so the next append starts cleanly.
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write("\n")
+
+    def migrate_legacy(self):
+        if not self.legacy_path or self.legacy_path == self.path or not self.legacy_path.exists():
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            for record in legacy_records(self.legacy_path):
+                f.write(encode_record(record))
+        tmp_path.replace(self.path)
+        print(f"Migrated kill log {self.legacy_path} to {self.path}.")
+
+    def add(self, record):
+        if self.owns and not self.owns(record["guild_id"]):
+            return
+        killed_at = self.to_epoch(record["killed_at"])
+        if killed_at is None:
+            return
+        guild_log = self.index.setdefault(str(record["guild_id"]), {})
+        guild_log.setdefault(record["boss"], []).append((killed_at, record.get("killed_by")))
+        self.count += 1
+
+    def record(self, guild_id, boss_name, killed_at, killed_by):
+        record = make_record(guild_id, boss_name, killed_at.isoformat(), killed_by)
+        self.add(record)
+        return record
+
+    def write(self, record):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(encode_record(record))
+
+    def kills(self, guild_id, boss_name=None):
+        guild_log = self.index.get(str(guild_id), {})
+        if boss_name is not None:
+            return guild_log.get(boss_name, [])
+        return guild_log
+
+    def kills_between(self, guild_id, start, end, boss_name=None):
+        guild_log = self.kills(guild_id)
+        names = [boss_name] if boss_name is not None else list(guild_log)
+        rows = [
+            (name, killed_at, killed_by)
+            for name in names
+            for killed_at, killed_by in guild_log.get(name, [])
+            if start <= killed_at < end
+        ]
+        rows.sort(key=lambda row: row[1])
+        return rows
+
+    def to_epoch(self, value):
+        try:
+            killed_at = datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            return None
+        if killed_at.tzinfo is None and self.tz is not None:
+            killed_at = killed_at.replace(tzinfo=self.tz)
+        return killed_at.timestamp()
+
+
+def legacy_records(path):
+    # The nested {guild id: {boss: [killed_at, ...]}} log the journal replaced.
+    with path.open("r", encoding="utf-8") as f:
+        legacy = json.load(f)
+    for guild_id, bosses in legacy.items():
+        for boss_name, kills in bosses.items():
+            for killed_at in kills:
+                yield make_record(guild_id, boss_name, killed_at, None)
+
+
+def make_record(guild_id, boss_name, killed_at, killed_by):
+    return {"guild_id": str(guild_id), "boss": boss_name, "killed_at": killed_at, "killed_by": killed_by}
+
+
+def encode_record(record):
+    return json.dumps(record, separators=(",", ":")) + "\n"
@@ -1,7 +1,12 @@
+import asyncio
 import copy
+import hashlib
+import io
 import json
 import os
 import shlex
+import signal
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
 from zoneinfo import ZoneInfo
@@ -11,6 +16,22 @@ from discord.ext import commands, tasks
 from discord.ui import Button, View
 from dotenv import load_dotenv
 
+from attendance import AttendanceIndex
+from dispatcher import PRIORITY_COMMAND, PRIORITY_DAILY, PRIORITY_PANEL, PRIORITY_RESPAWN, Dispatcher
+from killlog import KillLog
+from metrics import Metrics, serve_metrics
+from models import Boss, GuildState, parse_time_value, upgrade_server, upgrade_single_server
+from points import PointsLedger
+from profiler import ProfileSession
+import reconcile
+from reminders import SentReminders
+from scheduler import Debouncer, KeyedTasks, SpawnScheduler, fan_out
+from schedules import DAYS, next_occurrence, occurrences_on_date, parse_time_text
+from shards import ShardLease
+from sqlite_store import SqliteDatabase, SqliteGuildStore, SqliteKillLog
+from stats import KillStats
+from storage import GuildStore, WriteBehind
+
 
 load_dotenv()
 
@@ -22,35 +43,172 @@ TIMEZONE = ZoneInfo(os.getenv("BOSS_TIMEZONE", "Asia/Singapore"))
 
 DATA_FILE = Path(os.getenv("BOSS_DATA_FILE", "bosses.json"))
 KILL_LOG_FILE = Path(os.getenv("BOSS_KILL_LOG_FILE", "boss_kills.json"))
+ATTENDANCE_FILE = Path(os.getenv("BOSS_ATTENDANCE_FILE", "attendance.csv"))
+# The server that owns attendance rows recorded before rows carried a server id.
+ATTENDANCE_LEGACY_GUILD_ID = os.getenv("BOSS_ATTENDANCE_GUILD_ID")
+RECONCILE_TOLERANCE = int(os.getenv("BOSS_RECONCILE_TOLERANCE", "30"))
+POINTS_FILE = Path(os.getenv("BOSS_POINTS_FILE", "points.csv"))
+POINTS_PER_KILL = int(os.getenv("BOSS_POINTS_PER_KILL", "1"))
+POINTS_PER_ATTENDANCE = int(os.getenv("BOSS_POINTS_PER_ATTENDANCE", "1"))
+DATA_DIR = Path(os.getenv("BOSS_DATA_DIR", str(DATA_FILE.with_name(f"{DATA_FILE.stem}_data"))))
+SAVE_DELAY = float(os.getenv("BOSS_SAVE_DELAY", "1.0"))
+PANEL_REFRESH_DELAY = float(os.getenv("BOSS_PANEL_REFRESH_DELAY", "2.0"))
+REMINDER_FILE = Path(os.getenv("BOSS_REMINDER_FILE", str(DATA_FILE.with_name(f"{DATA_FILE.stem}_reminders.json"))))
+REMINDER_TTL = timedelta(hours=float(os.getenv("BOSS_REMINDER_TTL_HOURS", "6")))
+NOTIFY_CONCURRENCY = int(os.getenv("BOSS_NOTIFY_CONCURRENCY", "16"))
+NOTIFY_BATCH_WINDOW = float(os.getenv("BOSS_NOTIFY_BATCH_WINDOW", "1.0"))
+# A reminder whose send fails is retried after 5s, 10s, 20s... up to 2 minutes
+# apart, and dropped after the last attempt.
+REMINDER_RETRY_BASE = 5.0
+REMINDER_RETRY_MAX = 120.0
+REMINDER_RETRY_ATTEMPTS = 6
+STORAGE_BACKEND = os.getenv("BOSS_STORAGE_BACKEND", "json").strip().lower()
+STORAGE_ENCODING = os.getenv("BOSS_STORAGE_ENCODING", "json").strip().lower()
+SQLITE_FILE = Path(os.getenv("BOSS_SQLITE_FILE", str(DATA_FILE.with_suffix(".db"))))
+METRICS_PORT = int(os.getenv("BOSS_METRICS_PORT", "0"))
+METRICS_HOST = os.getenv("BOSS_METRICS_HOST", "127.0.0.1")
+PROFILE_MAX_SECONDS = int(os.getenv("BOSS_PROFILE_MAX_SECONDS", "300"))
+STARTUP_REFRESH_CONCURRENCY = int(os.getenv("BOSS_STARTUP_REFRESH_CONCURRENCY", "4"))
+# Sharded mode: BOSS_SHARD_COUNT gateway shards in total, of which this process
+# runs BOSS_SHARD_IDS (all of them if unset) and owns those shards' servers.
+SHARD_COUNT = int(os.getenv("BOSS_SHARD_COUNT", "0"))
+SHARD_IDS = [int(value) for value in os.getenv("BOSS_SHARD_IDS", "").split(",") if value.strip()]
+SHARD_DIR = Path(os.getenv("BOSS_SHARD_DIR", str(DATA_DIR / "leases")))
+SHARD_LEASE_SECONDS = float(os.getenv("BOSS_SHARD_LEASE_SECONDS", "30"))
+PROCESS_STARTED = time.time()
 
 intents = discord.Intents.default()
 intents.message_content = True
 intents.guilds = True
 intents.members = True
-bot = commands.Bot(command_prefix=COMMAND_PREFIX, intents=intents, help_command=None)
+# Every channel message goes through one dispatcher so respawn pings are sent
+# ahead of command replies, panel edits and daily announcements.
+dispatcher = Dispatcher()
+metrics = Metrics()
+# When each tasks.loop's next iteration is due, for tick lateness.
+loop_ticks = {}
+# The running !boss_profile session, if any.
+profile_session = None
+
+
+async def send_message(channel, priority, *args, **kwargs):
+    return await dispatcher.submit(channel.id, priority, lambda: channel.send(*args, **kwargs))
+
+
+class QueuedContext(commands.Context):
+    async def send(self, *args, **kwargs):
+        return await dispatcher.submit(
+            self.channel.id, PRIORITY_COMMAND, lambda: commands.Context.send(self, *args, **kwargs)
+        )
+
+
+def instrument_http(http):
+    # Every REST call discord.py makes goes through HTTPClient.request; routes
+    # are counted by their path template so channel IDs don't become labels.
+    request = http.request
+
+    async def timed_request(route, **kwargs):
+        started = time.perf_counter()
+        status = "ok"
+        try:
+            return await request(route, **kwargs)
+        except discord.HTTPException as exc:
+            status = str(exc.status)
+            raise
+        finally:
+            metrics.inc("discord_requests_total", method=route.method, route=route.path, status=status)
+            metrics.observe("discord_request_seconds", time.perf_counter() - started, route=route.path)
+
+    http.request = timed_request
+
+
+class BossBot(commands.AutoShardedBot if SHARD_COUNT else commands.Bot):
+    async def setup_hook(self):
+        self.add_dynamic_items(BossButton)
+        instrument_http(self.http)
+
+    async def invoke(self, ctx):
+        started = time.perf_counter()
+        try:
+            await super().invoke(ctx)
+        finally:
+            if ctx.command is not None:
+                metrics.observe("command_seconds", time.perf_counter() - started, command=ctx.command.qualified_name)
+
+    async def get_context(self, origin, /, *, cls=QueuedContext):
+        return await super().get_context(origin, cls=cls)
+
+
+if SHARD_COUNT:
+    if not SHARD_IDS:
+        SHARD_IDS = list(range(SHARD_COUNT))
+    if any(shard_id < 0 or shard_id >= SHARD_COUNT for shard_id in SHARD_IDS):
+        raise ValueError(f"BOSS_SHARD_IDS must be between 0 and {SHARD_COUNT - 1}")
+    bot = BossBot(
+        command_prefix=COMMAND_PREFIX,
+        intents=intents,
+        help_command=None,
+        shard_count=SHARD_COUNT,
+        shard_ids=SHARD_IDS,
+    )
+else:
+    bot = BossBot(command_prefix=COMMAND_PREFIX, intents=intents, help_command=None)
+
+# Only sharded processes take a lease. An unsharded bot owns every server and
+# never waits or stops for one, so stop it before starting sharded processes.
+shard_lease = ShardLease(SHARD_DIR, SHARD_IDS or [0], SHARD_COUNT or 1, SHARD_LEASE_SECONDS)
+owns = shard_lease.owns if SHARD_COUNT else None
+
+
+def lease_held():
+    return not SHARD_COUNT or shard_lease.held()
 
 data = {"servers": {}}
+# Stored payloads of servers that haven't been touched since startup; they are
+# parsed into data["servers"] on first access.
+raw_servers = {}
 legacy_state = None
+json_store = GuildStore(DATA_DIR, TIMEZONE, STORAGE_ENCODING, owns)
+json_kill_log = KillLog(KILL_LOG_FILE.with_suffix(".jsonl"), KILL_LOG_FILE, TIMEZONE, owns)
+if STORAGE_BACKEND == "sqlite":
+    sqlite_db = SqliteDatabase(SQLITE_FILE)
+    guild_store = SqliteGuildStore(sqlite_db, TIMEZONE, owns)
+    kill_log = SqliteKillLog(sqlite_db, TIMEZONE, import_from=json_kill_log, owns=owns)
+else:
+    guild_store = json_store
+    kill_log = json_kill_log
+
+kill_stats = KillStats(TIMEZONE)
+attendance = AttendanceIndex(ATTENDANCE_FILE, ATTENDANCE_LEGACY_GUILD_ID, owns)
+points_ledger = PointsLedger(POINTS_FILE, owns)
 
 # Reminder keys include Discord server ID and target spawn timestamp, so Santiago
 # and Sven can have different timers for the same boss name without collisions.
-reminder_sent = set()
-daily_announcements_sent = set()
-
-DAYS = {
-    "monday": 0,
-    "tuesday": 1,
-    "wednesday": 2,
-    "thursday": 3,
-    "friday": 4,
-    "saturday": 5,
-    "sunday": 6,
-}
+# Daily announcements share the store with an empty boss name. Each sharded
+# process saves its own file and loads every process's file on startup.
+reminder_path = REMINDER_FILE
+if SHARD_COUNT:
+    reminder_path = REMINDER_FILE.with_name(f"{REMINDER_FILE.stem}.{shard_lease.name}{REMINDER_FILE.suffix}")
+reminder_sent = SentReminders(reminder_path, REMINDER_TTL.total_seconds(), owns=owns)
+spawn_scheduler = SpawnScheduler()
+# Status panel message IDs and a digest of each page's embed, per server, so a
+# refresh only edits pages whose content changed.
+status_panels = {}
+# Seconds between a reminder's deadline and the moment it was sent.
+notification_lateness = {"sent": 0, "max": 0.0}
+# Reminder key -> (failed attempts, original deadline, spawn epoch) for
+# reminders waiting to be sent again.
+send_retries = {}
+# Seconds from process start to each startup milestone.
+startup_timings = {}
+
 REMINDERS = (
     ("1h", 3600, "1 hour"),
     ("15m", 900, "15 minutes"),
     ("5m", 300, "5 minutes"),
 )
+REMINDER_TEXT = {label: label_text for label, _, label_text in REMINDERS}
+SCHEDULED_ROLLOVER = timedelta(minutes=30)
 
 
 def now_sg():
@@ -66,39 +224,20 @@ def ensure_aware(dt):
 
 
 def parse_datetime(value):
-    if not value:
-        return None
-    if isinstance(value, datetime):
-        return ensure_aware(value)
-    try:
-        return ensure_aware(datetime.fromisoformat(value))
-    except ValueError:
-        pass
-    for fmt in ("%m-%d-%Y %I:%M %p", "%Y-%m-%d %H:%M", "%m/%d/%Y %I:%M %p"):
-        try:
-            return datetime.strptime(value, fmt).replace(tzinfo=TIMEZONE)
-        except ValueError:
-            continue
-    return None
+    return ensure_aware(parse_time_value(value, TIMEZONE))
+
+
+def local_time(epoch):
+    return datetime.fromtimestamp(epoch, TIMEZONE) if epoch is not None else None
 
 
-def parse_time_text(value):
-    value = value.strip().upper().replace(" ", "")
-    for fmt in ("%I:%M%p", "%I%p", "%H:%M"):
+def parse_date_text(value):
+    for fmt in ("%Y-%m-%d", "%m-%d-%Y", "%m/%d/%Y"):
         try:
-            return datetime.strptime(value, fmt).time()
+            return datetime.strptime(value.strip(), fmt).date()
         except ValueError:
             continue
-    raise ValueError(f"Invalid time: {value}")
-
-
-def atomic_write_json(path, payload):
-    path.parent.mkdir(parents=True, exist_ok=True)
-    tmp_path = path.with_suffix(path.suffix + ".tmp")
-    with tmp_path.open("w", encoding="utf-8") as f:
-        json.dump(payload, f, indent=2)
-        f.write("\n")
-    tmp_path.replace(path)
+    return None
 
 
 def storage_status(path):
@@ -119,31 +258,14 @@ def storage_status(path):
 
 
 def make_empty_state(guild=None):
-    return {
-        "name": guild.name if guild else "Unknown Discord Server",
-        "announce_channel_id": None,
-        "status_channel_id": None,
-        "bosses": {},
-        "guilds": [],
-        "boss_turns": {},
-        "boss_current_turn": {},
-        "maintenance_mode": False,
-        "button_role_id": None,
-    }
+    return GuildState(guild.name if guild else "Unknown Discord Server")
 
 
 def migrate_old_payload(payload):
-    return {
-        "name": "Migrated Timers",
-        "announce_channel_id": DEFAULT_ANNOUNCE_CHANNEL_ID,
-        "status_channel_id": DEFAULT_STATUS_CHANNEL_ID,
-        "bosses": parse_bosses(payload.get("bosses", payload)),
-        "guilds": payload.get("guilds", []),
-        "boss_turns": payload.get("boss_turns", {}),
-        "boss_current_turn": payload.get("boss_current_turn", {}),
-        "maintenance_mode": payload.get("maintenance_mode", False),
-        "button_role_id": payload.get("button_role_id"),
-    }
+    state = parse_state(upgrade_single_server(payload, TIMEZONE))
+    state.announce_channel_id = DEFAULT_ANNOUNCE_CHANNEL_ID
+    state.status_channel_id = DEFAULT_STATUS_CHANNEL_ID
+    return state
 
 
 def get_state(guild):
@@ -152,101 +274,122 @@ def get_state(guild):
         raise commands.CommandError("This command must be used inside a Discord server.")
 
     guild_id = str(guild.id)
+    loaded_state(guild_id)
     if guild_id not in data["servers"]:
-        if legacy_state and not data["servers"]:
+        if legacy_state and not server_ids():
             state = copy.deepcopy(legacy_state)
-            state["name"] = guild.name
+            state.name = guild.name
             legacy_state = None
         else:
             state = make_empty_state(guild)
         data["servers"][guild_id] = state
+        guild_store.mark_dirty(guild_id)
     else:
         state = data["servers"][guild_id]
-        state["name"] = guild.name
-
-    state.setdefault("announce_channel_id", None)
-    state.setdefault("status_channel_id", None)
-    state.setdefault("bosses", {})
-    state.setdefault("guilds", [])
-    state.setdefault("boss_turns", {})
-    state.setdefault("boss_current_turn", {})
-    state.setdefault("maintenance_mode", False)
-    state.setdefault("button_role_id", None)
+        if state.name != guild.name:
+            state.name = guild.name
+            guild_store.mark_dirty(guild_id)
     return state
 
 
 def get_state_by_id(guild_id):
-    return data["servers"].get(str(guild_id))
+    return loaded_state(guild_id)
 
 
-def reminder_key(guild_id, boss_name, spawn_time, label):
-    stamp = ensure_aware(spawn_time).isoformat()
-    return str(guild_id), boss_name.lower(), stamp, label
+def loaded_state(guild_id):
+    guild_id = str(guild_id)
+    state = data["servers"].get(guild_id)
+    if state is None and guild_id in raw_servers:
+        state = data["servers"][guild_id] = parse_state(raw_servers.pop(guild_id))
+    return state
 
 
-def load_kill_log():
-    if not KILL_LOG_FILE.exists():
-        return {}
-    with KILL_LOG_FILE.open("r", encoding="utf-8") as f:
-        return json.load(f)
+def batches_reminders(guild_id):
+    guild_id = str(guild_id)
+    if guild_id in raw_servers:
+        return bool(raw_servers[guild_id].get("batch_reminders"))
+    state = data["servers"].get(guild_id)
+    return bool(state and state.batch_reminders)
 
 
-def save_kill_log(log):
-    atomic_write_json(KILL_LOG_FILE, log)
+def server_ids():
+    return list(data["servers"]) + list(raw_servers)
 
 
-def serialize_boss(info):
-    return {
-        "spawn_time": ensure_aware(info.get("spawn_time")).isoformat()
-        if info.get("spawn_time")
-        else None,
-        "death_time": ensure_aware(info.get("death_time")).isoformat()
-        if info.get("death_time")
-        else None,
-        "respawn_hours": info.get("respawn_time", timedelta()).total_seconds() / 3600,
-        "killed_by": info.get("killed_by"),
-        "region": info.get("region"),
-        "schedule": info.get("schedule", []),
-        "is_scheduled": info.get("is_scheduled", False),
-        "is_daily": info.get("is_daily", False),
-    }
+def reminder_key(guild_id, boss_name, spawn_epoch, label):
+    return str(guild_id), boss_name.lower(), int(spawn_epoch), label
+
 
+def parse_state(payload):
+    return GuildState.from_payload(payload, DEFAULT_ANNOUNCE_CHANNEL_ID, DEFAULT_STATUS_CHANNEL_ID)
 
-def parse_bosses(raw_bosses):
-    parsed = {}
-    for name, info in raw_bosses.items():
-        parsed[name] = {
-            "spawn_time": parse_datetime(info.get("spawn_time")),
-            "death_time": parse_datetime(info.get("death_time")),
-            "respawn_time": timedelta(hours=float(info.get("respawn_hours", 0))),
-            "killed_by": info.get("killed_by"),
-            "region": info.get("region"),
-            "schedule": [tuple(item) for item in info.get("schedule", [])],
-            "is_scheduled": info.get("is_scheduled", False),
-            "is_daily": info.get("is_daily", False),
-        }
-    return parsed
-
-
-async def save_data():
-    payload = {"servers": {}}
-    for guild_id, state in data["servers"].items():
-        payload["servers"][guild_id] = {
-            "name": state.get("name", "Unknown Discord Server"),
-            "announce_channel_id": state.get("announce_channel_id"),
-            "status_channel_id": state.get("status_channel_id"),
-            "bosses": {name: serialize_boss(info) for name, info in state.get("bosses", {}).items()},
-            "guilds": state.get("guilds", []),
-            "boss_turns": state.get("boss_turns", {}),
-            "boss_current_turn": state.get("boss_current_turn", {}),
-            "maintenance_mode": state.get("maintenance_mode", False),
-            "button_role_id": state.get("button_role_id"),
-        }
-    atomic_write_json(DATA_FILE, payload)
+
+def collect_state_writes():
+    jobs = []
+    payloads = {}
+    for guild_id in guild_store.take_dirty():
+        if guild_id in data["servers"]:
+            payloads[guild_id] = data["servers"][guild_id].to_payload()
+        elif guild_id in raw_servers:
+            # Nothing changes a stored payload in place; a server parsed from
+            # it copies what it keeps (GuildState.from_payload).
+            payloads[guild_id] = raw_servers[guild_id]
+    if payloads:
+        guild_ids = server_ids()
+        jobs.append(lambda: guild_store.write(payloads, guild_ids))
+    reminder_snapshot = reminder_sent.take_snapshot()
+    if reminder_snapshot:
+        jobs.append(lambda: reminder_sent.write(reminder_snapshot))
+    return jobs
+
+
+persistence = WriteBehind(
+    collect_state_writes,
+    SAVE_DELAY,
+    observe=lambda seconds, jobs: metrics.observe("save_seconds", seconds),
+)
+
+
+async def save_data(*guild_ids):
+    guild_store.mark_dirty(*guild_ids)
+    persistence.request()
 
 
 def load_data():
-    global data, legacy_state
+    global data
+    data = {"servers": {}}
+    raw_servers.clear()
+    if SHARD_COUNT:
+        # Every shard shares one store. The first to start writes all servers
+        # from an older layout into it, under the lease lock, before any shard
+        # loads or saves; the others then find their servers already there.
+        with shard_lease.locked():
+            if not guild_store.exists():
+                servers = import_servers()
+                if servers:
+                    guild_store.write(servers, servers)
+        raw_servers.update(guild_store.load())
+        return
+
+    if guild_store.exists():
+        raw_servers.update(guild_store.load())
+        return
+    # Server files from an import that was cut short are simply written again.
+    servers = import_servers()
+    if not servers:
+        raw_servers.update(guild_store.load())
+        return
+    raw_servers.update(servers)
+    guild_store.mark_dirty(*raw_servers)
+
+
+def import_servers():
+    # Every server found in a layout older than guild_store, for any shard.
+    global legacy_state
+    if guild_store is not json_store and json_store.exists():
+        print(f"Importing {json_store.root} into {guild_store.path}.")
+        return GuildStore(json_store.root, TIMEZONE, STORAGE_ENCODING).load()
+
     source_file = DATA_FILE
     if not source_file.exists():
         repo_file = Path("bosses.json")
@@ -254,68 +397,122 @@ def load_data():
             source_file = repo_file
             print(f"{DATA_FILE} not found. Importing existing {repo_file} for first persistent save.")
         else:
-            return
+            return {}
 
     with source_file.open("r", encoding="utf-8") as f:
         payload = json.load(f)
 
     if "servers" not in payload:
-        legacy_state = migrate_old_payload(payload)
-        data = {"servers": {}}
-        return
+        if SHARD_COUNT:
+            # Any process could hand these timers to its first server, so the
+            # pre-multi-server file is only migrated by an unsharded bot.
+            print(f"Not migrating {source_file} in sharded mode; start the bot unsharded once to import it.")
+        else:
+            legacy_state = migrate_old_payload(payload)
+        return {}
 
-    data = {"servers": {}}
-    for guild_id, state in payload.get("servers", {}).items():
-        data["servers"][str(guild_id)] = {
-            "name": state.get("name", "Unknown Discord Server"),
-            "announce_channel_id": state.get("announce_channel_id", DEFAULT_ANNOUNCE_CHANNEL_ID),
-            "status_channel_id": state.get("status_channel_id", DEFAULT_STATUS_CHANNEL_ID),
-            "bosses": parse_bosses(state.get("bosses", {})),
-            "guilds": state.get("guilds", []),
-            "boss_turns": state.get("boss_turns", {}),
-            "boss_current_turn": state.get("boss_current_turn", {}),
-            "maintenance_mode": state.get("maintenance_mode", False),
-            "button_role_id": state.get("button_role_id"),
-        }
+    # Single-file layout: every server is written out to the store.
+    return {str(guild_id): upgrade_server(state, TIMEZONE) for guild_id, state in payload.get("servers", {}).items()}
 
 
 def next_scheduled_spawn(info, after=None):
     after = ensure_aware(after or now_sg())
-    upcoming = []
-
-    for day, time_text in info.get("schedule", []):
-        spawn_time = parse_time_text(time_text)
-        if info.get("is_daily"):
-            for offset in range(0, 8):
-                candidate_date = (after + timedelta(days=offset)).date()
-                candidate = datetime.combine(candidate_date, spawn_time, TIMEZONE)
-                if candidate > after:
-                    upcoming.append(candidate)
-        else:
-            target_day = DAYS[day.lower()]
-            days_ahead = (target_day - after.weekday()) % 7
-            for extra_week in (0, 1):
-                candidate_date = (after + timedelta(days=days_ahead + (extra_week * 7))).date()
-                candidate = datetime.combine(candidate_date, spawn_time, TIMEZONE)
-                if candidate > after:
-                    upcoming.append(candidate)
+    return next_occurrence(info.schedule_table(), after, TIMEZONE)
+
 
-    return min(upcoming) if upcoming else None
+def roll_scheduled_spawn(info, current_time):
+    spawn_at = info.spawn_at
+    if spawn_at is not None and spawn_at > current_time.timestamp() - SCHEDULED_ROLLOVER.total_seconds():
+        return False
+    next_spawn = next_scheduled_spawn(info, current_time)
+    info.spawn_at = int(next_spawn.timestamp()) if next_spawn else None
+    return True
+
+
+def boss_spawn_at(info):
+    # Regular bosses that were never killed have no respawn to remind about.
+    if info.is_scheduled or info.death_at is not None:
+        return info.next_spawn
+    return None
+
+
+def boss_deadlines(info):
+    spawn_at = boss_spawn_at(info)
+    if spawn_at is None:
+        return []
+    deadlines = [(spawn_at - seconds, label, spawn_at) for label, seconds, _ in REMINDERS]
+    deadlines.append((spawn_at, "respawn", spawn_at))
+    if info.is_scheduled:
+        deadlines.append((spawn_at + SCHEDULED_ROLLOVER.total_seconds(), "rollover", spawn_at))
+    return deadlines
+
+
+def schedule_boss(guild_id, boss_name, current_time=None):
+    state = get_state_by_id(guild_id)
+    info = state.bosses.get(boss_name) if state else None
+    if info is None:
+        spawn_scheduler.discard(guild_id, boss_name)
+        return False
+    changed = False
+    if info.is_scheduled:
+        changed = roll_scheduled_spawn(info, current_time or now_sg())
+    spawn_scheduler.schedule(guild_id, boss_name, boss_deadlines(info))
+    return changed
+
+
+def schedule_guild(guild_id):
+    state = get_state_by_id(guild_id)
+    spawn_scheduler.discard_guild(guild_id)
+    if not state:
+        return False
+    current_time = now_sg()
+    changed = False
+    for boss_name in state.bosses:
+        changed = schedule_boss(guild_id, boss_name, current_time) or changed
+    return changed
+
+
+def schedule_raw_guild(guild_id, payload, current_time):
+    # Deadlines only need each boss's spawn time, so an unparsed server is
+    # scheduled from throwaway Boss objects and stays unparsed until a
+    # reminder, command or panel refresh needs it. Rolled scheduled spawns go
+    # into a new payload, since the old one may be being written out.
+    rolled = {}
+    for boss_name, record in payload.get("bosses", {}).items():
+        info = Boss.from_payload(record)
+        if info.is_scheduled and roll_scheduled_spawn(info, current_time):
+            rolled[boss_name] = info.to_payload()
+        spawn_scheduler.schedule(guild_id, boss_name, boss_deadlines(info))
+    if rolled:
+        raw_servers[guild_id] = {**payload, "bosses": {**payload["bosses"], **rolled}}
+        guild_store.mark_dirty(guild_id)
+    return bool(rolled)
+
+
+def schedule_all():
+    spawn_scheduler.clear()
+    current_time = now_sg()
+    changed = False
+    for guild_id in list(data["servers"]):
+        changed = schedule_guild(guild_id) or changed
+    for guild_id, payload in list(raw_servers.items()):
+        changed = schedule_raw_guild(guild_id, payload, current_time) or changed
+    return changed
 
 
 def schedule_text(info):
-    if info.get("is_daily"):
-        return ", ".join(time_text for _, time_text in info.get("schedule", []))
-    return ", ".join(f"{day} {time_text}" for day, time_text in info.get("schedule", []))
+    if info.is_daily:
+        return ", ".join(time_text for _, time_text in info.schedule)
+    return ", ".join(f"{day} {time_text}" for day, time_text in info.schedule)
 
 
 def region_line(info):
-    region = (info.get("region") or "").strip()
+    region = (info.region or "").strip() if info else ""
     return f"\nRegion: **{region}**" if region else ""
 
 
 def plain_region_line(info):
-    region = (info.get("region") or "").strip()
+    region = (info.region or "").strip() if info else ""
     return f"\nRegion: {region}" if region else ""
 
 
@@ -327,26 +524,26 @@ def clean_region(region):
 
 
 def get_current_turn(state, boss_name):
-    turns = state["boss_turns"].get(boss_name, [])
+    turns = state.boss_turns.get(boss_name, [])
     if not turns:
         return None
-    index = state["boss_current_turn"].get(boss_name, 0) % len(turns)
-    state["boss_current_turn"][boss_name] = index
+    index = state.boss_current_turn.get(boss_name, 0) % len(turns)
+    state.boss_current_turn[boss_name] = index
     return turns[index]
 
 
 def advance_turn(state, boss_name):
-    turns = state["boss_turns"].get(boss_name, [])
+    turns = state.boss_turns.get(boss_name, [])
     if not turns:
         return None, None
-    current_index = state["boss_current_turn"].get(boss_name, 0) % len(turns)
+    current_index = state.boss_current_turn.get(boss_name, 0) % len(turns)
     next_index = (current_index + 1) % len(turns)
-    state["boss_current_turn"][boss_name] = next_index
+    state.boss_current_turn[boss_name] = next_index
     return turns[current_index], turns[next_index]
 
 
 def can_use_boss_button(state, member):
-    role_id = state.get("button_role_id")
+    role_id = state.button_role_id
     if not role_id:
         return True
     if getattr(member.guild_permissions, "administrator", False):
@@ -355,210 +552,246 @@ def can_use_boss_button(state, member):
 
 
 def button_role_text(state, guild):
-    role_id = state.get("button_role_id")
+    role_id = state.button_role_id
     if not role_id:
         return "Everyone"
     role = guild.get_role(role_id) if guild else None
     return role.mention if role else f"Role ID {role_id}"
 
 
+def award_points(guild_id, user_id, amount, reason, awarded_by=None):
+    row = points_ledger.award(guild_id, user_id, amount, reason, now_sg(), awarded_by)
+    persistence.submit(lambda: points_ledger.write([row]))
+
+
 async def record_kill(guild_id, boss_name, user, channel):
     state = get_state_by_id(guild_id)
-    if not state or boss_name not in state["bosses"]:
-        await channel.send(f"Boss **{boss_name}** was not found for this Discord server.")
+    if not state or boss_name not in state.bosses:
+        await send_message(channel, PRIORITY_COMMAND, f"Boss **{boss_name}** was not found for this Discord server.")
         return
 
-    boss = state["bosses"][boss_name]
+    boss = state.bosses[boss_name]
     killed_at = now_sg()
-    boss["death_time"] = killed_at
-    boss["killed_by"] = user.id
-
-    log = load_kill_log()
-    server_log = log.setdefault(str(guild_id), {})
-    server_log.setdefault(boss_name, []).append(killed_at.isoformat())
-    save_kill_log(log)
-
-    respawn_at = killed_at + boss.get("respawn_time", timedelta())
+    # Kill points are paid once per spawn. A click on a respawn boss that is
+    # still dead only corrects the time of death, so it earns nothing.
+    killed_spawn = boss.next_spawn
+    still_dead = not boss.is_scheduled and boss.death_at is not None and killed_spawn > killed_at.timestamp()
+    kill_reason = f"kill:{boss_name}@{killed_spawn or 0}"
+    boss.death_at = int(killed_at.timestamp())
+    boss.killed_by = user.id
+
+    kill_record = kill_log.record(guild_id, boss_name, killed_at, user.id)
+    kill_stats.add(guild_id, boss_name, killed_at.timestamp(), user.id)
+    persistence.submit(lambda: kill_log.write(kill_record))
+    if POINTS_PER_KILL and not still_dead and not points_ledger.awarded(guild_id, kill_reason):
+        award_points(guild_id, user.id, POINTS_PER_KILL, kill_reason)
+
+    # Only the respawn this kill starts is re-armed; a scheduled boss's next
+    # spawn doesn't move, and its reminders may already have gone out.
+    respawn_at = boss.death_at + boss.respawn_seconds
     for label, _, _ in REMINDERS:
         reminder_sent.discard(reminder_key(guild_id, boss_name, respawn_at, label))
     reminder_sent.discard(reminder_key(guild_id, boss_name, respawn_at, "respawn"))
+    schedule_boss(guild_id, boss_name)
 
     turn_line = ""
-    if state["maintenance_mode"]:
+    if state.maintenance_mode:
         turn_line = "\nMaintenance mode is ON. Turn tracking was not advanced."
     else:
         current_turn, next_turn = advance_turn(state, boss_name)
         if current_turn:
             turn_line = f"\nCurrent turn: **{current_turn}**\nNext turn: **{next_turn}**"
 
-    await save_data()
-    await channel.send(
+    await save_data(guild_id)
+    await send_message(
+        channel,
+        PRIORITY_COMMAND,
         f"Boss **{boss_name}** marked dead by {user.mention} at "
         f"{killed_at.strftime('%m-%d-%Y %I:%M %p')}.\n"
-        f"{plain_region_line(boss).lstrip() + chr(10) if boss.get('region') else ''}"
-        f"Respawns at: **{respawn_at.strftime('%m-%d-%Y %I:%M %p')}**{turn_line}"
+        f"{plain_region_line(boss).lstrip() + chr(10) if boss.region else ''}"
+        f"Respawns at: **{local_time(boss.next_spawn).strftime('%m-%d-%Y %I:%M %p')}**{turn_line}"
     )
-    await refresh_status_message(guild_id, state)
+    request_status_refresh(guild_id)
 
 
-def make_death_view(guild_id, boss_name):
+BOSS_BUTTON_TEMPLATE = r"boss:(?P<kind>tod|turn|panelturn):(?P<guild_id>[0-9]+):(?P<boss>.+)"
+
+
+def boss_digest(boss_name):
+    return hashlib.sha1(boss_name.encode("utf-8")).hexdigest()[:12]
+
+
+def boss_button_id(kind, guild_id, boss_name):
+    custom_id = f"boss:{kind}:{guild_id}:{boss_name}"
+    if len(custom_id) > 100:
+        custom_id = f"boss:{kind}:{guild_id}:#{boss_digest(boss_name)}"
+    return custom_id
+
+
+def resolve_boss_name(state, token):
+    if not state or token in state.bosses or not token.startswith("#"):
+        return token
+    for boss_name in state.bosses:
+        if boss_digest(boss_name) == token[1:]:
+            return boss_name
+    return token
+
+
+class BossButton(discord.ui.DynamicItem[Button], template=BOSS_BUTTON_TEMPLATE):
+    # Registered once in setup_hook. The server and boss come from the
+    # custom_id, so buttons keep working after a restart and posted messages
+    # don't hold a View in memory.
+    def __init__(self, kind, guild_id, boss_name):
+        if kind == "tod":
+            label, style = f"Time of Death {boss_name}", discord.ButtonStyle.danger
+        else:
+            label, style = f"Next Turn {boss_name}", discord.ButtonStyle.primary
+        super().__init__(Button(label=label[:80], style=style, custom_id=boss_button_id(kind, guild_id, boss_name)))
+        self.kind = kind
+        self.guild_id = guild_id
+        self.boss_name = boss_name
+
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        guild_id = int(match["guild_id"])
+        boss_name = resolve_boss_name(get_state_by_id(guild_id), match["boss"])
+        return cls(match["kind"], guild_id, boss_name)
+
+    async def callback(self, interaction):
+        started = time.perf_counter()
+        try:
+            await boss_button_clicked(interaction, self.kind, self.guild_id, self.boss_name)
+        finally:
+            metrics.observe("button_seconds", time.perf_counter() - started, kind=self.kind)
+
+
+def detached_view(items):
+    # Stopping the view before it is sent keeps discord.py from storing it per
+    # message; clicks are dispatched to BossButton by custom_id instead.
     view = View(timeout=None)
-    button = Button(label=f"Time of Death {boss_name}", style=discord.ButtonStyle.danger)
+    for item in items:
+        view.add_item(item)
+    view.stop()
+    return view
 
-    async def callback(interaction):
-        state = get_state_by_id(guild_id)
-        if not state:
-            await interaction.response.send_message("This Discord server is not configured yet.", ephemeral=True)
-            return
-        if not can_use_boss_button(state, interaction.user):
-            await interaction.response.send_message(
-                f"Only {button_role_text(state, interaction.guild)} can use boss buttons.",
-                ephemeral=True,
-            )
-            return
+
+async def remove_clicked_button(interaction):
+    # Batched reminders carry several boss buttons; only the clicked one goes.
+    custom_id = interaction.data.get("custom_id")
+    view = View.from_message(interaction.message, timeout=None)
+    for item in list(view.children):
+        if getattr(item, "custom_id", None) == custom_id:
+            view.remove_item(item)
+    view.stop()
+    try:
+        await interaction.message.edit(view=view if view.children else None)
+    except discord.HTTPException:
+        pass
+
+
+async def boss_button_clicked(interaction, kind, guild_id, boss_name):
+    state = get_state_by_id(guild_id)
+    if not state:
+        await interaction.response.send_message("This Discord server is not configured yet.", ephemeral=True)
+        return
+    if not can_use_boss_button(state, interaction.user):
+        await interaction.response.send_message(
+            f"Only {button_role_text(state, interaction.guild)} can use boss buttons.",
+            ephemeral=True,
+        )
+        return
+
+    if kind == "tod":
         await interaction.response.defer(ephemeral=True, thinking=True)
         await record_kill(guild_id, boss_name, interaction.user, interaction.channel)
-        try:
-            await interaction.message.edit(view=None)
-        except discord.HTTPException:
-            pass
+        await remove_clicked_button(interaction)
         await interaction.followup.send("Time of death recorded.", ephemeral=True)
+        return
 
-    button.callback = callback
-    view.add_item(button)
-    return view
+    if state.maintenance_mode:
+        await interaction.response.send_message("Maintenance mode is ON. Turn not advanced.", ephemeral=True)
+        return
+    current_turn, next_turn = advance_turn(state, boss_name)
+    if not current_turn:
+        await interaction.response.send_message("No turn order is configured for this boss.", ephemeral=True)
+        return
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    await save_data(guild_id)
+    await send_message(
+        interaction.channel,
+        PRIORITY_COMMAND,
+        f"**{boss_name}** turn advanced by {interaction.user.mention}.\n"
+        f"Previous turn: **{current_turn}**\nCurrent turn: **{next_turn}**"
+    )
+    if kind == "turn":
+        await remove_clicked_button(interaction)
+    request_status_refresh(guild_id)
+    await interaction.followup.send("Turn advanced.", ephemeral=True)
 
 
-def make_next_turn_view(guild_id, boss_name):
-    view = View(timeout=None)
-    button = Button(label=f"Next Turn {boss_name}", style=discord.ButtonStyle.primary)
+def make_respawn_view(guild_id, state, boss_names):
+    items = []
+    for boss_name in boss_names[:25]:
+        info = state.bosses.get(boss_name)
+        items.append(BossButton("turn" if info and info.is_scheduled else "tod", guild_id, boss_name))
+    return detached_view(items)
 
-    async def callback(interaction):
-        state = get_state_by_id(guild_id)
-        if not state:
-            await interaction.response.send_message("This Discord server is not configured yet.", ephemeral=True)
-            return
-        if not can_use_boss_button(state, interaction.user):
-            await interaction.response.send_message(
-                f"Only {button_role_text(state, interaction.guild)} can use boss buttons.",
-                ephemeral=True,
-            )
-            return
-        if state["maintenance_mode"]:
-            await interaction.response.send_message("Maintenance mode is ON. Turn not advanced.", ephemeral=True)
-            return
-        current_turn, next_turn = advance_turn(state, boss_name)
-        if not current_turn:
-            await interaction.response.send_message("No turn order is configured for this boss.", ephemeral=True)
-            return
-        await interaction.response.defer(ephemeral=True, thinking=True)
-        await save_data()
-        await interaction.channel.send(
-            f"**{boss_name}** turn advanced by {interaction.user.mention}.\n"
-            f"Previous turn: **{current_turn}**\nCurrent turn: **{next_turn}**"
-        )
-        try:
-            await interaction.message.edit(view=None)
-        except discord.HTTPException:
-            pass
-        await refresh_status_message(guild_id, state)
-        await interaction.followup.send("Turn advanced.", ephemeral=True)
 
-    button.callback = callback
-    view.add_item(button)
-    return view
+def make_death_view(guild_id, boss_name):
+    return detached_view([BossButton("tod", guild_id, boss_name)])
+
+
+def make_next_turn_view(guild_id, boss_name):
+    return detached_view([BossButton("turn", guild_id, boss_name)])
 
 
 def make_status_turn_view(guild_id, state, rows):
-    view = View(timeout=None)
-    added = 0
+    items = []
     for boss_name, _, _, _ in rows:
-        if boss_name not in state["boss_turns"] or not state["boss_turns"][boss_name]:
+        if boss_name not in state.boss_turns or not state.boss_turns[boss_name]:
             continue
-        if added >= 25:
+        if len(items) >= 25:
             break
-
-        button = Button(
-            label=f"Next Turn {boss_name}"[:80],
-            style=discord.ButtonStyle.primary,
-            custom_id=f"status_next_turn:{guild_id}:{added}",
-        )
-
-        async def callback(interaction, b_name=boss_name):
-            current_state = get_state_by_id(guild_id)
-            if not current_state:
-                await interaction.response.send_message("This Discord server is not configured yet.", ephemeral=True)
-                return
-            if not can_use_boss_button(current_state, interaction.user):
-                await interaction.response.send_message(
-                    f"Only {button_role_text(current_state, interaction.guild)} can use boss buttons.",
-                    ephemeral=True,
-                )
-                return
-            if current_state["maintenance_mode"]:
-                await interaction.response.send_message("Maintenance mode is ON. Turn not advanced.", ephemeral=True)
-                return
-            current_turn, next_turn = advance_turn(current_state, b_name)
-            if not current_turn:
-                await interaction.response.send_message("No turn order is configured for this boss.", ephemeral=True)
-                return
-            await interaction.response.defer(ephemeral=True, thinking=True)
-            await save_data()
-            await interaction.channel.send(
-                f"**{b_name}** turn advanced by {interaction.user.mention}.\n"
-                f"Previous turn: **{current_turn}**\nCurrent turn: **{next_turn}**"
-            )
-            await refresh_status_message(guild_id, current_state)
-            await interaction.followup.send("Turn advanced.", ephemeral=True)
-
-        button.callback = callback
-        view.add_item(button)
-        added += 1
-
-    return view if added else None
+        items.append(BossButton("panelturn", guild_id, boss_name))
+    return detached_view(items) if items else None
 
 
 def boss_rows(state):
+    # Spawn times in the rows are epoch seconds; bosses without one sort last.
     rows = []
     current_time = now_sg()
-    for name, info in state["bosses"].items():
-        if info.get("is_scheduled"):
-            spawn_at = info.get("spawn_time")
-            if not spawn_at or spawn_at <= current_time - timedelta(minutes=30):
-                spawn_at = next_scheduled_spawn(info, current_time)
-                info["spawn_time"] = spawn_at
-            rows.append((name, "Scheduled", spawn_at, schedule_text(info)))
+    for name, info in state.bosses.items():
+        if info.is_scheduled:
+            roll_scheduled_spawn(info, current_time)
+            rows.append((name, "Scheduled", info.next_spawn, schedule_text(info)))
         else:
-            death_time = info.get("death_time")
-            respawn_time = info.get("respawn_time", timedelta())
-            spawn_at = death_time + respawn_time if death_time else info.get("spawn_time")
-            rows.append((name, "Regular", spawn_at, ""))
-    rows.sort(key=lambda row: row[2] or datetime.max.replace(tzinfo=TIMEZONE))
+            rows.append((name, "Regular", info.next_spawn, ""))
+    rows.sort(key=lambda row: float("inf") if row[2] is None else row[2])
     return rows
 
 
 def boss_status_payloads(state, title=None):
-    title = title or f"LordNine Boss Timers - {state.get('name', 'Server')}"
+    title = title or f"LordNine Boss Timers - {state.name}"
     rows = boss_rows(state)
     if not rows:
         return [(discord.Embed(title=title, description="No bosses added yet.", color=discord.Color.blue()), [])]
 
     payloads = []
+    current_epoch = now_sg().timestamp()
     for index in range(0, len(rows), 25):
         embed = discord.Embed(title=title, color=discord.Color.blue())
         row_chunk = rows[index : index + 25]
         for name, boss_type, spawn_at, sched_text in row_chunk:
-            info = state["bosses"].get(name, {})
+            info = state.bosses.get(name)
             turn = get_current_turn(state, name)
             turn_line = f"\nTurn: **{turn}**" if turn else ""
-            if spawn_at:
-                delta = spawn_at - now_sg()
-                status = "Alive" if delta.total_seconds() <= 0 else "Respawning"
+            if spawn_at is not None:
+                status = "Alive" if spawn_at <= current_epoch else "Respawning"
                 value = (
                     f"Type: **{boss_type}**"
                     f"{region_line(info)}\n"
                     f"Status: **{status}**\n"
-                    f"Next: **{spawn_at.strftime('%m-%d-%Y %I:%M %p')}**"
+                    f"Next: **{local_time(spawn_at).strftime('%m-%d-%Y %I:%M %p')}**"
                 )
             else:
                 value = f"Type: **{boss_type}**{region_line(info)}\nNext: **Not set**"
@@ -574,63 +807,110 @@ def boss_status_embeds(state, title=None):
     return [embed for embed, _ in boss_status_payloads(state, title)]
 
 
+def embed_digest(embed, view=None):
+    # The panel's turn buttons are part of what gets edited, so they count.
+    buttons = [item.custom_id for item in view.children] if view else []
+    content = json.dumps([embed.to_dict(), buttons], sort_keys=True)
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+async def find_status_messages(channel):
+    message_ids = []
+    async for message in channel.history(limit=20):
+        if message.author == bot.user and message.embeds:
+            message_ids.append(message.id)
+    message_ids.reverse()
+    return message_ids
+
+
 async def refresh_status_message(guild_id, state=None):
     state = state or get_state_by_id(guild_id)
     if not state:
         return
-    channel_id = state.get("status_channel_id")
+    channel_id = state.status_channel_id
     channel = bot.get_channel(channel_id) if channel_id else None
     if not channel:
         return
-    payloads = boss_status_payloads(state)
-    existing_messages = []
-    async for message in channel.history(limit=20):
-        if message.author == bot.user and message.embeds:
-            existing_messages.append(message)
+    payloads = [
+        (embed, make_status_turn_view(guild_id, state, rows)) for embed, rows in boss_status_payloads(state)
+    ]
+    digests = [embed_digest(embed, view) for embed, view in payloads]
+
+    for attempt in range(2):
+        panel = status_panels.get(str(guild_id))
+        if panel is None or panel["channel_id"] != channel.id:
+            message_ids = await find_status_messages(channel)
+            panel = {"channel_id": channel.id, "message_ids": message_ids, "digests": [None] * len(message_ids)}
+            status_panels[str(guild_id)] = panel
+        try:
+            await update_status_panel(channel, panel, payloads, digests)
+            return
+        except discord.NotFound:
+            # A panel message was deleted by someone else; rescan once.
+            status_panels.pop(str(guild_id), None)
+            if attempt:
+                raise
+
 
-    existing_messages.reverse()
-    for index, (embed, rows) in enumerate(payloads):
-        if index < len(existing_messages):
-            await existing_messages[index].edit(embed=embed, view=None)
+status_refresher = Debouncer(refresh_status_message, PANEL_REFRESH_DELAY)
+
+
+def request_status_refresh(guild_id):
+    status_refresher.request(str(guild_id))
+
+
+async def update_status_panel(channel, panel, payloads, digests):
+    message_ids = panel["message_ids"]
+    for index, (embed, view) in enumerate(payloads):
+        if index < len(message_ids):
+            if panel["digests"][index] == digests[index]:
+                continue
+            message = channel.get_partial_message(message_ids[index])
+            await dispatcher.submit(
+                channel.id,
+                PRIORITY_PANEL,
+                lambda message=message, embed=embed, view=view: message.edit(embed=embed, view=view),
+                collapse_key=("panel", message.id),
+            )
+            panel["digests"][index] = digests[index]
         else:
-            await channel.send(embed=embed)
+            message = await send_message(channel, PRIORITY_PANEL, embed=embed, view=view)
+            message_ids.append(message.id)
+            panel["digests"].append(digests[index])
 
-    for extra_message in existing_messages[len(payloads) :]:
-        await extra_message.delete()
+    for extra_id in message_ids[len(payloads) :]:
+        try:
+            await dispatcher.submit(channel.id, PRIORITY_PANEL, channel.get_partial_message(extra_id).delete)
+        except discord.NotFound:
+            pass
+    del message_ids[len(payloads) :]
+    del panel["digests"][len(payloads) :]
 
 
 def scheduled_spawns_on_date(info, target_date):
-    spawns = []
-    for day, time_text in info.get("schedule", []):
-        spawn_time = parse_time_text(time_text)
-        if info.get("is_daily"):
-            spawns.append(datetime.combine(target_date, spawn_time, TIMEZONE))
-            continue
-        if DAYS[day.lower()] == target_date.weekday():
-            spawns.append(datetime.combine(target_date, spawn_time, TIMEZONE))
-    return spawns
+    return occurrences_on_date(info.schedule_table(), target_date, TIMEZONE)
 
 
 def todays_bosses(state, remaining_only=False):
     current_time = now_sg()
     today = current_time.date()
+    # Regular respawns are compared as epochs; only today's get a datetime.
+    day_start = datetime.combine(today, datetime.min.time(), TIMEZONE).timestamp()
+    day_end = datetime.combine(today + timedelta(days=1), datetime.min.time(), TIMEZONE).timestamp()
+    earliest = current_time.timestamp() if remaining_only else day_start
     rows = []
-    for name, info in state["bosses"].items():
-        if info.get("is_scheduled"):
+    for name, info in state.bosses.items():
+        if info.is_scheduled:
             for spawn_at in scheduled_spawns_on_date(info, today):
                 if not remaining_only or spawn_at >= current_time:
                     rows.append((name, "Scheduled", spawn_at, info))
-        else:
-            death_time = info.get("death_time")
-            if death_time:
-                spawn_at = death_time + info.get("respawn_time", timedelta())
-                if spawn_at.date() == today and (not remaining_only or spawn_at >= current_time):
-                    rows.append((name, "Regular", spawn_at, info))
+        elif info.death_at is not None and earliest <= info.next_spawn < day_end:
+            rows.append((name, "Regular", local_time(info.next_spawn), info))
     rows.sort(key=lambda row: row[2])
     return rows
 
 
-async def send_today_announcement(channel, state, title, remaining_only=False, ping=True):
+async def send_today_announcement(channel, state, title, remaining_only=False, ping=True, priority=PRIORITY_DAILY):
     rows = todays_bosses(state, remaining_only=remaining_only)
     date_text = now_sg().strftime("%A, %B %d, %Y")
     if not rows:
@@ -639,7 +919,7 @@ async def send_today_announcement(channel, state, title, remaining_only=False, p
             description=f"No {'remaining ' if remaining_only else ''}bosses scheduled for today ({date_text}).",
             color=discord.Color.blue(),
         )
-        await channel.send(embed=embed)
+        await send_message(channel, priority, embed=embed)
         return
 
     scheduled_count = sum(1 for _, boss_type, _, _ in rows if boss_type == "Scheduled")
@@ -651,7 +931,7 @@ async def send_today_announcement(channel, state, title, remaining_only=False, p
         embed = discord.Embed(
             title=f"{title}{page_text}",
             description=(
-                f"**Server:** {state.get('name', 'Unknown')}\n"
+                f"**Server:** {state.name}\n"
                 f"**Date:** {date_text}\n"
                 f"**Total:** {len(rows)} spawn(s) | Scheduled: {scheduled_count} | Regular: {regular_count}"
             ),
@@ -660,8 +940,8 @@ async def send_today_announcement(channel, state, title, remaining_only=False, p
         for name, boss_type, spawn_at, info in chunk:
             turn = get_current_turn(state, name)
             lines = []
-            if info.get("region"):
-                lines.append(f"Region: {info['region']}")
+            if info.region:
+                lines.append(f"Region: {info.region}")
             lines.append(f"Respawn: {spawn_at.strftime('%I:%M %p')}")
             if turn:
                 lines.append(f"Turn: {turn}")
@@ -670,7 +950,7 @@ async def send_today_announcement(channel, state, title, remaining_only=False, p
                 value="\n".join(lines),
                 inline=False,
             )
-        await channel.send(content, embed=embed)
+        await send_message(channel, priority, content, embed=embed)
         content = None
 
 
@@ -678,14 +958,15 @@ async def send_today_announcement(channel, state, title, remaining_only=False, p
 @commands.has_permissions(administrator=True)
 async def boss_setup(ctx, announce_channel: discord.TextChannel = None, status_channel: discord.TextChannel = None):
     state = get_state(ctx.guild)
-    state["announce_channel_id"] = (announce_channel or ctx.channel).id
-    state["status_channel_id"] = (status_channel or announce_channel or ctx.channel).id
-    await save_data()
-    await refresh_status_message(ctx.guild.id, state)
+    state.announce_channel_id = (announce_channel or ctx.channel).id
+    state.status_channel_id = (status_channel or announce_channel or ctx.channel).id
+    schedule_guild(ctx.guild.id)
+    await save_data(ctx.guild.id)
+    request_status_refresh(ctx.guild.id)
     await ctx.send(
         f"Boss timer setup saved for **{ctx.guild.name}**.\n"
-        f"Announcements: <#{state['announce_channel_id']}>\n"
-        f"Status panel: <#{state['status_channel_id']}>"
+        f"Announcements: <#{state.announce_channel_id}>\n"
+        f"Status panel: <#{state.status_channel_id}>"
     )
 
 
@@ -693,31 +974,45 @@ async def boss_setup(ctx, announce_channel: discord.TextChannel = None, status_c
 @commands.has_permissions(administrator=True)
 async def boss_button_role(ctx, role: discord.Role = None):
     state = get_state(ctx.guild)
-    state["button_role_id"] = role.id if role else None
-    await save_data()
+    state.button_role_id = role.id if role else None
+    await save_data(ctx.guild.id)
     if role:
         await ctx.send(f"Boss buttons are now limited to {role.mention} and administrators in **{ctx.guild.name}**.")
     else:
         await ctx.send(f"Boss buttons can now be clicked by everyone in **{ctx.guild.name}**.")
 
 
+@bot.command(name="boss_batch")
+@commands.has_permissions(administrator=True)
+async def boss_batch(ctx, mode: str = None):
+    state = get_state(ctx.guild)
+    if mode is None:
+        await ctx.send(f"Batched reminders for **{ctx.guild.name}**: **{'ON' if state.batch_reminders else 'OFF'}**")
+        return
+    if mode.lower() not in ("on", "off"):
+        await ctx.send("Usage: `!boss_batch on` or `!boss_batch off`")
+        return
+    state.batch_reminders = mode.lower() == "on"
+    await save_data(ctx.guild.id)
+    if state.batch_reminders:
+        await ctx.send(f"Reminders due at the same time in **{ctx.guild.name}** are now sent as one message.")
+    else:
+        await ctx.send(f"Reminders in **{ctx.guild.name}** are now sent one message per boss.")
+
+
 @bot.command(name="boss_add", aliases=["add_boss"])
 @commands.has_permissions(administrator=True)
 async def boss_add(ctx, name: str, respawn_hours: float, *, region: str = None):
     state = get_state(ctx.guild)
     region = clean_region(region)
-    state["bosses"][name] = {
-        "spawn_time": now_sg(),
-        "death_time": None,
-        "respawn_time": timedelta(hours=respawn_hours),
-        "killed_by": None,
-        "region": region,
-        "schedule": [],
-        "is_scheduled": False,
-        "is_daily": False,
-    }
-    await save_data()
-    await refresh_status_message(ctx.guild.id, state)
+    state.bosses[name] = Boss(
+        spawn_at=int(now_sg().timestamp()),
+        respawn_seconds=round(respawn_hours * 3600),
+        region=region,
+    )
+    schedule_boss(ctx.guild.id, name)
+    await save_data(ctx.guild.id)
+    request_status_refresh(ctx.guild.id)
     region_text = f"\nRegion: **{region}**" if region else ""
     await ctx.send(f"Boss **{name}** added to **{ctx.guild.name}** with {respawn_hours:g} hour respawn.{region_text}")
 
@@ -727,12 +1022,12 @@ async def boss_add(ctx, name: str, respawn_hours: float, *, region: str = None):
 async def boss_region(ctx, name: str, *, region: str = None):
     state = get_state(ctx.guild)
     region = clean_region(region)
-    if name not in state["bosses"]:
+    if name not in state.bosses:
         await ctx.send(f"Boss **{name}** was not found in **{ctx.guild.name}**.")
         return
-    state["bosses"][name]["region"] = region
-    await save_data()
-    await refresh_status_message(ctx.guild.id, state)
+    state.bosses[name].region = region
+    await save_data(ctx.guild.id)
+    request_status_refresh(ctx.guild.id)
     if region:
         await ctx.send(f"Region for **{name}** set to **{region}**.")
     else:
@@ -743,13 +1038,14 @@ async def boss_region(ctx, name: str, *, region: str = None):
 @commands.has_permissions(administrator=True)
 async def boss_delete(ctx, name: str):
     state = get_state(ctx.guild)
-    if state["bosses"].pop(name, None) is None:
+    if state.bosses.pop(name, None) is None:
         await ctx.send(f"Boss **{name}** was not found in **{ctx.guild.name}**.")
         return
-    state["boss_turns"].pop(name, None)
-    state["boss_current_turn"].pop(name, None)
-    await save_data()
-    await refresh_status_message(ctx.guild.id, state)
+    state.boss_turns.pop(name, None)
+    state.boss_current_turn.pop(name, None)
+    spawn_scheduler.discard(ctx.guild.id, name)
+    await save_data(ctx.guild.id)
+    request_status_refresh(ctx.guild.id)
     await ctx.send(f"Boss **{name}** deleted from **{ctx.guild.name}**.")
 
 
@@ -760,21 +1056,23 @@ async def boss_tod_edit(ctx, name: str = None, *, new_time: str = None):
     if not name or not new_time:
         await ctx.send("Usage: `!boss_tod_edit <boss> <MM-DD-YYYY HH:MM AM/PM>`")
         return
-    if name not in state["bosses"]:
+    if name not in state.bosses:
         await ctx.send(f"Boss **{name}** was not found in **{ctx.guild.name}**.")
         return
-    if state["bosses"][name].get("is_scheduled"):
+    info = state.bosses[name]
+    if info.is_scheduled:
         await ctx.send("Scheduled bosses use their schedule. Time of death only applies to regular bosses.")
         return
     death_time = parse_datetime(new_time)
     if not death_time:
         await ctx.send("Invalid date. Use `MM-DD-YYYY HH:MM AM/PM`, for example `06-20-2026 08:30 PM`.")
         return
-    state["bosses"][name]["death_time"] = death_time
-    state["bosses"][name]["killed_by"] = ctx.author.id
-    await save_data()
-    await refresh_status_message(ctx.guild.id, state)
-    respawn_at = death_time + state["bosses"][name].get("respawn_time", timedelta())
+    info.death_at = int(death_time.timestamp())
+    info.killed_by = ctx.author.id
+    schedule_boss(ctx.guild.id, name)
+    await save_data(ctx.guild.id)
+    request_status_refresh(ctx.guild.id)
+    respawn_at = local_time(info.next_spawn)
     await ctx.send(f"Updated **{name}** TOD for **{ctx.guild.name}**. Respawn: **{respawn_at.strftime('%m-%d-%Y %I:%M %p')}**")
 
 
@@ -819,24 +1117,21 @@ async def boss_add_scheduled(ctx, *, args: str):
         await ctx.send(str(exc))
         return
 
-    info = {
-        "spawn_time": None,
-        "death_time": None,
-        "respawn_time": timedelta(days=1 if not is_weekly else 7),
-        "killed_by": None,
-        "region": None,
-        "schedule": schedule,
-        "is_scheduled": True,
-        "is_daily": not is_weekly,
-    }
-    info["spawn_time"] = next_scheduled_spawn(info, now_sg())
-    state["bosses"][name] = info
-    await save_data()
-    await refresh_status_message(ctx.guild.id, state)
+    info = Boss(
+        respawn_seconds=(7 if is_weekly else 1) * 86400,
+        schedule=schedule,
+        is_scheduled=True,
+        is_daily=not is_weekly,
+    )
+    info.spawn_at = int(next_scheduled_spawn(info, now_sg()).timestamp())
+    state.bosses[name] = info
+    schedule_boss(ctx.guild.id, name)
+    await save_data(ctx.guild.id)
+    request_status_refresh(ctx.guild.id)
     await ctx.send(
         f"Scheduled boss **{name}** added to **{ctx.guild.name}**.\n"
         f"Schedule: {schedule_text(info)}\n"
-        f"Next spawn: **{info['spawn_time'].strftime('%m-%d-%Y %I:%M %p')}**"
+        f"Next spawn: **{local_time(info.spawn_at).strftime('%m-%d-%Y %I:%M %p')}**"
     )
 
 
@@ -850,23 +1145,274 @@ async def boss_status(ctx):
 @bot.command(name="boss_today")
 async def boss_today(ctx):
     state = get_state(ctx.guild)
-    await send_today_announcement(ctx.channel, state, "Today's Boss Schedule", ping=False)
+    await send_today_announcement(ctx.channel, state, "Today's Boss Schedule", ping=False, priority=PRIORITY_COMMAND)
+
+
+def attendance_boss_name(guild_id, state, boss_name):
+    for name in state.bosses:
+        if name.lower() == boss_name.lower():
+            return name
+    return attendance.names_for(guild_id).get(boss_name.lower(), boss_name)
+
+
+@bot.command(name="attendance")
+async def attendance_command(ctx, boss_name: str = None, start: str = None, end: str = None):
+    state = get_state(ctx.guild)
+    if not boss_name:
+        await ctx.send("Usage: `!attendance <boss> [from YYYY-MM-DD] [to YYYY-MM-DD]`")
+        return
+    today = now_sg().date()
+    start_date = parse_date_text(start) if start else today - timedelta(days=6)
+    end_date = parse_date_text(end) if end else today
+    if not start_date or not end_date:
+        await ctx.send("Invalid date. Use `YYYY-MM-DD` or `MM-DD-YYYY`.")
+        return
+    attendance.refresh()
+    name = attendance_boss_name(ctx.guild.id, state, boss_name)
+    days = attendance.query(ctx.guild.id, name, start_date, end_date)
+    total = sum(len(times) for _, times in days)
+    embed = discord.Embed(
+        title=f"Attendance - {name}",
+        description=f"{start_date.isoformat()} to {end_date.isoformat()} | Total: **{total}** | Days: **{len(days)}**",
+        color=discord.Color.blue(),
+    )
+    for day, times in days[-25:]:
+        shown = ", ".join(f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}" for seconds in times[:10])
+        more = f" (+{len(times) - 10} more)" if len(times) > 10 else ""
+        embed.add_field(name=f"{day.strftime('%a %Y-%m-%d')} - {len(times)}", value=shown + more, inline=False)
+    if not days:
+        embed.description += "\nNo attendance recorded in this period."
+    await ctx.send(embed=embed)
+
+
+@bot.command(name="attendance_day")
+async def attendance_day(ctx, day: str = None):
+    state = get_state(ctx.guild)
+    target = parse_date_text(day) if day else now_sg().date()
+    if not target:
+        await ctx.send("Invalid date. Use `YYYY-MM-DD` or `MM-DD-YYYY`.")
+        return
+    attendance.refresh()
+    summary = attendance.day_summary(ctx.guild.id, target)
+    if not summary:
+        await ctx.send(f"No attendance recorded on {target.isoformat()}.")
+        return
+    lines = [
+        f"**{attendance_boss_name(ctx.guild.id, state, key)}**: {count}"
+        for key, count in sorted(summary.items(), key=lambda item: (-item[1], item[0]))
+    ]
+    await ctx.send(f"**Attendance on {target.strftime('%A, %B %d, %Y')}** ({sum(summary.values())} total)\n" + "\n".join(lines[:40]))
+
+
+@bot.command(name="attendance_add")
+async def attendance_add(ctx, boss_name: str):
+    state = get_state(ctx.guild)
+    if not can_use_boss_button(state, ctx.author):
+        await ctx.send(f"Only {button_role_text(state, ctx.guild)} can record attendance.")
+        return
+    name = next((known for known in state.bosses if known.lower() == boss_name.lower()), None)
+    if name is None:
+        await ctx.send(f"Boss **{boss_name}** was not found for this Discord server.")
+        return
+    recorded_at = now_sg()
+    row = attendance.record(ctx.guild.id, name, recorded_at)
+    persistence.submit(lambda: attendance.write(row))
+
+    # Attendance points are paid once per member per kill: the boss's last
+    # recorded kill, if it is within the reconcile tolerance of now.
+    note = ""
+    if POINTS_PER_ATTENDANCE:
+        killed_at = state.bosses[name].death_at
+        reason = f"attendance:{name}@{killed_at}"
+        if killed_at is None or abs(recorded_at.timestamp() - killed_at) > RECONCILE_TOLERANCE * 60:
+            note = f"\nNo points: **{name}** has no recorded kill in the last {RECONCILE_TOLERANCE} minute(s)."
+        elif points_ledger.awarded(ctx.guild.id, reason, ctx.author.id):
+            note = "\nYour points for this kill were already awarded."
+        else:
+            award_points(ctx.guild.id, ctx.author.id, POINTS_PER_ATTENDANCE, reason)
+    await ctx.send(f"Attendance recorded for **{name}** at {recorded_at.strftime('%m-%d-%Y %I:%M %p')}.{note}")
+
+
+@bot.command(name="points")
+@commands.guild_only()
+async def points_command(ctx, member: discord.Member = None):
+    member = member or ctx.author
+    total = points_ledger.total(ctx.guild.id, member.id)
+    rank = points_ledger.rank(ctx.guild.id, member.id)
+    if rank is None:
+        await ctx.send(f"{member.mention} has no points yet in **{ctx.guild.name}**.")
+        return
+    await ctx.send(
+        f"{member.mention} has **{total}** point(s) in **{ctx.guild.name}** "
+        f"(rank {rank} of {points_ledger.members(ctx.guild.id)})."
+    )
+
+
+@bot.command(name="points_top")
+@commands.guild_only()
+async def points_top(ctx, limit: int = 10):
+    limit = max(1, min(limit, 50))
+    top = points_ledger.top(ctx.guild.id, limit)
+    if not top:
+        await ctx.send(f"No points have been awarded in **{ctx.guild.name}** yet.")
+        return
+    lines = [f"{index}. <@{user_id}> - **{total}**" for index, (user_id, total) in enumerate(top, start=1)]
+    embed = discord.Embed(title=f"Points Leaderboard - {ctx.guild.name}", description="\n".join(lines), color=discord.Color.gold())
+    await ctx.send(embed=embed, allowed_mentions=discord.AllowedMentions.none())
+
+
+@bot.command(name="points_award")
+@commands.has_permissions(administrator=True)
+async def points_award(ctx, member: discord.Member, amount: int, *, reason: str = "manual"):
+    if amount == 0:
+        await ctx.send("Amount must not be zero.")
+        return
+    award_points(ctx.guild.id, member.id, amount, reason, ctx.author.id)
+    await ctx.send(
+        f"{'Awarded' if amount > 0 else 'Deducted'} **{abs(amount)}** point(s) "
+        f"{'to' if amount > 0 else 'from'} {member.mention}. "
+        f"New total: **{points_ledger.total(ctx.guild.id, member.id)}**."
+    )
+
+
+@bot.command(name="attendance_reconcile")
+async def attendance_reconcile(ctx, days: int = 7, tolerance: int = RECONCILE_TOLERANCE):
+    state = get_state(ctx.guild)
+    if days < 1 or tolerance < 0:
+        await ctx.send("Usage: `!attendance_reconcile [days] [tolerance minutes]`")
+        return
+    end_date = now_sg().date()
+    start_date = end_date - timedelta(days=days - 1)
+    start = datetime.combine(start_date, datetime.min.time(), TIMEZONE).timestamp()
+    end = datetime.combine(end_date + timedelta(days=1), datetime.min.time(), TIMEZONE).timestamp()
+
+    attendance.refresh()
+    # The SQLite kill log waits for the save worker's lock, so it is read off the loop.
+    kills = reconcile.kill_events(await asyncio.to_thread(kill_log.kills_between, ctx.guild.id, start, end))
+    keys = {name.lower() for name in state.bosses} | {kill[0] for kill in kills}
+    events = list(reconcile.attendance_events(attendance, ctx.guild.id, keys, start_date, end_date, TIMEZONE))
+    names = {**attendance.names_for(ctx.guild.id), **{name.lower(): name for name in state.bosses}}
+    matched, lonely_attendance, lonely_kills = await asyncio.to_thread(
+        reconcile.reconcile, events, kills, tolerance * 60
+    )
+    report = await asyncio.to_thread(
+        reconcile.report_csv, matched, lonely_attendance, lonely_kills, names, TIMEZONE
+    )
+
+    embed = discord.Embed(
+        title=f"Attendance vs Kills (last {days} day{'s' if days != 1 else ''})",
+        description=(
+            f"Matched: **{len(matched)}** | Attendance only: **{len(lonely_attendance)}** | "
+            f"Kills only: **{len(lonely_kills)}**\nTolerance: {tolerance} minute(s)"
+        ),
+        color=discord.Color.blue(),
+    )
+    per_boss = reconcile.summarize(matched, lonely_attendance, lonely_kills)
+    lines = [
+        f"**{names.get(key, key)}**: {counts[0]} matched, {counts[1]} attendance only, {counts[2]} kill only"
+        for key, counts in sorted(per_boss.items(), key=lambda item: (-(item[1][1] + item[1][2]), item[0]))
+    ]
+    if len(lines) > 15:
+        lines = lines[:15] + [f"...and {len(lines) - 15} more"]
+    if lines:
+        embed.add_field(name="Bosses", value="\n".join(lines), inline=False)
+    filename = f"reconcile_{ctx.guild.id}_{start_date.isoformat()}_{end_date.isoformat()}.csv"
+    await ctx.send(embed=embed, file=discord.File(io.BytesIO(report.encode("utf-8")), filename=filename))
+
+
+def format_duration(seconds, signed=False):
+    if seconds is None:
+        return "n/a"
+    sign = ""
+    if signed:
+        sign = "-" if seconds < 0 else "+"
+    minutes = int(round(abs(seconds) / 60))
+    hours, minutes = divmod(minutes, 60)
+    return f"{sign}{hours}h {minutes:02d}m" if hours else f"{sign}{minutes}m"
+
+
+def interval_text(boss_stats, respawn_seconds):
+    if not boss_stats["samples"]:
+        return "No repeat kills in this period."
+    configured = respawn_seconds or None
+    deviation = f" ({format_duration(boss_stats['median'] - configured, signed=True)})" if configured else ""
+    return (
+        f"Configured: {format_duration(configured) if configured else 'Not set'}\n"
+        f"Median: **{format_duration(boss_stats['median'])}**{deviation}\n"
+        f"P10-P90: {format_duration(boss_stats['p10'])} - {format_duration(boss_stats['p90'])}\n"
+        f"Samples: {boss_stats['samples']}"
+    )
+
+
+@bot.command(name="boss_stats")
+async def boss_stats(ctx, boss_name: str = None, days: int = 30):
+    state = get_state(ctx.guild)
+    if boss_name and boss_name.isdigit() and days == 30:
+        boss_name, days = None, int(boss_name)
+    if days < 1:
+        await ctx.send("Days must be at least 1.")
+        return
+    if not kill_stats.is_built(ctx.guild.id):
+        kill_stats.build(ctx.guild.id, kill_log.kills(ctx.guild.id))
+    if boss_name:
+        known = {name.lower(): name for name in list(kill_stats.boss_names(ctx.guild.id)) + list(state.bosses)}
+        if boss_name.lower() not in known:
+            await ctx.send(f"Boss **{boss_name}** was not found in **{ctx.guild.name}**.")
+            return
+        boss_name = known[boss_name.lower()]
+
+    summary = kill_stats.summary(ctx.guild.id, now_sg().date(), days, boss_name)
+    embed = discord.Embed(
+        title=f"Boss Stats - {boss_name or 'All Bosses'} (last {days} day{'s' if days != 1 else ''})",
+        description=f"Kills: **{summary['kills']}** | Per day: **{summary['per_day']:.2f}**",
+        color=discord.Color.blue(),
+    )
+    if boss_name:
+        boss = summary["bosses"].get(boss_name)
+        info = state.bosses.get(boss_name)
+        if boss:
+            embed.add_field(name="Respawn interval", value=interval_text(boss, info.respawn_seconds if info else None), inline=False)
+    elif summary["bosses"]:
+        lines = []
+        ranked = sorted(summary["bosses"].items(), key=lambda item: -item[1]["kills"])
+        for name, boss in ranked[:15]:
+            line = f"**{name}**: {boss['kills']} kill(s)"
+            info = state.bosses.get(name)
+            if boss["samples"]:
+                line += f", median {format_duration(boss['median'])}"
+                if info and info.respawn_seconds:
+                    line += f" ({format_duration(boss['median'] - info.respawn_seconds, signed=True)})"
+            lines.append(line)
+        if len(ranked) > 15:
+            lines.append(f"...and {len(ranked) - 15} more")
+        embed.add_field(name="Bosses", value="\n".join(lines), inline=False)
+    if summary["busiest_hours"]:
+        embed.add_field(
+            name="Busiest hours",
+            value="\n".join(f"{hour:02d}:00-{(hour + 1) % 24:02d}:00 ({count})" for hour, count in summary["busiest_hours"]),
+            inline=True,
+        )
+    if summary["top_killers"]:
+        embed.add_field(
+            name="Top killers",
+            value="\n".join(f"<@{user_id}> ({count})" for user_id, count in summary["top_killers"]),
+            inline=True,
+        )
+    await ctx.send(embed=embed)
 
 
 @bot.command(name="boss_alive")
 async def boss_alive(ctx):
     state = get_state(ctx.guild)
-    current_time = now_sg()
+    current_epoch = now_sg().timestamp()
     alive = []
-    for name, info in state["bosses"].items():
-        if info.get("is_scheduled"):
-            spawn_at = info.get("spawn_time")
-            if spawn_at and spawn_at <= current_time <= spawn_at + timedelta(minutes=30):
-                alive.append(name)
-        else:
-            death_time = info.get("death_time")
-            if not death_time or current_time >= death_time + info.get("respawn_time", timedelta()):
+    for name, info in state.bosses.items():
+        if info.is_scheduled:
+            spawn_at = info.spawn_at
+            if spawn_at is not None and spawn_at <= current_epoch <= spawn_at + 30 * 60:
                 alive.append(name)
+        elif info.death_at is None or current_epoch >= info.next_spawn:
+            alive.append(name)
     await ctx.send("Alive bosses: " + (", ".join(alive) if alive else "None"))
 
 
@@ -874,27 +1420,27 @@ async def boss_alive(ctx):
 @commands.has_permissions(administrator=True)
 async def guild_add(ctx, *, guild_name: str):
     state = get_state(ctx.guild)
-    if guild_name not in state["guilds"]:
-        state["guilds"].append(guild_name)
-        await save_data()
+    if guild_name not in state.guilds:
+        state.guilds.append(guild_name)
+        await save_data(ctx.guild.id)
     await ctx.send(f"Guild **{guild_name}** added to **{ctx.guild.name}**.")
 
 
 @bot.command(name="guild_list")
 async def guild_list(ctx):
     state = get_state(ctx.guild)
-    await ctx.send("Guilds: " + (", ".join(state["guilds"]) if state["guilds"] else "None"))
+    await ctx.send("Guilds: " + (", ".join(state.guilds) if state.guilds else "None"))
 
 
 @bot.command(name="guild_delete")
 @commands.has_permissions(administrator=True)
 async def guild_delete(ctx, *, guild_name: str):
     state = get_state(ctx.guild)
-    if guild_name in state["guilds"]:
-        state["guilds"].remove(guild_name)
-    for boss_name, turns in list(state["boss_turns"].items()):
-        state["boss_turns"][boss_name] = [turn for turn in turns if turn != guild_name]
-    await save_data()
+    if guild_name in state.guilds:
+        state.guilds.remove(guild_name)
+    for boss_name, turns in list(state.boss_turns.items()):
+        state.boss_turns[boss_name] = [turn for turn in turns if turn != guild_name]
+    await save_data(ctx.guild.id)
     await ctx.send(f"Guild **{guild_name}** deleted from **{ctx.guild.name}**.")
 
 
@@ -902,16 +1448,16 @@ async def guild_delete(ctx, *, guild_name: str):
 @commands.has_permissions(administrator=True)
 async def set_boss_turns(ctx, boss_name: str, *guild_order):
     state = get_state(ctx.guild)
-    if boss_name not in state["bosses"]:
+    if boss_name not in state.bosses:
         await ctx.send(f"Boss **{boss_name}** was not found in **{ctx.guild.name}**.")
         return
     if not guild_order:
         await ctx.send("Add at least one guild name.")
         return
-    state["boss_turns"][boss_name] = list(guild_order)
-    state["boss_current_turn"][boss_name] = 0
-    await save_data()
-    await refresh_status_message(ctx.guild.id, state)
+    state.boss_turns[boss_name] = list(guild_order)
+    state.boss_current_turn[boss_name] = 0
+    await save_data(ctx.guild.id)
+    request_status_refresh(ctx.guild.id)
     await ctx.send(f"Turn order for **{boss_name}** in **{ctx.guild.name}**: " + " -> ".join(guild_order))
 
 
@@ -926,10 +1472,10 @@ async def check_turn(ctx, boss_name: str):
 @commands.has_permissions(administrator=True)
 async def clear_boss_turns(ctx, boss_name: str):
     state = get_state(ctx.guild)
-    state["boss_turns"].pop(boss_name, None)
-    state["boss_current_turn"].pop(boss_name, None)
-    await save_data()
-    await refresh_status_message(ctx.guild.id, state)
+    state.boss_turns.pop(boss_name, None)
+    state.boss_current_turn.pop(boss_name, None)
+    await save_data(ctx.guild.id)
+    request_status_refresh(ctx.guild.id)
     await ctx.send(f"Turn order cleared for **{boss_name}** in **{ctx.guild.name}**.")
 
 
@@ -937,8 +1483,8 @@ async def clear_boss_turns(ctx, boss_name: str):
 @commands.has_permissions(administrator=True)
 async def maintenance_on(ctx):
     state = get_state(ctx.guild)
-    state["maintenance_mode"] = True
-    await save_data()
+    state.maintenance_mode = True
+    await save_data(ctx.guild.id)
     await ctx.send(f"Maintenance mode is ON for **{ctx.guild.name}**. Boss timers continue, but turns will not advance.")
 
 
@@ -946,29 +1492,155 @@ async def maintenance_on(ctx):
 @commands.has_permissions(administrator=True)
 async def maintenance_off(ctx):
     state = get_state(ctx.guild)
-    state["maintenance_mode"] = False
-    await save_data()
+    state.maintenance_mode = False
+    await save_data(ctx.guild.id)
     await ctx.send(f"Maintenance mode is OFF for **{ctx.guild.name}**. Turn tracking will advance normally.")
 
 
 @bot.command(name="maintenance_status")
 async def maintenance_status(ctx):
     state = get_state(ctx.guild)
-    await ctx.send(f"Maintenance mode for **{ctx.guild.name}**: **{'ON' if state['maintenance_mode'] else 'OFF'}**")
+    await ctx.send(f"Maintenance mode for **{ctx.guild.name}**: **{'ON' if state.maintenance_mode else 'OFF'}**")
 
 
 @bot.command(name="boss_storage")
 @commands.has_permissions(administrator=True)
 async def boss_storage(ctx):
     boss_file = storage_status(DATA_FILE)
-    kill_file = storage_status(KILL_LOG_FILE)
+    server_file = storage_status(guild_store.path)
+    kill_file = storage_status(kill_log.path)
+    if SHARD_COUNT:
+        shards_line = f"Shards: **{shard_lease.name}** | Lease held: **{shard_lease.held()}** | Servers owned: **{len(server_ids())}**"
+    else:
+        shards_line = f"Shards: **unsharded** | Servers: **{len(server_ids())}**"
     await ctx.send(
         "**Boss Timer Storage**\n"
-        f"Boss data: `{boss_file['path']}`\n"
+        f"Server data: `{server_file['path']}`\n"
+        f"Server data exists: **{server_file['exists']}** | Writable: **{server_file['writable']}**\n"
+        f"Boss data (import): `{boss_file['path']}`\n"
         f"Boss data exists: **{boss_file['exists']}** | Writable: **{boss_file['writable']}**\n"
         f"Kill log: `{kill_file['path']}`\n"
-        f"Kill log exists: **{kill_file['exists']}** | Writable: **{kill_file['writable']}**"
+        f"Kill log exists: **{kill_file['exists']}** | Writable: **{kill_file['writable']}**\n"
+        f"{shards_line}"
+    )
+
+
+@bot.command(name="boss_queue")
+@commands.has_permissions(administrator=True)
+async def boss_queue(ctx):
+    stats = dispatcher.stats()
+    depth = " | ".join(f"{name}: **{count}**" for name, count in stats["depth"].items())
+    waits = "\n".join(
+        f"{name}: {wait['count']} sent, avg wait {wait['avg']:.2f}s, max {wait['max']:.2f}s"
+        for name, wait in stats["waits"].items()
+    )
+    await ctx.send(
+        "**Outbound Message Queue**\n"
+        f"Queued: {depth}\n"
+        f"Active channels: **{stats['channels']}** | Collapsed panel edits: **{stats['collapsed']}**\n"
+        f"{waits}"
+    )
+
+
+def histogram_line(name, histogram):
+    return (
+        f"`{name}` {histogram.count} | p50 <= {format_seconds(histogram.quantile(0.5))} | "
+        f"p95 <= {format_seconds(histogram.quantile(0.95))} | max {format_seconds(histogram.max)}"
+    )
+
+
+def format_seconds(value):
+    if value is None:
+        return "-"
+    return f"{value * 1000:.0f}ms" if value < 1 else f"{value:.1f}s"
+
+
+def register_gauges():
+    metrics.gauge("servers", lambda: len(data["servers"]) + len(raw_servers), "Servers with saved state")
+    metrics.gauge("unparsed_servers", lambda: len(raw_servers), "Servers not yet parsed since startup")
+    metrics.gauge("bosses", lambda: sum(len(state.bosses) for state in list(data["servers"].values())), "Tracked bosses in parsed servers")
+    metrics.gauge("startup_seconds", lambda: dict(startup_timings), "Seconds from process start to each startup milestone")
+    metrics.gauge("scheduled_deadlines", lambda: len(spawn_scheduler), "Live reminder deadlines")
+    metrics.gauge("sent_reminder_keys", lambda: len(reminder_sent), "Entries in the sent-reminder store")
+    metrics.gauge("kill_log_records", lambda: kill_log.count, "Kill log records in memory")
+    metrics.gauge("status_panels", lambda: len(status_panels), "Cached status panels")
+    metrics.gauge("dirty_servers", lambda: len(guild_store.dirty), "Servers waiting to be saved")
+    metrics.gauge("attendance_rows", lambda: attendance.count, "Indexed attendance rows")
+    metrics.gauge("points_awards", lambda: points_ledger.count, "Points ledger rows")
+    metrics.gauge("dispatch_queue", dispatcher.depth, "Queued outbound messages by priority")
+    metrics.gauge("reminders_sent", lambda: notification_lateness["sent"], "Reminders sent since start")
+
+
+register_gauges()
+
+
+@bot.command(name="boss_metrics")
+@commands.has_permissions(administrator=True)
+async def boss_metrics(ctx):
+    embed = discord.Embed(title="Bot Metrics", color=discord.Color.blue())
+    sections = (
+        ("Commands", "command_seconds", "command"),
+        ("Buttons", "button_seconds", "kind"),
+        ("Loop ticks", "tick_seconds", "loop"),
+        ("Loop lateness", "tick_lateness_seconds", "loop"),
     )
+    for title, name, label in sections:
+        items = sorted(metrics.histogram_items(name), key=lambda item: -item[1].count)
+        if items:
+            lines = [histogram_line(labels[label], histogram) for labels, histogram in items[:10]]
+            embed.add_field(name=title, value="\n".join(lines), inline=False)
+
+    other = []
+    for title, name in (("Saves", "save_seconds"), ("Reminder lateness", "reminder_lateness_seconds")):
+        for _, histogram in metrics.histogram_items(name):
+            other.append(histogram_line(title, histogram))
+    if other:
+        embed.add_field(name="Saves and reminders", value="\n".join(other), inline=False)
+
+    requests_by_route = {}
+    for labels, value in metrics.counter_items("discord_requests_total"):
+        route = f"{labels['method']} {labels['route']}"
+        requests_by_route[route] = requests_by_route.get(route, 0) + value
+    if requests_by_route:
+        ranked = sorted(requests_by_route.items(), key=lambda item: -item[1])[:8]
+        embed.add_field(name="Discord API calls", value="\n".join(f"`{route}` {count}" for route, count in ranked), inline=False)
+
+    gauges = metrics.read_gauges()
+    queue = gauges.pop("dispatch_queue", {})
+    startup = gauges.pop("startup_seconds", {})
+    sizes = "\n".join(f"{name.replace('_', ' ')}: **{value}**" for name, value in gauges.items())
+    sizes += "\nqueued messages: " + ", ".join(f"{name} **{count}**" for name, count in queue.items())
+    embed.add_field(name="In memory", value=sizes, inline=False)
+    if startup:
+        lines = [f"{name.replace('_', ' ')}: **{seconds:.2f}s**" for name, seconds in startup.items()]
+        embed.add_field(name="Startup", value="\n".join(lines), inline=False)
+    if METRICS_PORT:
+        embed.set_footer(text=f"Prometheus endpoint: http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+    await ctx.send(embed=embed)
+
+
+@bot.command(name="boss_profile")
+@commands.has_permissions(administrator=True)
+async def boss_profile(ctx, seconds: int = 30, mode: str = "sample"):
+    global profile_session
+    if profile_session:
+        await ctx.send("A profiling session is already running.")
+        return
+    mode = mode.lower()
+    if mode not in ("sample", "cprofile") or not 1 <= seconds <= PROFILE_MAX_SECONDS:
+        await ctx.send(f"Usage: `!boss_profile [seconds 1-{PROFILE_MAX_SECONDS}] [sample|cprofile]`")
+        return
+
+    profile_session = ProfileSession(mode)
+    started_at = now_sg()
+    await ctx.send(f"Profiling the bot for **{seconds}s** ({mode}). The report will be posted here.")
+    try:
+        await profile_session.run(seconds)
+        report = profile_session.report(f"Boss bot profile - started {started_at.strftime('%m-%d-%Y %I:%M:%S %p')}")
+    finally:
+        profile_session = None
+    filename = f"boss_profile_{started_at.strftime('%Y%m%d_%H%M%S')}.txt"
+    await ctx.send("Profile finished.", file=discord.File(io.BytesIO(report.encode("utf-8")), filename=filename))
 
 
 @bot.command(name="help")
@@ -980,7 +1652,9 @@ async def help_command(ctx):
             "`!boss_setup #announce-channel #status-channel`\n"
             "`!boss_button_role @role` - restrict TOD/Next Turn buttons\n"
             "`!boss_button_role` - allow everyone to click buttons\n"
-            "`!boss_storage`"
+            "`!boss_batch on|off` - one reminder message per tick\n"
+            "`!boss_storage`, `!boss_queue`, `!boss_metrics`\n"
+            "`!boss_profile [seconds] [sample|cprofile]` - profile the bot and attach a hot-function report"
         ),
         inline=False,
     )
@@ -994,7 +1668,8 @@ async def help_command(ctx):
             "`!boss_tod_edit <name> <MM-DD-YYYY HH:MM AM/PM>`\n"
             "`!boss_add_schedule <name> <time...>`\n"
             "`!boss_add_schedule <name> <day time...>`\n"
-            "`!boss_status`, `!boss_today`, `!boss_alive`"
+            "`!boss_status`, `!boss_today`, `!boss_alive`\n"
+            "`!boss_stats [boss] [days]`"
         ),
         inline=False,
     )
@@ -1007,6 +1682,23 @@ async def help_command(ctx):
         ),
         inline=False,
     )
+    embed.add_field(
+        name="Points",
+        value=(
+            "`!points [@member]` - Show points and rank\n"
+            "`!points_top [n]` - Show the leaderboard\n"
+            "`!points_award @member <amount> [reason]` - Award or deduct points (admin)"
+        ),
+        inline=False,
+    )
+    embed.add_field(
+        name="Attendance",
+        value=(
+            "`!attendance <boss> [from] [to]`, `!attendance_day [date]`, `!attendance_add <boss>`\n"
+            "`!attendance_reconcile [days] [tolerance minutes]` - Match attendance to recorded kills (CSV attached)"
+        ),
+        inline=False,
+    )
     embed.add_field(
         name="Maintenance",
         value="`!maintenance_on`, `!maintenance_off`, `!maintenance_status`",
@@ -1016,58 +1708,183 @@ async def help_command(ctx):
     await ctx.send(embed=embed)
 
 
-@tasks.loop(seconds=10)
-async def boss_respawn_notifications():
-    current_time = now_sg()
+def record_lateness(deadline):
+    # Deadlines come from the spawn scheduler, so lateness uses its clock.
+    lateness = max(spawn_scheduler.clock() - deadline, 0.0)
+    # Milestones belong to a real startup; benchmarks send without run_bot.
+    if "loaded" in startup_timings and "first_reminder" not in startup_timings:
+        mark_startup("first_reminder")
+    metrics.observe("reminder_lateness_seconds", lateness)
+    notification_lateness["sent"] += 1
+    notification_lateness["max"] = max(notification_lateness["max"], lateness)
+    return lateness
 
-    for guild_id, state in list(data["servers"].items()):
-        channel_id = state.get("announce_channel_id")
-        channel = bot.get_channel(channel_id) if channel_id else None
-        if not channel:
+
+def retry_reminder(guild_id, boss_name, label, spawn_at, key, deadline, exc):
+    attempts = send_retries.get(key, (0,))[0] + 1
+    if attempts >= REMINDER_RETRY_ATTEMPTS:
+        send_retries.pop(key, None)
+        print(f"Giving up on the {label} reminder for {boss_name} in server {guild_id}: {exc!r}")
+        return
+    delay = min(REMINDER_RETRY_BASE * 2 ** (attempts - 1), REMINDER_RETRY_MAX)
+    print(f"Sending the {label} reminder for {boss_name} in server {guild_id} failed ({exc!r}); retrying in {delay:.0f}s.")
+    cutoff = spawn_scheduler.clock() - REMINDER_TTL.total_seconds()
+    for stale in [stale for stale, entry in send_retries.items() if entry[2] < cutoff]:
+        del send_retries[stale]
+    send_retries[key] = (attempts, deadline, spawn_at)
+    spawn_scheduler.retry(guild_id, boss_name, label, spawn_at, spawn_scheduler.clock() + delay)
+
+
+def reminder_delivered(key, deadline):
+    reminder_sent.add(key)
+    send_retries.pop(key, None)
+    return record_lateness(deadline)
+
+
+async def notify_guild(guild_id, due, current_time):
+    state = get_state_by_id(guild_id)
+    if not state:
+        return
+    channel_id = state.announce_channel_id
+    channel = bot.get_channel(channel_id) if channel_id else None
+
+    pending = []
+    current_epoch = current_time.timestamp()
+    for _, boss_name, label, spawn_at, deadline in due:
+        info = state.bosses.get(boss_name)
+        if info is None:
             continue
 
-        changed = False
-        for boss_name, info in list(state["bosses"].items()):
-            if info.get("is_scheduled"):
-                spawn_at = info.get("spawn_time")
-                if not spawn_at or spawn_at <= current_time - timedelta(minutes=30):
-                    info["spawn_time"] = next_scheduled_spawn(info, current_time)
-                    spawn_at = info["spawn_time"]
-                    changed = True
-                if not spawn_at:
-                    continue
-            else:
-                death_time = info.get("death_time")
-                if not death_time:
-                    continue
-                spawn_at = death_time + info.get("respawn_time", timedelta())
+        if label == "rollover":
+            if schedule_boss(guild_id, boss_name, current_time):
+                await save_data(guild_id)
+                request_status_refresh(guild_id)
+            continue
 
-            seconds_until = (spawn_at - current_time).total_seconds()
-            turn = get_current_turn(state, boss_name)
-            turn_line = f"\nCurrent turn: **{turn}**" if turn else ""
+        key = reminder_key(guild_id, boss_name, spawn_at, label)
+        # A retried reminder keeps its original deadline for the lateness stats.
+        deadline = send_retries.get(key, (0, deadline))[1]
+        if (
+            not channel
+            or key in reminder_sent
+            or spawn_at < current_epoch - REMINDER_TTL.total_seconds()
+            or (label != "respawn" and spawn_at <= current_epoch)
+        ):
+            send_retries.pop(key, None)
+            continue
+        pending.append((key, deadline, boss_name, label, info, get_current_turn(state, boss_name), spawn_at))
 
-            for label, seconds, label_text in REMINDERS:
-                key = reminder_key(guild_id, boss_name, spawn_at, label)
-                if 0 < seconds_until <= seconds and key not in reminder_sent:
-                    await channel.send(
-                        f"@everyone **{boss_name}** will respawn in **{label_text}**!"
+    if state.batch_reminders and len(pending) > 1:
+        worst = await send_batched_reminders(channel, guild_id, state, pending)
+    else:
+        worst = 0.0
+        for key, deadline, boss_name, label, info, turn, spawn_at in pending:
+            turn_line = f"\nCurrent turn: **{turn}**" if turn else ""
+            try:
+                if label == "respawn":
+                    view = make_next_turn_view(guild_id, boss_name) if info.is_scheduled else make_death_view(guild_id, boss_name)
+                    await send_message(
+                        channel,
+                        PRIORITY_RESPAWN,
+                        f"@everyone **{boss_name}** has respawned! Time to hunt!"
+                        f"{plain_region_line(info)}{turn_line}",
+                        view=view,
+                    )
+                else:
+                    await send_message(
+                        channel,
+                        PRIORITY_RESPAWN,
+                        f"@everyone **{boss_name}** will respawn in **{REMINDER_TEXT[label]}**!"
                         f"{plain_region_line(info)}{turn_line}"
                     )
-                    reminder_sent.add(key)
-
-            respawn_key = reminder_key(guild_id, boss_name, spawn_at, "respawn")
-            if seconds_until <= 0 and respawn_key not in reminder_sent:
-                view = make_next_turn_view(guild_id, boss_name) if info.get("is_scheduled") else make_death_view(guild_id, boss_name)
-                await channel.send(
-                    f"@everyone **{boss_name}** has respawned! Time to hunt!"
-                    f"{plain_region_line(info)}{turn_line}",
-                    view=view,
-                )
-                reminder_sent.add(respawn_key)
+            except Exception as exc:
+                retry_reminder(guild_id, boss_name, label, spawn_at, key, deadline, exc)
+                continue
+            worst = max(worst, reminder_delivered(key, deadline))
+    if worst > 5:
+        print(f"Reminders for server {guild_id} delivered {worst:.1f}s late at worst.")
+
+
+async def send_batched_reminders(channel, guild_id, state, pending):
+    # One ping per tick; fields and buttons are split across messages only
+    # when a message would exceed Discord's 25 field / 25 component limits.
+    # A page that fails to send is retried on its own later.
+    content = "@everyone"
+    worst = 0.0
+    for index in range(0, len(pending), 25):
+        chunk = pending[index : index + 25]
+        page_text = f" (Page {(index // 25) + 1})" if len(pending) > 25 else ""
+        embed = discord.Embed(title=f"Boss Reminders{page_text}", color=discord.Color.gold())
+        respawned = []
+        for _, _, boss_name, label, info, turn, _ in chunk:
+            if label == "respawn":
+                lines = ["**Respawned!** Time to hunt!"]
+                respawned.append(boss_name)
+            else:
+                lines = [f"Respawns in **{REMINDER_TEXT[label]}**"]
+            if info.region:
+                lines.append(f"Region: {info.region}")
+            if turn:
+                lines.append(f"Turn: {turn}")
+            embed.add_field(name=boss_name, value="\n".join(lines), inline=False)
+        view = make_respawn_view(guild_id, state, respawned) if respawned else None
+        try:
+            await send_message(channel, PRIORITY_RESPAWN, content, embed=embed, view=view)
+        except Exception as exc:
+            for key, deadline, boss_name, label, _, _, spawn_at in chunk:
+                retry_reminder(guild_id, boss_name, label, spawn_at, key, deadline, exc)
+            continue
+        content = None
+        for key, deadline, _, _, _, _, _ in chunk:
+            worst = max(worst, reminder_delivered(key, deadline))
+    return worst
+
+
+async def notify_due(guild_id, due):
+    await notify_guild(guild_id, due, now_sg())
+    await save_data()
 
-        if changed:
-            await save_data()
-            await refresh_status_message(guild_id, state)
+
+# Each server's reminders go out in their own task, so one slow or failing
+# channel doesn't hold up the next tick's reminders for the other servers.
+notifier = KeyedTasks(notify_due, NOTIFY_CONCURRENCY)
+lingering_reminders = {}
+
+
+def record_tick(loop_name, started, lateness):
+    metrics.observe("tick_seconds", time.perf_counter() - started, loop=loop_name)
+    metrics.observe("tick_lateness_seconds", lateness, loop=loop_name)
+    if profile_session:
+        profile_session.record_tick(loop_name, lateness)
+
+
+@tasks.loop()
+async def boss_respawn_notifications():
+    due = await spawn_scheduler.wait_due()
+    if not lease_held():
+        # The lease is about to lapse; these servers' next owner sends them.
+        return
+    started = time.perf_counter()
+    lateness = max(0.0, spawn_scheduler.clock() - min(entry[4] for entry in due))
+
+    by_guild = {}
+    for entry in due:
+        by_guild.setdefault(entry[0], []).append(entry)
+    # Servers that batch hold their reminders for the window so deadlines
+    # just behind these share the message; everyone else is sent right away.
+    for guild_id, entries in by_guild.items():
+        if guild_id in lingering_reminders:
+            lingering_reminders[guild_id].extend(entries)
+        elif NOTIFY_BATCH_WINDOW > 0 and batches_reminders(guild_id):
+            lingering_reminders[guild_id] = entries
+            asyncio.get_running_loop().call_later(NOTIFY_BATCH_WINDOW, send_lingering, guild_id)
+        else:
+            notifier.submit(guild_id, entries)
+    record_tick("respawn", started, lateness)
+
+
+def send_lingering(guild_id):
+    notifier.submit(guild_id, lingering_reminders.pop(guild_id))
 
 
 @boss_respawn_notifications.before_loop
@@ -1077,17 +1894,31 @@ async def before_boss_respawn_notifications():
 
 @tasks.loop(minutes=1)
 async def daily_announcement():
-    current_time = now_sg()
+    started = time.perf_counter()
+    scheduled = loop_ticks.get("daily")
+    loop_ticks["daily"] = daily_announcement.next_iteration
+    lateness = max(0.0, (discord.utils.utcnow() - scheduled).total_seconds()) if scheduled else 0.0
+    try:
+        await send_daily_announcements(now_sg())
+    finally:
+        record_tick("daily", started, lateness)
+
+
+async def send_daily_announcements(current_time):
     if not ((current_time.hour == 0 and current_time.minute == 0) or (current_time.hour == 8 and current_time.minute == 0)):
         return
+    if not lease_held():
+        return
 
-    for guild_id, state in list(data["servers"].items()):
-        key = (str(guild_id), current_time.date().isoformat(), current_time.hour)
-        if key in daily_announcements_sent:
+    for guild_id in server_ids():
+        state = loaded_state(guild_id)
+        key = reminder_key(guild_id, "", current_time.replace(minute=0, second=0, microsecond=0).timestamp(), "daily")
+        if key in reminder_sent:
             continue
-        daily_announcements_sent.add(key)
+        reminder_sent.add(key)
+        persistence.request()
 
-        channel_id = state.get("announce_channel_id")
+        channel_id = state.announce_channel_id
         channel = bot.get_channel(channel_id) if channel_id else None
         if not channel:
             continue
@@ -1128,12 +1959,19 @@ async def on_message(message):
 
 @bot.event
 async def on_ready():
+    # on_ready fires again after gateway reconnects. State was loaded once in
+    # run_bot and may hold unsaved changes, so it is never reloaded here.
     print(f"Bot logged in as {bot.user}")
-    load_data()
+    first_ready = "ready" not in startup_timings
+    if first_ready:
+        mark_startup("ready")
 
     # Create a server state for every Discord server where the bot is installed.
+    known = set(server_ids())
     for guild in bot.guilds:
-        get_state(guild)
+        if str(guild.id) not in known:
+            get_state(guild)
+            schedule_guild(guild.id)
     await save_data()
 
     if not boss_respawn_notifications.is_running():
@@ -1141,11 +1979,85 @@ async def on_ready():
     if not daily_announcement.is_running():
         daily_announcement.start()
 
-    for guild in bot.guilds:
-        await refresh_status_message(guild.id, get_state(guild))
+    if first_ready:
+        asyncio.get_running_loop().create_task(refresh_all_panels([guild.id for guild in bot.guilds]))
+
+
+def mark_startup(milestone):
+    startup_timings[milestone] = time.time() - PROCESS_STARTED
+    print(f"Startup: {milestone.replace('_', ' ')} after {startup_timings[milestone]:.2f}s")
+
+
+async def refresh_all_panels(guild_ids):
+    await fan_out(
+        {guild_id: None for guild_id in guild_ids},
+        lambda guild_id, _: status_refresher.run_now(str(guild_id)),
+        STARTUP_REFRESH_CONCURRENCY,
+    )
+    mark_startup("panels_refreshed")
+
+
+def reminder_files():
+    # Reminder files saved under any shard layout, including the unsharded one.
+    pattern = f"{REMINDER_FILE.stem}*{REMINDER_FILE.suffix}"
+    return [path for path in sorted(REMINDER_FILE.parent.glob(pattern)) if path != reminder_sent.path]
+
+
+def lease_lost():
+    print(f"Lost the lease for shards {shard_lease.name}; shutting down so their next owner can take over.")
+    asyncio.get_running_loop().create_task(bot.close())
+
+
+async def run_bot():
+    # The lease comes first: state and sent reminders are only loaded once the
+    # previous owner of these servers has saved them and let go.
+    lease_task = None
+    if SHARD_COUNT:
+        await shard_lease.acquire()
+        lease_task = asyncio.get_running_loop().create_task(shard_lease.keep(lease_lost))
+        mark_startup("lease")
+    load_data()
+    if schedule_all():
+        guild_store.mark_dirty(*data["servers"])
+    mark_startup("loaded")
+    if SHARD_COUNT:
+        # Shard groups that don't overlap start together; only one migrates
+        # the shared kill log, and the rest find it done.
+        with shard_lease.locked():
+            kill_log.migrate()
+    kill_log.load()
+    reminder_sent.load(reminder_files())
+    attendance.load()
+    if attendance.unassigned:
+        print(
+            f"Left out {attendance.unassigned} attendance row(s) recorded before rows carried a server id; "
+            "set BOSS_ATTENDANCE_GUILD_ID to the server they belong to."
+        )
+    points_ledger.load()
+    if METRICS_PORT:
+        serve_metrics(metrics, METRICS_HOST, METRICS_PORT)
+        print(f"Serving metrics on http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+    async with bot:
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, lambda: loop.create_task(bot.close()))
+            except NotImplementedError:
+                pass
+        try:
+            await bot.start(TOKEN)
+        finally:
+            # Pending saves are written before the worker process exits, and
+            # the lease is only released once they are on disk.
+            if lease_task:
+                lease_task.cancel()
+            await persistence.flush()
+            shard_lease.release()
 
 
-if not TOKEN:
-    raise ValueError("DISCORD_TOKEN environment variable not set")
+if __name__ == "__main__":
+    if not TOKEN:
+        raise ValueError("DISCORD_TOKEN environment variable not set")
 
-bot.run(TOKEN)
+    discord.utils.setup_logging()
+    asyncio.run(run_bot())
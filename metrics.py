@@ -0,0 +1,154 @@
+import bisect
+import threading
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def quantile(self, fraction):
+        # Upper bound of the bucket holding the quantile, as Prometheus would
+        # estimate it; the overflow bucket reports the largest value seen.
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.buckets[index] if index < len(self.buckets) else self.max
+        return self.max
+
+
+class Metrics:
+    # Histograms and counters keyed by (name, sorted label pairs), plus gauges
+    # read from callbacks when rendered. Updates come from the event loop and
+    # the save worker, and the HTTP endpoint renders from its own thread.
+    def __init__(self, prefix="boss_bot"):
+        self.prefix = prefix
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+        self.help = {}
+        self.lock = threading.Lock()
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def gauge(self, name, read, description=None):
+        self.gauges[name] = read
+        if description:
+            self.help[name] = description
+
+    def describe(self, name, description):
+        self.help[name] = description
+
+    def histogram_items(self, name):
+        with self.lock:
+            return [(dict(labels), histogram) for (key, labels), histogram in self.histograms.items() if key == name]
+
+    def counter_items(self, name):
+        with self.lock:
+            return [(dict(labels), value) for (key, labels), value in self.counters.items() if key == name]
+
+    def read_gauges(self):
+        values = {}
+        for name, read in self.gauges.items():
+            try:
+                values[name] = read()
+            except Exception as exc:
+                print(f"Metric gauge {name} failed: {exc}")
+        return values
+
+    def render_prometheus(self):
+        lines = []
+
+        def header(name, kind):
+            full = f"{self.prefix}_{name}"
+            if name in self.help:
+                lines.append(f"# HELP {full} {self.help[name]}")
+            lines.append(f"# TYPE {full} {kind}")
+            return full
+
+        with self.lock:
+            histograms = {key: (list(h.counts), h.count, h.total, h.buckets) for key, h in self.histograms.items()}
+            counters = dict(self.counters)
+
+        for name in sorted({key[0] for key in histograms}):
+            full = header(name, "histogram")
+            for (key, labels), (counts, count, total, buckets) in sorted(histograms.items()):
+                if key != name:
+                    continue
+                cumulative = 0
+                for bound, bucket_count in zip(buckets + (float("inf"),), counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{full}_bucket{format_labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{full}_sum{format_labels(labels)} {total}")
+                lines.append(f"{full}_count{format_labels(labels)} {count}")
+
+        for name in sorted({key[0] for key in counters}):
+            full = header(name, "counter")
+            for (key, labels), value in sorted(counters.items()):
+                if key == name:
+                    lines.append(f"{full}{format_labels(labels)} {value}")
+
+        for name, value in sorted(self.read_gauges().items()):
+            full = header(name, "gauge")
+            if isinstance(value, dict):
+                for label, item in sorted(value.items()):
+                    lines.append(f"{full}{format_labels((('kind', label),))} {item}")
+            else:
+                lines.append(f"{full} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{escape_label(value)}"' for key, value in labels) + "}"
+
+
+def serve_metrics(metrics, host, port):
+    # Flask is only imported when the endpoint is enabled.
+    from flask import Flask, Response
+
+    app = Flask("boss_metrics")
+
+    @app.route("/metrics")
+    def prometheus():
+        return Response(metrics.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+    thread = threading.Thread(
+        target=lambda: app.run(host=host, port=port, use_reloader=False, threaded=True),
+        name="metrics-http",
+        daemon=True,
+    )
+    thread.start()
+    return thread
@@ -0,0 +1,255 @@
+from datetime import datetime
+
+from schedules import compile_schedule
+
+# Formats accepted for typed and older stored times besides ISO 8601.
+DATETIME_FORMATS = ("%m-%d-%Y %I:%M %p", "%Y-%m-%d %H:%M", "%m/%d/%Y %I:%M %p")
+# Version 1 stored ISO 8601 times in one dict per boss. Version 2 stores epoch
+# seconds, and each boss is a list in BOSS_FIELDS order.
+STORAGE_VERSION = 2
+BOSS_FIELDS = ("spawn_at", "death_at", "respawn_seconds", "killed_by", "region", "schedule", "is_scheduled", "is_daily")
+
+
+def parse_time_value(value, tz):
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            for fmt in DATETIME_FORMATS:
+                try:
+                    parsed = datetime.strptime(value, fmt)
+                    break
+                except ValueError:
+                    continue
+            else:
+                return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=tz)
+    return parsed
+
+
+def parse_epoch(value, tz):
+    parsed = parse_time_value(value, tz)
+    return int(parsed.timestamp()) if parsed else None
+
+
+def upgrade_boss(raw, tz):
+    return [
+        parse_epoch(raw.get("spawn_time"), tz),
+        parse_epoch(raw.get("death_time"), tz),
+        round(float(raw.get("respawn_hours", 0)) * 3600),
+        raw.get("killed_by"),
+        raw.get("region"),
+        [list(item) for item in raw.get("schedule", [])],
+        raw.get("is_scheduled", False),
+        raw.get("is_daily", False),
+    ]
+
+
+def upgrade_server(payload, tz):
+    # Version 1 payloads are converted once, when they are loaded; everything
+    # past the storage layer only sees version 2.
+    if payload.get("version", 1) >= STORAGE_VERSION:
+        return payload
+    upgraded = dict(payload)
+    upgraded["version"] = STORAGE_VERSION
+    upgraded["bosses"] = {name: upgrade_boss(raw, tz) for name, raw in payload.get("bosses", {}).items()}
+    return upgraded
+
+
+def upgrade_single_server(payload, tz):
+    # The original bosses.json: one server's boss records at the top level (or
+    # under "bosses"), with no server ID around them.
+    bosses = payload.get("bosses", payload)
+    upgraded = upgrade_server({"bosses": bosses} if bosses is payload else dict(payload), tz)
+    upgraded["name"] = "Migrated Timers"
+    return upgraded
+
+
+class Boss:
+    # Times are whole epoch seconds. `next_spawn` is worked out whenever one of
+    # them changes, so panels and the scheduler read one int per boss instead
+    # of doing datetime arithmetic. The compiled schedule table is built on
+    # first use and dropped whenever the schedule or `is_daily` changes.
+    __slots__ = (
+        "_spawn_at",
+        "_death_at",
+        "_respawn_seconds",
+        "killed_by",
+        "region",
+        "_schedule",
+        "is_scheduled",
+        "_is_daily",
+        "next_spawn",
+        "_table",
+    )
+
+    def __init__(
+        self,
+        spawn_at=None,
+        death_at=None,
+        respawn_seconds=0,
+        killed_by=None,
+        region=None,
+        schedule=(),
+        is_scheduled=False,
+        is_daily=False,
+    ):
+        self._spawn_at = spawn_at
+        self._death_at = death_at
+        self._respawn_seconds = respawn_seconds
+        self.killed_by = killed_by
+        self.region = region
+        self._schedule = tuple(schedule)
+        self.is_scheduled = is_scheduled
+        self._is_daily = is_daily
+        self._table = None
+        self._update()
+
+    def _update(self):
+        if self.is_scheduled or self._death_at is None:
+            self.next_spawn = self._spawn_at
+        else:
+            self.next_spawn = self._death_at + self._respawn_seconds
+
+    @property
+    def spawn_at(self):
+        return self._spawn_at
+
+    @spawn_at.setter
+    def spawn_at(self, value):
+        self._spawn_at = value
+        self._update()
+
+    @property
+    def death_at(self):
+        return self._death_at
+
+    @death_at.setter
+    def death_at(self, value):
+        self._death_at = value
+        self._update()
+
+    @property
+    def respawn_seconds(self):
+        return self._respawn_seconds
+
+    @respawn_seconds.setter
+    def respawn_seconds(self, value):
+        self._respawn_seconds = value
+        self._update()
+
+    @property
+    def schedule(self):
+        return self._schedule
+
+    @schedule.setter
+    def schedule(self, value):
+        self._schedule = tuple(value)
+        self._table = None
+
+    @property
+    def is_daily(self):
+        return self._is_daily
+
+    @is_daily.setter
+    def is_daily(self, value):
+        self._is_daily = value
+        self._table = None
+
+    def schedule_table(self):
+        if self._table is None:
+            self._table = compile_schedule(self._schedule, self._is_daily)
+        return self._table
+
+    @classmethod
+    def from_payload(cls, record):
+        spawn_at, death_at, respawn_seconds, killed_by, region, schedule, is_scheduled, is_daily = record
+        return cls(
+            spawn_at,
+            death_at,
+            respawn_seconds,
+            killed_by,
+            region,
+            [tuple(item) for item in schedule],
+            is_scheduled,
+            is_daily,
+        )
+
+    def to_payload(self):
+        return [
+            self._spawn_at,
+            self._death_at,
+            self._respawn_seconds,
+            self.killed_by,
+            self.region,
+            [list(item) for item in self._schedule],
+            self.is_scheduled,
+            self._is_daily,
+        ]
+
+
+class GuildState:
+    # One Discord server's timers and settings; payloads are the version 2
+    # storage format.
+    __slots__ = (
+        "name",
+        "announce_channel_id",
+        "status_channel_id",
+        "bosses",
+        "guilds",
+        "boss_turns",
+        "boss_current_turn",
+        "maintenance_mode",
+        "button_role_id",
+        "batch_reminders",
+    )
+
+    def __init__(self, name="Unknown Discord Server", announce_channel_id=None, status_channel_id=None):
+        self.name = name
+        self.announce_channel_id = announce_channel_id
+        self.status_channel_id = status_channel_id
+        self.bosses = {}
+        self.guilds = []
+        self.boss_turns = {}
+        self.boss_current_turn = {}
+        self.maintenance_mode = False
+        self.button_role_id = None
+        self.batch_reminders = False
+
+    @classmethod
+    def from_payload(cls, payload, announce_channel_id=None, status_channel_id=None):
+        state = cls(
+            payload.get("name", "Unknown Discord Server"),
+            payload.get("announce_channel_id", announce_channel_id),
+            payload.get("status_channel_id", status_channel_id),
+        )
+        state.bosses = {name: Boss.from_payload(record) for name, record in payload.get("bosses", {}).items()}
+        state.guilds = list(payload.get("guilds", []))
+        state.boss_turns = {boss: list(turns) for boss, turns in payload.get("boss_turns", {}).items()}
+        state.boss_current_turn = dict(payload.get("boss_current_turn", {}))
+        state.maintenance_mode = payload.get("maintenance_mode", False)
+        state.button_role_id = payload.get("button_role_id")
+        state.batch_reminders = payload.get("batch_reminders", False)
+        return state
+
+    def to_payload(self):
+        # Payloads are written from a worker thread while commands keep
+        # changing the state, so they never share a list or dict with it.
+        return {
+            "version": STORAGE_VERSION,
+            "name": self.name,
+            "announce_channel_id": self.announce_channel_id,
+            "status_channel_id": self.status_channel_id,
+            "bosses": {name: boss.to_payload() for name, boss in self.bosses.items()},
+            "guilds": list(self.guilds),
+            "boss_turns": {boss: list(turns) for boss, turns in self.boss_turns.items()},
+            "boss_current_turn": dict(self.boss_current_turn),
+            "maintenance_mode": self.maintenance_mode,
+            "button_role_id": self.button_role_id,
+            "batch_reminders": self.batch_reminders,
+        }
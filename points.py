@@ -0,0 +1,99 @@
+import bisect
+import csv
+import io
+
+FIELDS = ["guild_id", "user_id", "points", "reason", "awarded_at", "awarded_by"]
+
+
+class PointsLedger:
+    # points.csv is an append-only ledger. Totals are kept per server, along
+    # with a list of (-total, user id) kept sorted on every award, so the
+    # leaderboard and a member's rank are slices/bisects rather than re-sums.
+    # With `owns`, rows for other processes' servers are left out on load.
+    def __init__(self, path, owns=None):
+        self.path = path
+        self.owns = owns
+        self.totals = {}
+        self.ranking = {}
+        # (guild id, reason) and (guild id, user id, reason) of every award, so
+        # an event that pays out once can check whether it already has.
+        self.reasons = set()
+        self.count = 0
+        self.started = False
+
+    def load(self):
+        self.totals = {}
+        self.ranking = {}
+        self.reasons = set()
+        self.count = 0
+        if not self.path.exists():
+            return
+        skipped = 0
+        with self.path.open("r", encoding="utf-8", newline="") as f:
+            # Blank lines (the shipped file is one) and a header repeated by two
+            # processes starting the ledger together are not rows.
+            for row in csv.DictReader(line for line in f if line.strip()):
+                if row.get("guild_id") == "guild_id":
+                    continue
+                try:
+                    if self.owns and not self.owns(row["guild_id"]):
+                        continue
+                    self.add(row["guild_id"], int(row["user_id"]), int(row["points"]), row.get("reason") or "")
+                except (KeyError, TypeError, ValueError):
+                    skipped += 1
+        if skipped:
+            print(f"Skipped {skipped} unreadable row(s) in {self.path}")
+
+    def add(self, guild_id, user_id, points, reason=""):
+        self.reasons.add((str(guild_id), reason))
+        self.reasons.add((str(guild_id), user_id, reason))
+        totals = self.totals.setdefault(str(guild_id), {})
+        ranking = self.ranking.setdefault(str(guild_id), [])
+        old = totals.get(user_id)
+        if old is not None:
+            del ranking[bisect.bisect_left(ranking, (-old, user_id))]
+        total = (old or 0) + points
+        totals[user_id] = total
+        bisect.insort(ranking, (-total, user_id))
+        self.count += 1
+        return total
+
+    def award(self, guild_id, user_id, points, reason, awarded_at, awarded_by=None):
+        self.add(guild_id, user_id, points, reason)
+        return [str(guild_id), user_id, points, reason, awarded_at.isoformat(), awarded_by or ""]
+
+    def write(self, rows):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if not self.started:
+            # The shipped points.csv is blank; the first rows get a header.
+            self.started = self.path.exists() and bool(self.path.read_bytes().strip())
+        output = io.StringIO()
+        writer = csv.writer(output)
+        if not self.started:
+            writer.writerow(FIELDS)
+        writer.writerows(rows)
+        # Always one append, never a rewrite, so other processes reading or
+        # adding to the ledger never see it truncated.
+        with self.path.open("a", encoding="utf-8", newline="") as f:
+            f.write(output.getvalue())
+        self.started = True
+
+    def awarded(self, guild_id, reason, user_id=None):
+        if user_id is None:
+            return (str(guild_id), reason) in self.reasons
+        return (str(guild_id), user_id, reason) in self.reasons
+
+    def total(self, guild_id, user_id):
+        return self.totals.get(str(guild_id), {}).get(user_id, 0)
+
+    def rank(self, guild_id, user_id):
+        total = self.totals.get(str(guild_id), {}).get(user_id)
+        if total is None:
+            return None
+        return bisect.bisect_left(self.ranking[str(guild_id)], (-total, 0)) + 1
+
+    def top(self, guild_id, limit=10):
+        return [(user_id, -total) for total, user_id in self.ranking.get(str(guild_id), [])[:limit]]
+
+    def members(self, guild_id):
+        return len(self.totals.get(str(guild_id), {}))
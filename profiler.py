@@ -0,0 +1,159 @@
+import asyncio
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+# Frames at the top of an idle thread: the event loop waiting in its
+# selector, or a worker thread waiting for its next job.
+IDLE_FRAMES = {("selectors.py", "select"), ("threading.py", "wait"), ("queue.py", "get"), ("thread.py", "_worker")}
+
+
+def frame_label(code):
+    path = Path(code.co_filename)
+    return f"{code.co_name} ({path.parent.name}/{path.name}:{code.co_firstlineno})"
+
+
+def is_idle(code):
+    return (Path(code.co_filename).name, code.co_name) in IDLE_FRAMES
+
+
+class StackSampler:
+    # Samples every thread's stack from a background thread. Nothing is hooked
+    # into the interpreter, so the sampled code runs at full speed and there is
+    # no cost at all once the sampler is stopped.
+    def __init__(self, loop_thread_id, interval=0.005):
+        self.loop_thread_id = loop_thread_id
+        self.interval = interval
+        self.samples = {"loop": 0, "workers": 0}
+        self.idle = {"loop": 0, "workers": 0}
+        self.own = {"loop": Counter(), "workers": Counter()}
+        self.total = {"loop": Counter(), "workers": Counter()}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="loop-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                self._record("loop" if thread_id == self.loop_thread_id else "workers", frame)
+
+    def _record(self, kind, frame):
+        self.samples[kind] += 1
+        if is_idle(frame.f_code):
+            self.idle[kind] += 1
+            return
+        self.own[kind][frame_label(frame.f_code)] += 1
+        seen = set()
+        while frame is not None:
+            label = frame_label(frame.f_code)
+            if label not in seen:
+                seen.add(label)
+                self.total[kind][label] += 1
+            frame = frame.f_back
+
+    def report(self, limit=40):
+        lines = []
+        for kind, title in (("loop", "Event loop thread"), ("workers", "Worker threads (saves, exports)")):
+            samples = self.samples[kind]
+            busy = samples - self.idle[kind]
+            lines.append(f"== {title}: {samples} samples, {busy} busy, {self.idle[kind]} idle ==")
+            if not busy:
+                lines.append("")
+                continue
+            lines.append(f"{'self %':>7} {'total %':>8}  function")
+            for label, count in self.own[kind].most_common(limit):
+                lines.append(f"{count / busy * 100:>6.1f}% {self.total[kind][label] / busy * 100:>7.1f}%  {label}")
+            lines.append("")
+        return lines
+
+
+class ProfileSession:
+    def __init__(self, mode="sample", interval=0.005, lag_interval=0.1):
+        self.mode = mode
+        self.interval = interval
+        self.lag_interval = lag_interval
+        self.lag = []
+        self.ticks = {}
+        self.lines = []
+        self.elapsed = 0.0
+
+    def record_tick(self, loop_name, lateness):
+        self.ticks.setdefault(loop_name, []).append(lateness)
+
+    async def _probe_lag(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.lag_interval)
+            self.lag.append(max(0.0, time.perf_counter() - started - self.lag_interval))
+
+    async def run(self, seconds):
+        started = time.perf_counter()
+        probe = asyncio.get_running_loop().create_task(self._probe_lag())
+        if self.mode == "cprofile":
+            # cProfile hooks this thread only, which is the event loop's.
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                profile.disable()
+                probe.cancel()
+            self.lines = self.cprofile_lines(profile)
+        else:
+            sampler = StackSampler(threading.get_ident(), self.interval)
+            sampler.start()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                sampler.stop()
+                probe.cancel()
+            self.lines = sampler.report()
+        self.elapsed = time.perf_counter() - started
+
+    def cprofile_lines(self, profile, limit=40):
+        output = io.StringIO()
+        stats = pstats.Stats(profile, stream=output)
+        stats.sort_stats("tottime").print_stats(limit)
+        output.write("\n")
+        stats.sort_stats("cumulative").print_stats(limit)
+        return output.getvalue().splitlines()
+
+    def report(self, title):
+        lines = [title, f"Mode: {self.mode} | Duration: {self.elapsed:.1f}s", ""]
+        lines.append("== Event loop lag ==")
+        lines.append(lag_line(f"sleep({self.lag_interval}) overshoot", self.lag))
+        for loop_name, values in sorted(self.ticks.items()):
+            lines.append(lag_line(f"{loop_name} tick start lateness", values))
+        lines.append("")
+        lines.extend(self.lines)
+        return "\n".join(lines) + "\n"
+
+
+def lag_line(name, values):
+    if not values:
+        return f"{name}: no samples"
+    values = sorted(values)
+
+    def pick(fraction):
+        return values[min(len(values) - 1, int(len(values) * fraction))]
+
+    return (
+        f"{name}: {len(values)} samples, p50 {pick(0.5) * 1000:.1f}ms, "
+        f"p99 {pick(0.99) * 1000:.1f}ms, max {values[-1] * 1000:.1f}ms"
+    )
@@ -0,0 +1,79 @@
+import csv
+import io
+from datetime import datetime, time as dt_time
+
+
+def attendance_events(index, guild_id, keys, start, end, tz):
+    # Yields (boss key, epoch) sorted by boss then time, straight from the
+    # index's sorted day lists, so no sort is needed on this side.
+    for key in sorted(keys):
+        for day, times in index.query(guild_id, key, start, end):
+            midnight = datetime.combine(day, dt_time(), tz).timestamp()
+            for seconds in times:
+                yield key, midnight + seconds
+
+
+def kill_events(rows):
+    events = [(name.lower(), killed_at, name, killed_by) for name, killed_at, killed_by in rows]
+    events.sort(key=lambda event: (event[0], event[1]))
+    return events
+
+
+def reconcile(attendance, kills, tolerance):
+    # Single merge over both streams ordered by (boss, time). Every member who
+    # was there logs a row, so each attendance row is paired with the nearest
+    # kill of its boss within `tolerance` seconds (the kills just before and
+    # after it), and a kill is only reported alone when no row matched it.
+    # The kill pointer only moves forward, so the whole pass is linear.
+    matched, lonely_attendance = [], []
+    used = [False] * len(kills)
+    k = 0
+    for row in attendance:
+        key, at = row
+        while k < len(kills) and (kills[k][0], kills[k][1]) < (key, at):
+            k += 1
+        best = None
+        for index in (k - 1, k):
+            if 0 <= index < len(kills) and kills[index][0] == key:
+                gap = abs(kills[index][1] - at)
+                if gap <= tolerance and (best is None or gap < best[0]):
+                    best = (gap, index)
+        if best is None:
+            lonely_attendance.append(row)
+            continue
+        used[best[1]] = True
+        matched.append((row, kills[best[1]]))
+    lonely_kills = [kill for kill, hit in zip(kills, used) if not hit]
+    return matched, lonely_attendance, lonely_kills
+
+
+def summarize(matched, lonely_attendance, lonely_kills):
+    bosses = {}
+    for (key, _), _ in matched:
+        bosses.setdefault(key, [0, 0, 0])[0] += 1
+    for key, _ in lonely_attendance:
+        bosses.setdefault(key, [0, 0, 0])[1] += 1
+    for kill in lonely_kills:
+        bosses.setdefault(kill[0], [0, 0, 0])[2] += 1
+    return bosses
+
+
+def report_csv(matched, lonely_attendance, lonely_kills, names, tz):
+    def stamp(epoch):
+        return datetime.fromtimestamp(epoch, tz).strftime("%Y-%m-%d %H:%M:%S") if epoch is not None else ""
+
+    def row(status, key, attended_at, kill):
+        killed_at = kill[1] if kill else None
+        boss = kill[2] if kill else names.get(key, key)
+        gap = int(killed_at - attended_at) if kill and attended_at is not None else ""
+        return [status, boss, stamp(attended_at), stamp(killed_at), gap, kill[3] if kill and kill[3] is not None else ""]
+
+    rows = [row("matched", key, attended_at, kill) for (key, attended_at), kill in matched]
+    rows += [row("attendance_only", key, attended_at, None) for key, attended_at in lonely_attendance]
+    rows += [row("kill_only", kill[0], None, kill) for kill in lonely_kills]
+    rows.sort(key=lambda item: (item[1].lower(), item[2] or item[3]))
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(["status", "boss", "attended_at", "killed_at", "gap_seconds", "killed_by"])
+    writer.writerows(rows)
+    return output.getvalue()
@@ -0,0 +1,77 @@
+import json
+import time
+
+from storage import atomic_write_json
+
+
+class SentReminders:
+    # Keys are (guild id, boss name, spawn epoch, label). An entry is dropped
+    # once its spawn is more than `ttl` seconds in the past, and the oldest
+    # spawns go first if the store grows past `max_entries`. With `owns`, only
+    # keys for those servers are kept when loading.
+    def __init__(self, path, ttl, max_entries=100_000, clock=time.time, owns=None):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.owns = owns
+        self.entries = set()
+        self.dirty = False
+        self._next_evict = 0
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, key):
+        self.entries.add(key)
+        self.dirty = True
+        now = self.clock()
+        if now >= self._next_evict or len(self.entries) > self.max_entries:
+            self.evict(now)
+
+    def discard(self, key):
+        if key in self.entries:
+            self.entries.discard(key)
+            self.dirty = True
+
+    def evict(self, now=None):
+        now = self.clock() if now is None else now
+        cutoff = now - self.ttl
+        kept = {key for key in self.entries if key[2] >= cutoff}
+        if len(kept) > self.max_entries:
+            kept = set(sorted(kept, key=lambda key: key[2])[-self.max_entries :])
+        if len(kept) != len(self.entries):
+            self.entries = kept
+            self.dirty = True
+        self._next_evict = now + min(self.ttl, 600)
+
+    def load(self, sources=()):
+        # `sources` are reminder files saved by other processes, such as the
+        # previous owners of this process's servers before a reshard.
+        self.entries = set()
+        for path in [self.path, *sources]:
+            if not path.exists():
+                continue
+            try:
+                with path.open("r", encoding="utf-8") as f:
+                    keys = {tuple(key) for key in json.load(f).get("sent", [])}
+            except (ValueError, TypeError) as exc:
+                print(f"Ignoring unreadable reminder state {path}: {exc}")
+                continue
+            if self.owns:
+                keys = {key for key in keys if self.owns(key[0])}
+            self.entries |= keys
+        self.dirty = False
+        self.evict()
+
+    def take_snapshot(self):
+        if not self.dirty:
+            return None
+        self.dirty = False
+        return {"sent": sorted(self.entries, key=lambda key: key[2])}
+
+    def write(self, snapshot):
+        atomic_write_json(self.path, snapshot, indent=None)
@@ -0,0 +1,212 @@
+import asyncio
+import heapq
+import itertools
+import time
+
+
+class SpawnScheduler:
+    def __init__(self, clock=time.time, max_sleep=300):
+        self.clock = clock
+        self.max_sleep = max_sleep
+        self._heap = []
+        self._versions = {}
+        self._live = 0
+        self._counter = itertools.count()
+        self._wake = asyncio.Event()
+
+    def __len__(self):
+        return self._live
+
+    def schedule(self, guild_id, boss_name, deadlines):
+        # Rescheduling a boss bumps its version; older heap entries are skipped
+        # lazily when they reach the top instead of being searched for.
+        key = (str(guild_id), boss_name)
+        self.discard(guild_id, boss_name)
+        version = next(self._counter)
+        self._versions[key] = (version, len(deadlines))
+        self._live += len(deadlines)
+        for deadline, label, spawn_at in deadlines:
+            heapq.heappush(self._heap, (deadline, next(self._counter), version, key, label, spawn_at))
+        self._compact()
+        self._wake.set()
+
+    def retry(self, guild_id, boss_name, label, spawn_at, deadline):
+        # Puts back one deadline that was popped but couldn't be handled. It
+        # joins the boss's live deadlines, so rescheduling the boss drops it.
+        key = (str(guild_id), boss_name)
+        version, count = self._versions.get(key, (next(self._counter), 0))
+        self._versions[key] = (version, count + 1)
+        self._live += 1
+        heapq.heappush(self._heap, (deadline, next(self._counter), version, key, label, spawn_at))
+        self._wake.set()
+
+    def discard(self, guild_id, boss_name):
+        entry = self._versions.pop((str(guild_id), boss_name), None)
+        if entry:
+            self._live -= entry[1]
+
+    def discard_guild(self, guild_id):
+        guild_id = str(guild_id)
+        for key in [key for key in self._versions if key[0] == guild_id]:
+            self.discard(*key)
+
+    def clear(self):
+        self._heap = []
+        self._versions = {}
+        self._live = 0
+        self._wake.set()
+
+    def next_deadline(self):
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now=None):
+        now = self.clock() if now is None else now
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            deadline, _, version, key, label, spawn_at = heapq.heappop(self._heap)
+            entry = self._versions.get(key)
+            if not entry or entry[0] != version:
+                continue
+            if entry[1] <= 1:
+                del self._versions[key]
+            else:
+                self._versions[key] = (version, entry[1] - 1)
+            self._live -= 1
+            due.append((key[0], key[1], label, spawn_at, deadline))
+        return due
+
+    async def wait_due(self):
+        while True:
+            now = self.clock()
+            due = self.pop_due(now)
+            if due:
+                return due
+            next_deadline = self.next_deadline()
+            delay = self.max_sleep
+            if next_deadline is not None:
+                delay = min(max(next_deadline - now, 0), self.max_sleep)
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def _drop_stale(self):
+        while self._heap:
+            _, _, version, key, _, _ = self._heap[0]
+            entry = self._versions.get(key)
+            if entry and entry[0] == version:
+                return
+            heapq.heappop(self._heap)
+
+    def _compact(self):
+        if len(self._heap) < 64 or len(self._heap) < 4 * self._live:
+            return
+        self._heap = [
+            item for item in self._heap if self._versions.get(item[3], (None,))[0] == item[2]
+        ]
+        heapq.heapify(self._heap)
+
+
+class Debouncer:
+    # Runs action(key) once a key has been quiet for `delay` seconds (or has
+    # been waiting `max_delay` seconds), with at most one run in flight per
+    # key. Requests that arrive during a run trigger one more run after it.
+    def __init__(self, action, delay=2.0, max_delay=10.0):
+        self.action = action
+        self.delay = delay
+        self.max_delay = max_delay
+        self._requested = {}
+        self._tasks = {}
+
+    def request(self, key):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        first, _ = self._requested.get(key, (now, now))
+        self._requested[key] = (first, now)
+        if key not in self._tasks:
+            self._tasks[key] = loop.create_task(self._run(key))
+
+    async def run_now(self, key):
+        # Skips the quiet period but keeps the one-run-per-key rule: a run in
+        # flight is followed straight away by another. Returns once the key
+        # has nothing left to run.
+        self._requested[key] = (float("-inf"), float("-inf"))
+        if key not in self._tasks:
+            self._tasks[key] = asyncio.get_running_loop().create_task(self._run(key))
+        await asyncio.wait([self._tasks[key]])
+
+    def pending(self):
+        return len(self._tasks)
+
+    async def _run(self, key):
+        loop = asyncio.get_running_loop()
+        try:
+            while key in self._requested:
+                first, last = self._requested[key]
+                wait = min(last + self.delay, first + self.max_delay) - loop.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                    continue
+                del self._requested[key]
+                try:
+                    await self.action(key)
+                except Exception as exc:
+                    print(f"Debounced task for {key} failed: {exc}")
+        finally:
+            self._tasks.pop(key, None)
+
+
+async def fan_out(groups, worker, limit):
+    # Runs worker(key, items) for every group with at most `limit` running at
+    # once. A failing group is reported and yields None without affecting the
+    # others.
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run(key, items):
+        async with semaphore:
+            try:
+                return await worker(key, items)
+            except Exception as exc:
+                print(f"Notification work for {key} failed: {exc!r}")
+                return None
+
+    return await asyncio.gather(*(run(key, items) for key, items in groups.items()))
+
+
+class KeyedTasks:
+    # Runs worker(key, items) in its own task for every submit, at most `limit`
+    # at once. Work for the same key runs in submission order; nothing waits
+    # for it, so a slow key never holds up the others.
+    def __init__(self, worker, limit):
+        self.worker = worker
+        self.limit = max(1, limit)
+        self._loop = None
+        self._semaphore = None
+        self._tails = {}
+
+    def submit(self, key, items):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop, self._semaphore, self._tails = loop, asyncio.Semaphore(self.limit), {}
+        task = loop.create_task(self._run(key, items, self._tails.get(key)))
+        self._tails[key] = task
+        return task
+
+    def pending(self):
+        # The last task per key; each one finishes after the earlier ones.
+        return list(self._tails.values())
+
+    async def _run(self, key, items, previous):
+        try:
+            if previous is not None:
+                await asyncio.wait([previous])
+            async with self._semaphore:
+                return await self.worker(key, items)
+        except Exception as exc:
+            print(f"Notification work for {key} failed: {exc!r}")
+            return None
+        finally:
+            if self._tails.get(key) is asyncio.current_task():
+                del self._tails[key]
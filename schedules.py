@@ -0,0 +1,67 @@
+import bisect
+from datetime import datetime, time, timedelta
+
+
+DAYS = {
+    "monday": 0,
+    "tuesday": 1,
+    "wednesday": 2,
+    "thursday": 3,
+    "friday": 4,
+    "saturday": 5,
+    "sunday": 6,
+}
+MINUTES_PER_DAY = 24 * 60
+
+
+def parse_time_text(value):
+    value = value.strip().upper().replace(" ", "")
+    for fmt in ("%I:%M%p", "%I%p", "%H:%M"):
+        try:
+            return datetime.strptime(value, fmt).time()
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid time: {value}")
+
+
+def compile_schedule(schedule, is_daily):
+    offsets = []
+    for day, time_text in schedule:
+        spawn_time = parse_time_text(time_text)
+        minute = spawn_time.hour * 60 + spawn_time.minute
+        if is_daily:
+            offsets.extend(weekday * MINUTES_PER_DAY + minute for weekday in range(7))
+        else:
+            offsets.append(DAYS[day.lower()] * MINUTES_PER_DAY + minute)
+    offsets.sort()
+    return offsets
+
+
+def occurrence(week_start, offset, tz):
+    days, minute = divmod(offset, MINUTES_PER_DAY)
+    return datetime.combine(week_start + timedelta(days=days), time(minute // 60, minute % 60), tz)
+
+
+def next_occurrence(table, after, tz):
+    if not table:
+        return None
+    week_start = after.date() - timedelta(days=after.weekday())
+    minute = (
+        after.weekday() * MINUTES_PER_DAY
+        + after.hour * 60
+        + after.minute
+        + (after.second + after.microsecond / 1_000_000) / 60
+    )
+    index = bisect.bisect_right(table, minute)
+    if index == len(table):
+        week_start += timedelta(days=7)
+        index = 0
+    return occurrence(week_start, table[index], tz)
+
+
+def occurrences_on_date(table, target_date, tz):
+    start = target_date.weekday() * MINUTES_PER_DAY
+    low = bisect.bisect_left(table, start)
+    high = bisect.bisect_left(table, start + MINUTES_PER_DAY, low)
+    week_start = target_date - timedelta(days=target_date.weekday())
+    return [occurrence(week_start, offset, tz) for offset in table[low:high]]
@@ -0,0 +1,213 @@
+import asyncio
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager, contextmanager
+from math import gcd
+from pathlib import Path
+
+from storage import atomic_write_json
+
+
+def shard_for(guild_id, shard_count):
+    # Discord routes a server's gateway events to shard (id >> 22) % count.
+    return (int(guild_id) >> 22) % shard_count
+
+
+def shards_overlap(shard_ids, shard_count, other_ids, other_count):
+    # Shard a of N and shard b of M share servers exactly when a and b agree
+    # modulo gcd(N, M), so a 2-shard and a 4-shard layout can be compared.
+    step = gcd(shard_count, other_count)
+    return bool({shard % step for shard in shard_ids} & {shard % step for shard in other_ids})
+
+
+class ShardLease:
+    # Every process holds a lease file naming the shards it runs and renews it
+    # while it is up. Before loading state, a process waits until no other
+    # live lease covers any of its servers, so across restarts and reshards
+    # (a new shard count, or shards moved between processes) each server has
+    # one owner: the previous owner has saved its state and sent reminders
+    # before the next one loads them. An owner stops sending `margin` seconds
+    # before its lease would expire, and a lease that can't be renewed in time
+    # is lost for good.
+    def __init__(self, root, shard_ids, shard_count, ttl=30.0, margin=5.0, clock=time.time):
+        self.root = Path(root)
+        self.shard_ids = sorted(set(shard_ids))
+        self.shard_count = shard_count
+        self.ttl = ttl
+        self.margin = margin
+        self.clock = clock
+        self.name = f"{'-'.join(map(str, self.shard_ids))}-of-{shard_count}"
+        self.path = self.root / f"{self.name}.json"
+        self.token = uuid.uuid4().hex
+        self.expires_at = None
+        self._owned = set(self.shard_ids)
+
+    def owns(self, guild_id):
+        return shard_for(guild_id, self.shard_count) in self._owned
+
+    def held(self):
+        return self.expires_at is not None and self.clock() < self.expires_at - self.margin
+
+    def leases(self):
+        leases = []
+        for path in self.root.glob("*.json"):
+            try:
+                with path.open("r", encoding="utf-8") as f:
+                    leases.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return leases
+
+    def blocking(self):
+        now = self.clock()
+        return [
+            lease
+            for lease in self.leases()
+            if lease.get("token") != self.token
+            and lease.get("expires_at", 0) > now
+            and shards_overlap(self.shard_ids, self.shard_count, lease["shard_ids"], lease["shard_count"])
+            and not exited(lease)
+        ]
+
+    async def acquire(self, poll=1.0):
+        waiting = False
+        while True:
+            async with self.locked_async():
+                blocking = self.blocking()
+                if not blocking:
+                    self._write()
+                    return
+            if not waiting:
+                holders = ", ".join(f"{lease['shard_ids']} of {lease['shard_count']}" for lease in blocking)
+                print(f"Waiting for shard lease(s) {holders} to be released before taking shards {self.name}.")
+                waiting = True
+            await asyncio.sleep(poll)
+
+    def renew(self):
+        if not self.held() or self._current_token() != self.token:
+            self.expires_at = None
+            return False
+        self._write()
+        return True
+
+    async def keep(self, on_lost):
+        while True:
+            await asyncio.sleep(self.ttl / 3)
+            if not self.renew():
+                on_lost()
+                return
+
+    def release(self):
+        if self.expires_at is not None and self._current_token() == self.token:
+            self.path.unlink(missing_ok=True)
+        self.expires_at = None
+
+    def _write(self):
+        self.expires_at = self.clock() + self.ttl
+        atomic_write_json(
+            self.path,
+            {
+                "shard_ids": self.shard_ids,
+                "shard_count": self.shard_count,
+                "token": self.token,
+                "host": socket.gethostname(),
+                "pid": os.getpid(),
+                "expires_at": self.expires_at,
+            },
+            indent=None,
+        )
+
+    def _current_token(self):
+        try:
+            with self.path.open("r", encoding="utf-8") as f:
+                return json.load(f).get("token")
+        except (OSError, ValueError):
+            return None
+
+    # Checking the other leases and writing ours happen under one lock file,
+    # so two processes starting together can't both see a free slot. Startup
+    # steps that must run in one process at a time (the first import of shared
+    # state) use it too. The holder keeps the file's mtime fresh, so only a
+    # lock whose holder has died or stopped refreshing it is ever broken.
+    @contextmanager
+    def locked(self, stale_after=10.0):
+        while not self._take_lock(stale_after):
+            time.sleep(0.05)
+        stop = self._refresh_lock(stale_after)
+        try:
+            yield
+        finally:
+            self._drop_lock(stop)
+
+    @asynccontextmanager
+    async def locked_async(self, stale_after=10.0):
+        while not self._take_lock(stale_after):
+            await asyncio.sleep(0.05)
+        stop = self._refresh_lock(stale_after)
+        try:
+            yield
+        finally:
+            self._drop_lock(stop)
+
+    @property
+    def lock_path(self):
+        return self.root / "lease.lock"
+
+    def _take_lock(self, stale_after):
+        self.root.mkdir(parents=True, exist_ok=True)
+        try:
+            fd = os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            self._break_stale_lock(stale_after)
+            return False
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"host": socket.gethostname(), "pid": os.getpid()}, f)
+        return True
+
+    def _break_stale_lock(self, stale_after):
+        try:
+            age = time.time() - self.lock_path.stat().st_mtime
+            with self.lock_path.open("r", encoding="utf-8") as f:
+                holder = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError):
+            # Just created and not written yet, or written by an older version.
+            holder = {}
+        if age > stale_after or exited(holder):
+            self.lock_path.unlink(missing_ok=True)
+
+    def _refresh_lock(self, stale_after):
+        stop = threading.Event()
+
+        def refresh():
+            while not stop.wait(stale_after / 3):
+                try:
+                    os.utime(self.lock_path)
+                except OSError:
+                    return
+
+        threading.Thread(target=refresh, name="lease-lock", daemon=True).start()
+        return stop
+
+    def _drop_lock(self, stop):
+        stop.set()
+        self.lock_path.unlink(missing_ok=True)
+
+
+def exited(lease):
+    # A lease left behind by a process that died on this machine needn't be
+    # waited out. Only checked on POSIX, where signal 0 is a harmless probe.
+    if os.name != "posix" or lease.get("host") != socket.gethostname() or lease.get("pid") == os.getpid():
+        return False
+    try:
+        os.kill(lease["pid"], 0)
+    except ProcessLookupError:
+        return True
+    except (OSError, KeyError, TypeError):
+        return False
+    return False
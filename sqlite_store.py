@@ -0,0 +1,415 @@
+import argparse
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+from killlog import KillLog, legacy_records, make_record
+from models import BOSS_FIELDS, STORAGE_VERSION, parse_epoch, upgrade_server, upgrade_single_server
+from storage import GuildStore, atomic_write_json
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS servers (
+    guild_id TEXT PRIMARY KEY,
+    name TEXT,
+    announce_channel_id INTEGER,
+    status_channel_id INTEGER,
+    guilds TEXT NOT NULL DEFAULT '[]',
+    maintenance_mode INTEGER NOT NULL DEFAULT 0,
+    button_role_id INTEGER,
+    batch_reminders INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS bosses (
+    guild_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    spawn_time TEXT,
+    death_time TEXT,
+    respawn_hours REAL NOT NULL DEFAULT 0,
+    spawn_at INTEGER,
+    death_at INTEGER,
+    respawn_seconds INTEGER,
+    killed_by INTEGER,
+    region TEXT,
+    schedule TEXT NOT NULL DEFAULT '[]',
+    is_scheduled INTEGER NOT NULL DEFAULT 0,
+    is_daily INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (guild_id, name)
+);
+CREATE TABLE IF NOT EXISTS boss_turns (
+    guild_id TEXT NOT NULL,
+    boss TEXT NOT NULL,
+    turns TEXT,
+    current_turn INTEGER,
+    PRIMARY KEY (guild_id, boss)
+);
+CREATE TABLE IF NOT EXISTS kills (
+    id INTEGER PRIMARY KEY,
+    guild_id TEXT NOT NULL,
+    boss TEXT NOT NULL,
+    killed_at REAL NOT NULL,
+    killed_at_text TEXT NOT NULL,
+    killed_by INTEGER
+);
+CREATE INDEX IF NOT EXISTS kills_guild_boss_time ON kills (guild_id, boss, killed_at);
+CREATE INDEX IF NOT EXISTS kills_guild_time ON kills (guild_id, killed_at);
+"""
+
+# Columns added after the first release, created on databases that predate them.
+ADDED_COLUMNS = (
+    ("servers", "batch_reminders", "INTEGER NOT NULL DEFAULT 0"),
+    ("bosses", "spawn_at", "INTEGER"),
+    ("bosses", "death_at", "INTEGER"),
+    ("bosses", "respawn_seconds", "INTEGER"),
+)
+# Bosses are written in storage version 2 columns. The version 1 text times
+# are cleared on write and only read for rows that predate the epoch columns.
+BOSS_COLUMNS = BOSS_FIELDS + ("spawn_time", "death_time")
+
+
+class SqliteDatabase:
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Writes come from the persistence worker's executor threads, one
+        # flush at a time; the lock keeps direct callers from interleaving.
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.executescript(SCHEMA)
+            for table, column, definition in ADDED_COLUMNS:
+                existing = {row[1] for row in self.connection.execute(f"PRAGMA table_info({table})")}
+                if column not in existing:
+                    self.connection.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+    def query(self, sql, params=()):
+        with self.lock:
+            return self.connection.execute(sql, params).fetchall()
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+def boss_row(record):
+    spawn_at, death_at, respawn_seconds, killed_by, region, schedule, is_scheduled, is_daily = record
+    return (
+        spawn_at,
+        death_at,
+        respawn_seconds,
+        killed_by,
+        region,
+        json.dumps(schedule),
+        int(bool(is_scheduled)),
+        int(bool(is_daily)),
+        None,
+        None,
+    )
+
+
+def boss_record(row, tz):
+    spawn_at, death_at, respawn_seconds, killed_by, region, schedule, is_scheduled, is_daily, spawn_time, death_time, hours = row
+    return [
+        spawn_at if spawn_at is not None else parse_epoch(spawn_time, tz),
+        death_at if death_at is not None else parse_epoch(death_time, tz),
+        respawn_seconds if respawn_seconds is not None else round((hours or 0) * 3600),
+        killed_by,
+        region,
+        json.loads(schedule),
+        bool(is_scheduled),
+        bool(is_daily),
+    ]
+
+
+def server_row(payload):
+    return (
+        payload.get("name"),
+        payload.get("announce_channel_id"),
+        payload.get("status_channel_id"),
+        json.dumps(payload.get("guilds", [])),
+        int(bool(payload.get("maintenance_mode"))),
+        payload.get("button_role_id"),
+        int(bool(payload.get("batch_reminders"))),
+    )
+
+
+def turn_rows(payload):
+    turns = payload.get("boss_turns", {})
+    current = payload.get("boss_current_turn", {})
+    rows = {}
+    for boss in list(turns) + [boss for boss in current if boss not in turns]:
+        rows[boss] = (json.dumps(turns[boss]) if boss in turns else None, current.get(boss))
+    return rows
+
+
+class SqliteGuildStore:
+    # Same interface as GuildStore. The rows last written for each server are
+    # remembered so a flush only upserts the bosses and turns that changed.
+    # With `owns`, rows of other processes' servers are skipped on load.
+    def __init__(self, db, tz=None, owns=None):
+        self.db = db
+        self.path = db.path
+        self.tz = tz
+        self.owns = owns
+        self.dirty = set()
+        self.written = {}
+
+    def exists(self):
+        return bool(self.db.query("SELECT 1 FROM servers LIMIT 1"))
+
+    def mark_dirty(self, *guild_ids):
+        self.dirty.update(str(guild_id) for guild_id in guild_ids)
+
+    def take_dirty(self):
+        dirty, self.dirty = self.dirty, set()
+        return dirty
+
+    def load(self):
+        servers = {}
+        for guild_id, *row in self.db.query(
+            "SELECT guild_id, name, announce_channel_id, status_channel_id, guilds, maintenance_mode, "
+            "button_role_id, batch_reminders FROM servers"
+        ):
+            if self.owns and not self.owns(guild_id):
+                continue
+            servers[guild_id] = {
+                "version": STORAGE_VERSION,
+                "name": row[0],
+                "announce_channel_id": row[1],
+                "status_channel_id": row[2],
+                "bosses": {},
+                "guilds": json.loads(row[3]),
+                "boss_turns": {},
+                "boss_current_turn": {},
+                "maintenance_mode": bool(row[4]),
+                "button_role_id": row[5],
+                "batch_reminders": bool(row[6]),
+            }
+        legacy = set()
+        for guild_id, name, *row in self.db.query(
+            f"SELECT guild_id, name, {', '.join(BOSS_COLUMNS)}, respawn_hours FROM bosses"
+        ):
+            if guild_id not in servers:
+                continue
+            if row[2] is None:
+                legacy.add(guild_id)
+            servers[guild_id]["bosses"][name] = boss_record(row, self.tz)
+        for guild_id, boss, turns, current_turn in self.db.query(
+            "SELECT guild_id, boss, turns, current_turn FROM boss_turns"
+        ):
+            if guild_id not in servers:
+                continue
+            if turns is not None:
+                servers[guild_id]["boss_turns"][boss] = json.loads(turns)
+            if current_turn is not None:
+                servers[guild_id]["boss_current_turn"][boss] = current_turn
+        self.written = {guild_id: self.snapshot(payload) for guild_id, payload in servers.items()}
+        if legacy:
+            # Rows from before the epoch columns are rewritten on the next save.
+            for guild_id in legacy:
+                self.written[guild_id]["bosses"] = {}
+            self.mark_dirty(*legacy)
+        return servers
+
+    def snapshot(self, payload):
+        return {
+            "server": server_row(payload),
+            "bosses": {name: boss_row(boss) for name, boss in payload.get("bosses", {}).items()},
+            "turns": turn_rows(payload),
+        }
+
+    def write(self, payloads, guild_ids):
+        written = {}
+        with self.db.lock, self.db.connection as connection:
+            for guild_id, payload in payloads.items():
+                new = self.snapshot(payload)
+                old = self.written.get(guild_id, {"server": None, "bosses": {}, "turns": {}})
+                if new["server"] != old["server"]:
+                    connection.execute(
+                        "INSERT INTO servers (guild_id, name, announce_channel_id, status_channel_id, guilds, "
+                        "maintenance_mode, button_role_id, batch_reminders) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                        "ON CONFLICT (guild_id) DO UPDATE SET name = excluded.name, "
+                        "announce_channel_id = excluded.announce_channel_id, "
+                        "status_channel_id = excluded.status_channel_id, guilds = excluded.guilds, "
+                        "maintenance_mode = excluded.maintenance_mode, button_role_id = excluded.button_role_id, "
+                        "batch_reminders = excluded.batch_reminders",
+                        (guild_id, *new["server"]),
+                    )
+                self.upsert(connection, "bosses", guild_id, old["bosses"], new["bosses"])
+                self.upsert(connection, "boss_turns", guild_id, old["turns"], new["turns"])
+                written[guild_id] = new
+        self.written.update(written)
+
+    def upsert(self, connection, table, guild_id, old_rows, new_rows):
+        if table == "bosses":
+            key, columns = "name", BOSS_COLUMNS
+        else:
+            key, columns = "boss", ("turns", "current_turn")
+        removed = [(guild_id, name) for name in old_rows if name not in new_rows]
+        if removed:
+            connection.executemany(f"DELETE FROM {table} WHERE guild_id = ? AND {key} = ?", removed)
+        changed = [(guild_id, name, *row) for name, row in new_rows.items() if old_rows.get(name) != row]
+        if changed:
+            updates = ", ".join(f"{column} = excluded.{column}" for column in columns)
+            connection.executemany(
+                f"INSERT INTO {table} (guild_id, {key}, {', '.join(columns)}) "
+                f"VALUES ({', '.join('?' * (len(columns) + 2))}) "
+                f"ON CONFLICT (guild_id, {key}) DO UPDATE SET {updates}",
+                changed,
+            )
+
+
+class SqliteKillLog(KillLog):
+    def __init__(self, db, tz=None, import_from=None, owns=None):
+        super().__init__(db.path, tz=tz, owns=owns)
+        self.db = db
+        self.import_from = import_from
+
+    def migrate(self):
+        if self.import_from and not self.db.query("SELECT 1 FROM kills LIMIT 1"):
+            self.import_from.migrate()
+            self.write_many(journal_records(self.import_from.path), only_if_empty=True)
+
+    def load(self):
+        self.index = {}
+        self.count = 0
+        self.migrate()
+        for guild_id, boss, killed_at, killed_by in self.db.query(
+            "SELECT guild_id, boss, killed_at, killed_by FROM kills ORDER BY id"
+        ):
+            if self.owns and not self.owns(guild_id):
+                continue
+            self.index.setdefault(guild_id, {}).setdefault(boss, []).append((killed_at, killed_by))
+            self.count += 1
+
+    def write(self, record):
+        self.write_many([record])
+
+    def write_many(self, records, only_if_empty=False):
+        rows = [
+            (record["guild_id"], record["boss"], self.to_epoch(record["killed_at"]), record["killed_at"], record.get("killed_by"))
+            for record in records
+        ]
+        rows = [row for row in rows if row[2] is not None]
+        if not rows:
+            return
+        with self.db.lock, self.db.connection as connection:
+            if only_if_empty:
+                # Processes sharing the database may import at the same time;
+                # the write lock makes the emptiness check and insert atomic.
+                connection.execute("BEGIN IMMEDIATE")
+                if connection.execute("SELECT 1 FROM kills LIMIT 1").fetchone():
+                    return
+            connection.executemany(
+                "INSERT INTO kills (guild_id, boss, killed_at, killed_at_text, killed_by) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def kills_between(self, guild_id, start, end, boss_name=None):
+        sql = "SELECT boss, killed_at, killed_by FROM kills WHERE guild_id = ? AND killed_at >= ? AND killed_at < ?"
+        params = [str(guild_id), start, end]
+        if boss_name is not None:
+            sql += " AND boss = ?"
+            params.append(boss_name)
+        return self.db.query(sql + " ORDER BY killed_at", params)
+
+
+def journal_records(path):
+    if not path.exists():
+        return
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def import_json(db, data_file=None, data_dir=None, kill_log_file=None, tz=None, guild_id=None):
+    # Importing replaces the database contents so import/export round-trips.
+    if data_dir:
+        servers = GuildStore(data_dir, tz).load()
+    else:
+        with Path(data_file).open("r", encoding="utf-8") as f:
+            payload = json.load(f)
+        if "servers" in payload:
+            servers = {str(key): upgrade_server(server, tz) for key, server in payload["servers"].items()}
+        elif guild_id:
+            servers = {str(guild_id): upgrade_single_server(payload, tz)}
+        else:
+            raise ValueError(f"{data_file} holds one server's timers without a server ID; pass --guild-id.")
+    if not servers:
+        raise ValueError("No servers found to import; the database was left unchanged.")
+    records = []
+    if kill_log_file:
+        kill_log_file = Path(kill_log_file)
+        journal = kill_log_file.with_suffix(".jsonl")
+        legacy = kill_log_file.with_suffix(".json")
+        # The source files are only read; a nested .json log is converted in memory.
+        if journal.exists():
+            records = list(journal_records(journal))
+        elif legacy.exists():
+            records = list(legacy_records(legacy))
+    with db.lock, db.connection as connection:
+        for table in ("servers", "bosses", "boss_turns", "kills"):
+            connection.execute(f"DELETE FROM {table}")
+    SqliteGuildStore(db, tz).write(servers, servers)
+    SqliteKillLog(db, tz).write_many(records)
+    return len(servers), len(records)
+
+
+def export_json(db, data_file, kill_log_file=None, tz=None):
+    servers = SqliteGuildStore(db, tz).load()
+    atomic_write_json(Path(data_file), {"servers": servers}, indent=None)
+    kills = 0
+    if kill_log_file:
+        kill_log_file = Path(kill_log_file)
+        kill_log_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = kill_log_file.with_suffix(kill_log_file.suffix + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            for guild_id, boss, killed_at, killed_by in db.query(
+                "SELECT guild_id, boss, killed_at_text, killed_by FROM kills ORDER BY id"
+            ):
+                f.write(json.dumps(make_record(guild_id, boss, killed_at, killed_by), separators=(",", ":")) + "\n")
+                kills += 1
+        tmp_path.replace(kill_log_file)
+    return len(servers), kills
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Copy boss timer state between the JSON files and SQLite.")
+    parser.add_argument("command", choices=("import", "export"))
+    parser.add_argument("database", help="SQLite database file")
+    parser.add_argument("--data-file", help='single-file {"servers": ...} JSON state')
+    parser.add_argument("--data-dir", help="per-server state directory with manifest.json (import only)")
+    parser.add_argument("--kill-log", help="kill log journal (.jsonl); a nested .json log is converted on import")
+    parser.add_argument("--guild-id", help="server ID for a single-server bosses.json (import only)")
+    parser.add_argument(
+        "--timezone", default=os.getenv("BOSS_TIMEZONE", "Asia/Singapore"), help="timezone of stored local times"
+    )
+    args = parser.parse_args()
+    tz = ZoneInfo(args.timezone)
+
+    db = SqliteDatabase(args.database)
+    if args.command == "import":
+        if not args.data_file and not args.data_dir:
+            parser.error("import needs --data-file or --data-dir")
+        try:
+            servers, kills = import_json(db, args.data_file, args.data_dir, args.kill_log, tz, args.guild_id)
+        except ValueError as exc:
+            parser.error(str(exc))
+        print(f"Imported {servers} server(s) and {kills} kill(s) into {db.path}.")
+    else:
+        if not args.data_file:
+            parser.error("export needs --data-file")
+        servers, kills = export_json(db, args.data_file, args.kill_log, tz)
+        print(f"Exported {servers} server(s) and {kills} kill(s) from {db.path}.")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
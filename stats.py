@@ -0,0 +1,110 @@
+from collections import Counter
+from datetime import datetime
+
+
+def new_bucket():
+    return {"kills": 0, "hours": [0] * 24, "killers": Counter(), "intervals": []}
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class KillStats:
+    # Kills are folded into one bucket per boss per local day (kill count,
+    # kills per hour, killers, intervals since the boss's previous kill). A
+    # query only walks the buckets inside its window, and a new kill touches
+    # a single bucket. Servers are built from the kill log on first query.
+    def __init__(self, tz):
+        self.tz = tz
+        self.guilds = {}
+        self.cache = {}
+
+    def is_built(self, guild_id):
+        return str(guild_id) in self.guilds
+
+    def build(self, guild_id, kills_by_boss):
+        bosses = {}
+        for boss_name, kills in kills_by_boss.items():
+            for killed_at, killed_by in sorted(kills, key=lambda kill: kill[0]):
+                self._add(bosses, boss_name, killed_at, killed_by)
+        self.guilds[str(guild_id)] = bosses
+        self.cache.pop(str(guild_id), None)
+
+    def add(self, guild_id, boss_name, killed_at, killed_by):
+        bosses = self.guilds.get(str(guild_id))
+        if bosses is None:
+            return
+        self._add(bosses, boss_name, killed_at, killed_by)
+        self.cache.pop(str(guild_id), None)
+
+    def _add(self, bosses, boss_name, killed_at, killed_by):
+        entry = bosses.setdefault(boss_name, {"last": None, "days": {}})
+        local = datetime.fromtimestamp(killed_at, self.tz)
+        bucket = entry["days"].setdefault(local.date().toordinal(), new_bucket())
+        bucket["kills"] += 1
+        bucket["hours"][local.hour] += 1
+        if killed_by is not None:
+            bucket["killers"][killed_by] += 1
+        if entry["last"] is not None and killed_at > entry["last"]:
+            bucket["intervals"].append(killed_at - entry["last"])
+        if entry["last"] is None or killed_at > entry["last"]:
+            entry["last"] = killed_at
+
+    def boss_names(self, guild_id):
+        return list(self.guilds.get(str(guild_id), {}))
+
+    def summary(self, guild_id, today, days, boss_name=None):
+        guild_cache = self.cache.setdefault(str(guild_id), {})
+        key = (boss_name, days, today.toordinal())
+        if key in guild_cache:
+            return guild_cache[key]
+
+        first_day = today.toordinal() - days + 1
+        bosses = self.guilds.get(str(guild_id), {})
+        names = [boss_name] if boss_name is not None else list(bosses)
+        hours = [0] * 24
+        killers = Counter()
+        per_boss = {}
+        for name in names:
+            entry = bosses.get(name)
+            if not entry:
+                continue
+            kills = 0
+            intervals = []
+            for day, bucket in entry["days"].items():
+                if day < first_day or day > today.toordinal():
+                    continue
+                kills += bucket["kills"]
+                intervals.extend(bucket["intervals"])
+                killers.update(bucket["killers"])
+                for hour, count in enumerate(bucket["hours"]):
+                    hours[hour] += count
+            if not kills:
+                continue
+            intervals.sort()
+            per_boss[name] = {
+                "kills": kills,
+                "samples": len(intervals),
+                "mean": sum(intervals) / len(intervals) if intervals else None,
+                "p10": percentile(intervals, 0.1),
+                "median": percentile(intervals, 0.5),
+                "p90": percentile(intervals, 0.9),
+            }
+
+        total = sum(boss["kills"] for boss in per_boss.values())
+        result = {
+            "days": days,
+            "kills": total,
+            "per_day": total / days if days else 0.0,
+            "bosses": per_boss,
+            "busiest_hours": sorted(
+                ((hour, count) for hour, count in enumerate(hours) if count), key=lambda item: (-item[1], item[0])
+            )[:3],
+            "top_killers": killers.most_common(3),
+        }
+        guild_cache[key] = result
+        return result
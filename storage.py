@@ -0,0 +1,225 @@
+import asyncio
+import json
+import marshal
+import time
+from pathlib import Path
+
+from models import STORAGE_VERSION, upgrade_server
+
+# File suffix of a server file in each encoding.
+ENCODINGS = {"json": ".json", "binary": ".bin"}
+
+
+def atomic_write_json(path, payload, indent=2):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with tmp_path.open("w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=indent)
+        f.write("\n")
+    tmp_path.replace(path)
+
+
+def atomic_write_bytes(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_bytes(data)
+    tmp_path.replace(path)
+
+# Binary server files are marshal dumps of the same plain dicts, lists and
+# scalars as the JSON files. Loading them only builds data, never runs code.
+# The header records marshal's format version: every Python reads older
+# versions, and a file from a newer one is refused rather than misread.
+BINARY_MAGIC = b"BOSS"
+BINARY_HEADER = BINARY_MAGIC + bytes([marshal.version])
+
+
+def encode_payload(payload, encoding):
+    if encoding == "binary":
+        return BINARY_HEADER + marshal.dumps(payload)
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+def decode_payload(data, encoding):
+    if encoding != "binary":
+        return json.loads(data)
+    if data[: len(BINARY_MAGIC)] != BINARY_MAGIC or len(data) <= len(BINARY_HEADER):
+        raise ValueError("Not a binary server file.")
+    if data[len(BINARY_MAGIC)] > marshal.version:
+        raise ValueError(f"Binary server file needs marshal version {data[len(BINARY_MAGIC)]}; this Python has {marshal.version}.")
+    payload = marshal.loads(data[len(BINARY_HEADER) :])
+    if not isinstance(payload, dict):
+        raise ValueError("Binary server file does not hold a server.")
+    return payload
+
+
+class GuildStore:
+    # One file per Discord server plus a manifest listing them, so a save only
+    # rewrites the servers that actually changed. Server files are found by
+    # listing the directory and each is upgraded on load if it is in an older
+    # version or the other encoding, then rewritten on the next save. With
+    # `owns`, only those servers are loaded and the manifest is left alone,
+    # since other processes save the rest of the servers next to ours.
+    def __init__(self, root, tz=None, encoding="json", owns=None):
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unknown storage encoding: {encoding}")
+        self.root = Path(root)
+        self.servers_dir = self.root / "servers"
+        self.manifest_path = self.root / "manifest.json"
+        self.path = self.manifest_path
+        self.tz = tz
+        self.encoding = encoding
+        self.owns = owns
+        self.dirty = set()
+        self.known = None
+        self.stale_files = set()
+
+    def exists(self):
+        # The manifest is only written once every server file it lists is on
+        # disk, so it marks a finished import; server files alone may be what
+        # is left of one that was cut short.
+        return self.manifest_path.exists()
+
+    def guild_path(self, guild_id, encoding=None):
+        return self.servers_dir / f"{guild_id}{ENCODINGS[encoding or self.encoding]}"
+
+    def stored_files(self):
+        # A save interrupted while moving a server to another encoding can
+        # leave a file in each; the newer one is current.
+        files = {}
+        for encoding, suffix in ENCODINGS.items():
+            for path in self.servers_dir.glob(f"*{suffix}"):
+                modified = path.stat().st_mtime_ns
+                if path.stem in files:
+                    self.stale_files.add(path.stem)
+                    if files[path.stem][2] >= modified:
+                        continue
+                files[path.stem] = (path, encoding, modified)
+        return files
+
+    def mark_dirty(self, *guild_ids):
+        self.dirty.update(str(guild_id) for guild_id in guild_ids)
+
+    def take_dirty(self):
+        dirty, self.dirty = self.dirty, set()
+        return dirty
+
+    def load(self):
+        manifest = {}
+        if self.manifest_path.exists():
+            with self.manifest_path.open("r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        files = self.stored_files()
+        listed = set(map(str, manifest.get("servers", [])))
+        for guild_id in sorted(listed - set(files)):
+            print(f"Missing state file for server {guild_id} listed in {self.manifest_path}. Skipping.")
+        servers = {}
+        upgrades = set()
+        for guild_id, (path, encoding, _) in files.items():
+            if self.owns and not self.owns(guild_id):
+                continue
+            payload = decode_payload(path.read_bytes(), encoding)
+            if payload.get("version", 1) < STORAGE_VERSION or encoding != self.encoding:
+                upgrades.add(guild_id)
+            if encoding != self.encoding:
+                self.stale_files.add(guild_id)
+            servers[guild_id] = upgrade_server(payload, self.tz)
+        if upgrades:
+            print(
+                f"Upgrading {len(upgrades)} server file(s) in {self.root} to version "
+                f"{STORAGE_VERSION} {self.encoding} on the next save."
+            )
+            self.mark_dirty(*upgrades)
+        current = manifest.get("version", 1) >= STORAGE_VERSION and manifest.get("encoding") == self.encoding
+        self.known = listed if current else None
+        return servers
+
+    def write(self, payloads, guild_ids):
+        # Server files go first so the manifest never lists a missing file, and
+        # files in the old encoding are only deleted after the new manifest.
+        for guild_id, payload in payloads.items():
+            atomic_write_bytes(self.guild_path(guild_id), encode_payload(payload, self.encoding))
+        guild_ids = set(map(str, guild_ids))
+        # Shards don't keep the manifest up to date, but the one importing
+        # every server for them writes it once it is done.
+        manifest_stale = not self.owns and guild_ids != self.known
+        if manifest_stale or not self.manifest_path.exists():
+            atomic_write_json(
+                self.manifest_path,
+                {"version": STORAGE_VERSION, "encoding": self.encoding, "servers": sorted(guild_ids)},
+            )
+            self.known = guild_ids
+        for guild_id in self.stale_files & set(payloads):
+            for encoding in ENCODINGS:
+                if encoding != self.encoding:
+                    self.guild_path(guild_id, encoding).unlink(missing_ok=True)
+            self.stale_files.discard(guild_id)
+
+
+class WriteBehind:
+    # Coalesces save requests into one flush per window. collect() runs on the
+    # event loop and snapshots what needs writing; the returned jobs and any
+    # submitted ones run in a worker thread, in order, one flush at a time.
+    # A failed flush is retried on its own with backoff, and a job that fails
+    # `max_attempts` times in a row is dropped so it can't hold up the rest.
+    def __init__(self, collect, window=1.0, observe=None, max_attempts=5, max_retry_delay=300.0):
+        self.collect = collect
+        self.window = window
+        self.observe = observe
+        self.max_attempts = max_attempts
+        self.max_retry_delay = max_retry_delay
+        self._jobs = []
+        self._timer = None
+        self._lock = asyncio.Lock()
+        self._failed_job = None
+        self._failures = 0
+
+    def request(self):
+        if self._timer is None or self._timer.done():
+            self._timer = asyncio.get_running_loop().create_task(self._delayed_flush())
+
+    def submit(self, job):
+        self._jobs.append(job)
+        self.request()
+
+    async def _delayed_flush(self, delay=None):
+        await asyncio.sleep(self.window if delay is None else delay)
+        try:
+            await self.flush()
+        except Exception as exc:
+            delay = min(max(self.window, 1.0) * 2 ** self._failures, self.max_retry_delay)
+            print(f"Background save failed, retrying in {delay:.0f}s: {exc}")
+            self._timer = asyncio.get_running_loop().create_task(self._delayed_flush(delay))
+
+    async def flush(self):
+        async with self._lock:
+            started = time.perf_counter()
+            # Jobs left over from a failed flush hold older snapshots than the
+            # ones collected now, so they run first and get overwritten.
+            jobs = self._jobs + self.collect()
+            self._jobs = []
+            if not jobs:
+                return
+            count = len(jobs)
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, run_jobs, jobs)
+            except Exception as exc:
+                if jobs[0] is self._failed_job:
+                    self._failures += 1
+                else:
+                    self._failed_job, self._failures = jobs[0], 1
+                if self._failures >= self.max_attempts:
+                    print(f"Dropping a save job after {self._failures} failed attempts: {exc!r}")
+                    jobs.pop(0)
+                    self._failed_job, self._failures = None, 0
+                self._jobs = jobs + self._jobs
+                raise
+            self._failed_job, self._failures = None, 0
+            if self.observe:
+                self.observe(time.perf_counter() - started, count)
+
+
+def run_jobs(jobs):
+    # Completed jobs are removed so a failed flush only retries what is left.
+    while jobs:
+        jobs[0]()
+        jobs.pop(0)
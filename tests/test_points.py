@@ -0,0 +1,58 @@
+from datetime import datetime, timezone
+
+from points import PointsLedger
+
+
+def test_ranking_follows_totals(tmp_path):
+    ledger = PointsLedger(tmp_path / "points.csv")
+    ledger.add(1, 10, 5)
+    ledger.add(1, 20, 3)
+    ledger.add(1, 30, 3)
+    ledger.add(1, 20, 4)
+    ledger.add(2, 10, 100)
+
+    assert ledger.top(1) == [(20, 7), (10, 5), (30, 3)]
+    assert ledger.top(1, limit=1) == [(20, 7)]
+    assert [ledger.rank(1, user_id) for user_id in (20, 10, 30)] == [1, 2, 3]
+    assert ledger.rank(1, 99) is None
+    assert ledger.total(2, 10) == 100
+    assert ledger.members(1) == 3
+
+
+def test_tied_totals_share_a_rank(tmp_path):
+    ledger = PointsLedger(tmp_path / "points.csv")
+    ledger.add(1, 10, 4)
+    ledger.add(1, 20, 4)
+    ledger.add(1, 30, 1)
+
+    assert ledger.rank(1, 10) == ledger.rank(1, 20) == 1
+    assert ledger.rank(1, 30) == 3
+
+
+def test_awards_survive_a_reload(tmp_path):
+    path = tmp_path / "points.csv"
+    path.write_text("\n", encoding="utf-8")
+    ledger = PointsLedger(path)
+    now = datetime(2026, 1, 5, tzinfo=timezone.utc)
+    ledger.write([ledger.award(1, 10, 2, "kill:Venatus@100", now), ledger.award(1, 20, 1, "kill:Livera@200", now)])
+    ledger.write([ledger.award(1, 10, 3, "attendance:Venatus@100", now)])
+
+    reloaded = PointsLedger(path)
+    reloaded.load()
+    assert reloaded.top(1) == [(10, 5), (20, 1)]
+    assert reloaded.awarded(1, "kill:Venatus@100")
+    assert reloaded.awarded(1, "attendance:Venatus@100", user_id=10)
+    assert not reloaded.awarded(1, "attendance:Venatus@100", user_id=20)
+    assert path.read_text(encoding="utf-8").count("guild_id") == 1
+
+
+def test_load_skips_servers_it_does_not_own(tmp_path):
+    path = tmp_path / "points.csv"
+    now = datetime(2026, 1, 5, tzinfo=timezone.utc)
+    writer = PointsLedger(path)
+    writer.write([writer.award(1, 10, 2, "", now), writer.award(2, 10, 7, "", now)])
+
+    ledger = PointsLedger(path, owns=lambda guild_id: guild_id == "2")
+    ledger.load()
+    assert ledger.top(1) == []
+    assert ledger.top(2) == [(10, 7)]
@@ -0,0 +1,33 @@
+from reconcile import kill_events, reconcile, summarize
+
+
+def test_every_row_matches_the_nearest_kill():
+    kills = kill_events([("Venatus", 1_000, 1), ("Venatus", 5_000, 2)])
+    attendance = [("venatus", 990), ("venatus", 1_010), ("venatus", 4_900), ("venatus", 5_030)]
+
+    matched, lonely_attendance, lonely_kills = reconcile(attendance, kills, tolerance=300)
+
+    assert [(row[1], kill[1]) for row, kill in matched] == [(990, 1_000), (1_010, 1_000), (4_900, 5_000), (5_030, 5_000)]
+    assert lonely_attendance == []
+    assert lonely_kills == []
+
+
+def test_rows_and_kills_outside_tolerance_stay_alone():
+    kills = kill_events([("Venatus", 1_000, 1), ("Livera", 1_000, 2)])
+    attendance = [("livera", 1_100), ("venatus", 2_000)]
+
+    matched, lonely_attendance, lonely_kills = reconcile(attendance, kills, tolerance=300)
+
+    assert [(row, kill[2]) for row, kill in matched] == [(("livera", 1_100), "Livera")]
+    assert lonely_attendance == [("venatus", 2_000)]
+    assert [kill[2] for kill in lonely_kills] == ["Venatus"]
+    assert summarize(matched, lonely_attendance, lonely_kills) == {"livera": [1, 0, 0], "venatus": [0, 1, 1]}
+
+
+def test_rows_never_match_another_boss():
+    kills = kill_events([("Livera", 1_000, 1)])
+    matched, lonely_attendance, lonely_kills = reconcile([("venatus", 1_000)], kills, tolerance=300)
+
+    assert matched == []
+    assert lonely_attendance == [("venatus", 1_000)]
+    assert len(lonely_kills) == 1
@@ -0,0 +1,69 @@
+from scheduler import SpawnScheduler
+
+
+def make_scheduler():
+    return SpawnScheduler(clock=lambda: 1_000)
+
+
+def test_pop_due_returns_deadlines_in_order():
+    scheduler = make_scheduler()
+    scheduler.schedule(1, "Venatus", [(300, "respawn", 300), (100, "warning", 300)])
+    scheduler.schedule(2, "Livera", [(200, "respawn", 200)])
+
+    assert scheduler.pop_due(250) == [
+        ("1", "Venatus", "warning", 300, 100),
+        ("2", "Livera", "respawn", 200, 200),
+    ]
+    assert scheduler.next_deadline() == 300
+    assert len(scheduler) == 1
+
+
+def test_reschedule_drops_earlier_deadlines():
+    scheduler = make_scheduler()
+    scheduler.schedule(1, "Venatus", [(100, "respawn", 100)])
+    scheduler.schedule(1, "Venatus", [(500, "respawn", 500)])
+
+    assert len(scheduler) == 1
+    assert scheduler.pop_due(400) == []
+    assert scheduler.pop_due(500) == [("1", "Venatus", "respawn", 500, 500)]
+
+
+def test_discard_and_discard_guild():
+    scheduler = make_scheduler()
+    scheduler.schedule(1, "Venatus", [(100, "respawn", 100)])
+    scheduler.schedule(1, "Livera", [(100, "respawn", 100)])
+    scheduler.schedule(2, "Venatus", [(100, "respawn", 100)])
+
+    scheduler.discard(1, "Venatus")
+    assert [entry[:2] for entry in scheduler.pop_due(100)] == [("1", "Livera"), ("2", "Venatus")]
+
+    scheduler.schedule(1, "Venatus", [(200, "respawn", 200)])
+    scheduler.schedule(2, "Venatus", [(200, "respawn", 200)])
+    scheduler.discard_guild("1")
+    assert [entry[:2] for entry in scheduler.pop_due(200)] == [("2", "Venatus")]
+    assert len(scheduler) == 0
+    assert scheduler.next_deadline() is None
+
+
+def test_retry_comes_back_until_the_boss_is_rescheduled():
+    scheduler = make_scheduler()
+    scheduler.schedule(1, "Venatus", [(100, "respawn", 100)])
+    (entry,) = scheduler.pop_due(100)
+
+    scheduler.retry(*entry[:4], 150)
+    assert scheduler.pop_due(150) == [("1", "Venatus", "respawn", 100, 150)]
+
+    scheduler.retry(*entry[:4], 150)
+    scheduler.schedule(1, "Venatus", [(900, "respawn", 900)])
+    assert scheduler.pop_due(600) == []
+    assert len(scheduler) == 1
+
+
+def test_stale_entries_are_compacted():
+    scheduler = make_scheduler()
+    for spawn_at in range(200):
+        scheduler.schedule(1, "Venatus", [(spawn_at, "respawn", spawn_at)])
+
+    assert len(scheduler) == 1
+    assert len(scheduler._heap) < 64
+    assert scheduler.pop_due(1_000) == [("1", "Venatus", "respawn", 199, 199)]
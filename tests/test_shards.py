@@ -0,0 +1,69 @@
+import asyncio
+
+from shards import ShardLease, shard_for, shards_overlap
+
+
+def guild_on_shard(shard, index=0, shard_count=4):
+    return str(((index * shard_count) + shard) << 22)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_each_server_has_one_owner(tmp_path):
+    leases = [ShardLease(tmp_path, [shard], 4) for shard in range(4)]
+    guild_ids = [guild_on_shard(shard, index) for shard in range(4) for index in range(5)]
+
+    for guild_id in guild_ids:
+        owners = [lease for lease in leases if lease.owns(guild_id)]
+        assert len(owners) == 1
+        assert owners[0].shard_ids == [shard_for(guild_id, 4)]
+
+
+def test_layouts_overlap_across_shard_counts():
+    assert shards_overlap([0], 2, [2], 4)
+    assert not shards_overlap([1], 2, [2], 4)
+    assert shards_overlap([0, 1], 2, [5], 6)
+
+
+def test_live_overlapping_lease_blocks(tmp_path):
+    clock = Clock()
+    first = ShardLease(tmp_path, [0], 2, ttl=30, clock=clock)
+    asyncio.run(first.acquire())
+
+    resharded = ShardLease(tmp_path, [2], 4, clock=clock)
+    other_half = ShardLease(tmp_path, [1, 3], 4, clock=clock)
+    assert [lease["token"] for lease in resharded.blocking()] == [first.token]
+    assert other_half.blocking() == []
+
+    clock.now += 31
+    assert resharded.blocking() == []
+
+
+def test_released_lease_frees_its_servers(tmp_path):
+    first = ShardLease(tmp_path, [0], 2)
+    asyncio.run(first.acquire())
+    assert first.held()
+
+    first.release()
+    assert not first.held()
+    asyncio.run(asyncio.wait_for(ShardLease(tmp_path, [0], 2).acquire(poll=0.01), 1))
+
+
+def test_renew_fails_once_another_process_took_over(tmp_path):
+    clock = Clock()
+    first = ShardLease(tmp_path, [0], 2, ttl=30, clock=clock)
+    asyncio.run(first.acquire())
+    assert first.renew()
+
+    clock.now += 31
+    second = ShardLease(tmp_path, [0], 2, ttl=30, clock=clock)
+    asyncio.run(second.acquire())
+    assert not first.renew()
+    assert not first.held()
+    assert second.held()
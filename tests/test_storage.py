@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+from models import Boss, GuildState
+from storage import GuildStore, WriteBehind, decode_payload, encode_payload
+
+
+def make_payload(name):
+    state = GuildState(name, announce_channel_id=1, status_channel_id=2)
+    state.bosses["Venatus"] = Boss(death_at=1_000, respawn_seconds=36_000, killed_by=7)
+    state.bosses["Livera"] = Boss(schedule=[("Monday", "10:00 AM")], is_scheduled=True)
+    state.boss_turns["Venatus"] = ["Alpha", "Beta"]
+    return state.to_payload()
+
+
+@pytest.mark.parametrize("encoding", ["json", "binary"])
+def test_guild_store_round_trip(tmp_path, encoding):
+    store = GuildStore(tmp_path, encoding=encoding)
+    payloads = {"1": make_payload("One"), "2": make_payload("Two")}
+    assert not store.exists()
+
+    store.write(payloads, payloads)
+
+    assert store.exists()
+    loaded = GuildStore(tmp_path, encoding=encoding).load()
+    assert loaded == payloads
+    assert GuildState.from_payload(loaded["1"]).bosses["Venatus"].next_spawn == 37_000
+
+
+def test_guild_store_moves_servers_to_the_new_encoding(tmp_path):
+    payloads = {"1": make_payload("One")}
+    GuildStore(tmp_path, encoding="json").write(payloads, payloads)
+
+    store = GuildStore(tmp_path, encoding="binary")
+    loaded = store.load()
+    assert store.take_dirty() == {"1"}
+    store.write(loaded, loaded)
+
+    assert sorted(path.name for path in (tmp_path / "servers").iterdir()) == ["1.bin"]
+    assert GuildStore(tmp_path, encoding="binary").load() == payloads
+
+
+def test_guild_store_only_loads_owned_servers(tmp_path):
+    payloads = {"1": make_payload("One"), "2": make_payload("Two")}
+    GuildStore(tmp_path).write(payloads, payloads)
+
+    assert list(GuildStore(tmp_path, owns=lambda guild_id: guild_id == "2").load()) == ["2"]
+
+
+def test_binary_payloads_must_be_servers():
+    with pytest.raises(ValueError):
+        decode_payload(b"not a server file", "binary")
+    with pytest.raises(ValueError):
+        decode_payload(encode_payload(["a", "list"], "binary"), "binary")
+
+
+def test_write_behind_saves_dirty_servers(tmp_path):
+    store = GuildStore(tmp_path)
+    servers = {"1": make_payload("One"), "2": make_payload("Two")}
+    flushes = []
+
+    def collect():
+        dirty = store.take_dirty()
+        if not dirty:
+            return []
+        payloads = {guild_id: servers[guild_id] for guild_id in dirty}
+        return [lambda: store.write(payloads, servers)]
+
+    async def run():
+        saver = WriteBehind(collect, window=0.01, observe=lambda seconds, count: flushes.append(count))
+        store.mark_dirty("1", "2")
+        saver.request()
+        await asyncio.sleep(0.1)
+        servers["2"] = make_payload("Renamed")
+        store.mark_dirty("2")
+        await saver.flush()
+
+    asyncio.run(run())
+    assert flushes == [1, 1]
+    assert GuildStore(tmp_path).load()["2"]["name"] == "Renamed"
+
+
+def test_write_behind_retries_then_drops_a_failing_job():
+    done = []
+    attempts = []
+
+    def failing():
+        attempts.append(1)
+        raise OSError("disk full")
+
+    async def run():
+        saver = WriteBehind(lambda: [], window=0.01, max_attempts=3, max_retry_delay=0.01)
+        saver.submit(failing)
+        saver.submit(lambda: done.append("later"))
+        for _ in range(100):
+            if done:
+                break
+            await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+    assert len(attempts) == 3
+    assert done == ["later"]
+
+
+def test_write_behind_keeps_jobs_after_a_failed_flush():
+    done = []
+    failures = [OSError("disk full")]
+
+    def flaky():
+        if failures:
+            raise failures.pop()
+        done.append("flaky")
+
+    async def run():
+        saver = WriteBehind(lambda: [])
+        saver._jobs = [lambda: done.append("first"), flaky, lambda: done.append("last")]
+        with pytest.raises(OSError):
+            await saver.flush()
+        await saver.flush()
+
+    asyncio.run(run())
+    assert done == ["first", "flaky", "last"]